@@ -2,9 +2,23 @@
 from flask import Flask
 from sqlalchemy import text
 
-from app.extensions import db, limiter, login_manager
-from app.utils import configure_relationships, delete_table
+from app.extensions import configure_engine, db, engine_options, limiter, login_manager
+from app.collection.rankings import rankings_refresher
+from app.nft.activity import activity_compactor
+from app.nft.view_recorder import view_recorder
+from app.nft.likes import like_counter
+from app.api.search.autocomplete import autocomplete_index
+from app.api.search.fts import install_fts
+from app.utils import (
+    NFT_COUNTER_COLUMNS, add_missing_columns, backfill_sales, configure_relationships, delete_table,
+    fill_collection_stats, fill_media_types, missing_tables, recount_nft_counters, remove_duplicate_rows
+)
+from app.derivatives import image_derivatives
+from app.images import image_url
+from app.storage import blob_collector
+from app.nft.models import Sale
 from config import settings, prepare_folders
+from app.benchmarks import register_benchmarks
 from app.cli import register_commands
 
 def create_app(migrate=False, drop_all=False):
@@ -15,11 +29,16 @@ def create_app(migrate=False, drop_all=False):
         TESTING=settings.TESTING,
         SQLALCHEMY_DATABASE_URI=settings.db.SQLALCHEMY_DATABASE_URI,
         SQLALCHEMY_TRACK_MODIFICATIONS=settings.db.SQLALCHEMY_TRACK_MODIFICATIONS,
+        SQLALCHEMY_ENGINE_OPTIONS=engine_options(settings.db.SQLALCHEMY_DATABASE_URI),
         UPLOAD_FOLDER=str(settings.db.UPLOAD_FOLDER),
     )
 
     db.init_app(app)
+    with app.app_context():
+        configure_engine(db.engine, settings.db.SQLITE_PROFILE)
     login_manager.init_app(app)
+    app.jinja_env.globals['image_url'] = image_url
+    app.jinja_env.globals['grid_image_width'] = settings.app.GRID_IMAGE_WIDTH
     login_manager.login_view = 'main.login'
     # limiter.init_app(app)
 
@@ -40,12 +59,32 @@ def create_app(migrate=False, drop_all=False):
     configure_relationships()
 
     register_commands(app)
+    register_benchmarks(app)
 
+    # schema and data fixes land before any background job touches the tables
     if migrate:
         prepare_folders()
 
         with app.app_context():
             if drop_all:
                 db.drop_all()
+            new_tables: set[str] = missing_tables(db)
             db.create_all()
+            remove_duplicate_rows(db)
+            added_columns: set[str] = add_missing_columns(db)
+            if added_columns & NFT_COUNTER_COLUMNS:
+                recount_nft_counters(db)
+            fill_media_types(db)
+            if Sale.__tablename__ in new_tables:
+                backfill_sales(db)
+            fill_collection_stats(db)
+            install_fts(db)
+
+    rankings_refresher.init_app(app)
+    autocomplete_index.init_app(app)
+    activity_compactor.init_app(app)
+    view_recorder.init_app(app)
+    like_counter.init_app(app)
+    image_derivatives.init_app(app)
+    blob_collector.init_app(app)
     return app
@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from sqlalchemy import Select, func, inspect, select
+from sqlalchemy.ext.compiler import compiles
+from dataclasses import dataclass, field
+import re
+
+from app.api.listing import NFTListing, count_statement, page_statement
+from app.nft.models import NFT, Like, NFTView, Offer, Sale
+from app.user.models import Follower
+from app.extensions import db
+
+SQLITE_FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+POSTGRES_FULL_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+@dataclass
+class ShapeReport:
+    label: str
+    plan: list[str]
+    full_scans: list[str] = field(default_factory=list)
+    temp_sorts: int = 0
+
+def _listing(label: str, **filters) -> tuple[str, Select, dict]:
+    listing = NFTListing(**filters)
+    return label, page_statement(listing.shape, False), {**listing.params, 'page_limit': 48}
+
+def query_shapes() -> list[tuple[str, Select, dict]]:
+    """Every hot statement shape the API issues, with representative bind values"""
+    now = datetime.now(timezone.utc)
+    shapes: list[tuple[str, Select, dict]] = [
+        _listing(f'drops sortBy={sort_by}', sort_by=sort_by, exclude_blocked=True) for sort_by in range(1, 8)
+    ]
+    shapes += [
+        _listing('profile owned', owner_id=1, sort_by=5),
+        _listing('profile created', creator_id=1, sort_by=5),
+        _listing('profile liked', liked_by=1, sort_by=5),
+        _listing('collection listed', collection_id=1, is_listed=True),
+        _listing('drops by category', category_ids=(1,), exclude_blocked=True),
+        ('drops total', count_statement(NFTListing(exclude_blocked=True).shape), {}),
+        ('nft by token', select(NFT).where(NFT.token_id == 'token'), {}),
+        ('category top nfts', select(NFT).where(NFT.category_id == 1, NFT.is_blocked == False)
+            .order_by(NFT.likes_count.desc(), NFT.id.desc()).limit(5), {}),
+        ('like toggle', select(Like.id).where(Like.user_id == 1, Like.nft_id == 1), {}),
+        ('nft likes', select(Like.id).where(Like.nft_id == 1), {}),
+        ('nft views', select(NFTView.id).where(NFTView.nft_id == 1), {}),
+        ('received offers', select(Offer).where(Offer.owner_id == 1), {}),
+        ('made offers', select(Offer).where(Offer.buyer_id == 1), {}),
+        ('completed offers', select(Offer).where(Offer.is_accepted == True).order_by(Offer.created_at.desc()), {}),
+        ('existing offer', select(Offer.id).where(
+            Offer.nft_id == 1, Offer.owner_id == 1, Offer.buyer_id == 2,
+            Offer.is_accepted == False, Offer.is_cancelled == False, Offer.expires_at > now
+        ), {}),
+        ('other offers', select(Offer).where(
+            Offer.nft_id == 1, Offer.id != 1, Offer.is_accepted.is_(False), Offer.is_cancelled.is_(False)
+        ), {}),
+        ('active offers count', select(func.count(Offer.id)).where(
+            Offer.is_accepted == False, Offer.is_cancelled == False, Offer.expires_at > now
+        ), {}),
+        ('is following', select(func.count(Follower.id)).where(Follower.follower_id == 1, Follower.followed_id == 2), {}),
+        ('followers of user', select(Follower).where(Follower.followed_id == 1), {}),
+        ('recent sales', select(Sale.collection_id, func.sum(Sale.price))
+            .where(Sale.created_at >= now - timedelta(days=1)).group_by(Sale.collection_id), {}),
+    ]
+    return shapes
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN wrapper that keeps the wrapped statement's bind parameters"""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select) -> None:
+        self.statement = statement
+
+@compiles(Explain)
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    return f'EXPLAIN {compiler.process(element.statement, **kw)}'
+
+@compiles(Explain, 'sqlite')
+def _compile_explain_sqlite(element: Explain, compiler, **kw) -> str:
+    return f'EXPLAIN QUERY PLAN {compiler.process(element.statement, **kw)}'
+
+def explain(statement: Select, params: dict) -> list[str]:
+    """Plan lines of `statement` with `params` bound, as the database reports them"""
+    with db.engine.connect() as connection:
+        # raw cursor rows: the result map still describes the wrapped statement's columns
+        rows = connection.execute(Explain(statement), params).cursor.fetchall()
+    return [row[-1] if db.engine.dialect.name == 'sqlite' else row[0] for row in rows]
+
+def analyze_shape(label: str, statement: Select, params: dict) -> ShapeReport:
+    plan = explain(statement, params)
+    report = ShapeReport(label=label, plan=plan)
+    tables: set[str] = set(db.metadata.tables)
+    pattern = SQLITE_FULL_SCAN if db.engine.dialect.name == 'sqlite' else POSTGRES_FULL_SCAN
+
+    for line in plan:
+        found = pattern.search(line.strip())
+        if found and found.group(1) in tables:
+            report.full_scans.append(found.group(1))
+        if 'TEMP B-TREE' in line or line.strip().startswith('Sort'):
+            report.temp_sorts += 1
+    return report
+
+def declared_indexes() -> list[tuple[str, str]]:
+    """(table, index) of every index declared on the models"""
+    return sorted(
+        (table.name, index.name)
+        for table in db.metadata.sorted_tables
+        for index in table.indexes
+    )
+
+def missing_indexes() -> list[tuple[str, str]]:
+    inspector = inspect(db.engine)
+    existing: set[tuple[str, str]] = {
+        (table, index['name'])
+        for table in inspector.get_table_names()
+        for index in inspector.get_indexes(table)
+    }
+    return [declared for declared in declared_indexes() if declared not in existing]
@@ -1,24 +1,83 @@
 
+from sqlalchemy import func, literal, or_, select, union_all
+from sqlalchemy.orm import joinedload
 from datetime import datetime, timezone
-from flask import g, jsonify
+from flask import g, jsonify, request
+from pydantic import ValidationError
 
-from app.api.admin.utils import serialize_collection, serialize_like, serialize_nft, serialize_offer, serialize_user, serialize_view
+from app.api.admin.utils import admin_list, serialize_activity, serialize_collection, serialize_nft, serialize_offer, serialize_user, serialize_user_nft
+from app.api.admin.schemas import ActivitySeriesQuery, AdminListQuery
+from app.nft.activity import GRANULARITIES, METRICS, truncate
+from app.api.search.autocomplete import autocomplete_index
+from app.nft.view_recorder import view_recorder
+from app.nft.likes import like_counter
+from app.api.listing import listing_metrics
 from app.jwt.decorators import admin_required, jwt_required
-from app.nft.models import NFT, Like, NFTView, Offer
-from app.collection.models import NFTCollection
+from app.user.passwords import password_hasher
+from app.jwt.cache import auth_cache
+from app.derivatives import image_derivatives
+from app.images import image_lookup
+from app.storage import upload_stats
+from app.nft.models import NFT, ActivityRollup, Like, NFTView, Offer
+from app.collection.models import CollectionStats, NFTCollection
 from app.api.admin import admin_api_bp
 from app.user.models import User
 from app.extensions import db
 
+def _list_query() -> AdminListQuery | tuple:
+    try:
+        return AdminListQuery(**request.args.to_dict())
+    except ValidationError as e:
+        errors = e.errors()
+        error_messages = [f"{err['loc'][0]}: {err['msg']}" for err in errors]
+        return jsonify({'status': 'error', 'errors': error_messages}), 400
+
 @admin_api_bp.route('/users', methods=['GET'])
 @jwt_required
 @admin_required
 def get_users():
-    users: list[User] = User.query.all()
+    params = _list_query()
+    if isinstance(params, tuple):
+        return params
+
+    nft_count = (
+        select(func.count(NFT.id))
+        .where(or_(NFT.creator_id == User.id, NFT.owner_id == User.id))
+        .correlate(User)
+        .scalar_subquery()
+    )
+    statement = select(User, nft_count.label('nft_count'))
+
+    return admin_list(
+        statement, params, 'users', serialize_user,
+        sort_columns={
+            'id': User.id,
+            'username': User.username,
+            'created_at': User.created_at,
+            'balance': User.balance,
+            'nft_count': nft_count
+        },
+        statuses={'active': User.is_blocked == False, 'blocked': User.is_blocked == True},
+        search_columns=(User.username, User.display_name, User.email),
+        entities=False
+    )
+
+@admin_api_bp.route('/users/<int:user_id>/nfts', methods=['GET'])
+@jwt_required
+@admin_required
+def get_user_nfts(user_id):
+    params = _list_query()
+    if isinstance(params, tuple):
+        return params
 
-    users_dicts: list[dict] = [serialize_user(user) for user in users]
+    User.query.filter_by(id=user_id).first_or_404()
+    statement = select(NFT).where(or_(NFT.creator_id == user_id, NFT.owner_id == user_id))
 
-    return jsonify({'status': 'success', 'users': users_dicts}), 200
+    return admin_list(
+        statement, params, 'nfts', serialize_user_nft,
+        sort_columns={'id': NFT.id, 'name': NFT.name, 'price': NFT.price, 'created_at': NFT.created_at},
+        search_columns=(NFT.name, NFT.token_id)
+    )
 
 @admin_api_bp.route('/users/<int:user_id>/status', methods=['PATCH'])
 @jwt_required
@@ -43,11 +102,23 @@ def toggle_user_status(user_id):
 @jwt_required
 @admin_required
 def get_nfts():
-    nfts: list[NFT] = NFT.query.all()
+    params = _list_query()
+    if isinstance(params, tuple):
+        return params
 
-    nfts_dicts: list[dict] = [serialize_nft(nft) for nft in nfts]
+    statement = select(NFT).options(joinedload(NFT.creator), joinedload(NFT.owner))
 
-    return jsonify({'status': 'success', 'nfts': nfts_dicts}), 200
+    return admin_list(
+        statement, params, 'nfts', serialize_nft,
+        sort_columns={'id': NFT.id, 'name': NFT.name, 'price': NFT.price, 'created_at': NFT.created_at},
+        statuses={
+            'active': NFT.is_blocked == False,
+            'blocked': NFT.is_blocked == True,
+            'listed': NFT.is_listed == True,
+            'unlisted': NFT.is_listed == False
+        },
+        search_columns=(NFT.name, NFT.token_id)
+    )
 
 @admin_api_bp.route('/nfts/<string:token_id>/status', methods=['PATCH'])
 @jwt_required
@@ -65,21 +136,57 @@ def toggle_nft_status(token_id):
 @jwt_required
 @admin_required
 def get_collections():
-    collections: list[NFTCollection] = NFTCollection.query.all()
+    params = _list_query()
+    if isinstance(params, tuple):
+        return params
 
-    collections_dicts: list[dict] = [serialize_collection(nft) for nft in collections]
+    statement = (
+        select(NFTCollection)
+        .outerjoin(CollectionStats, CollectionStats.collection_id == NFTCollection.id)
+        .options(joinedload(NFTCollection.user), joinedload(NFTCollection.category))
+    )
 
-    return jsonify({'status': 'success', 'collections': collections_dicts}), 200
+    return admin_list(
+        statement, params, 'collections', serialize_collection,
+        sort_columns={
+            'id': NFTCollection.id,
+            'name': NFTCollection.name,
+            'created_at': NFTCollection.created_at,
+            'nft_count': CollectionStats.item_count,
+            'floor_price': CollectionStats.floor_price,
+            'volume': CollectionStats.volume
+        },
+        search_columns=(NFTCollection.name,)
+    )
 
 @admin_api_bp.route('/offers', methods=['GET'])
 @jwt_required
 @admin_required
 def get_offers():
-    offers: list[Offer] = Offer.query.all()
+    params = _list_query()
+    if isinstance(params, tuple):
+        return params
 
-    offers_dicts: list[dict] = [serialize_offer(offer) for offer in offers]
+    now = datetime.now(timezone.utc)
+    open_offer = (Offer.is_accepted == False) & (Offer.is_cancelled == False)
+    statement = select(Offer).join(Offer.nft).options(joinedload(Offer.nft), joinedload(Offer.buyer))
 
-    return jsonify({'status': 'success', 'offers': offers_dicts}), 200
+    return admin_list(
+        statement, params, 'offers', serialize_offer,
+        sort_columns={
+            'id': Offer.id,
+            'amount': Offer.amount,
+            'created_at': Offer.created_at,
+            'expires_at': Offer.expires_at
+        },
+        statuses={
+            'active': open_offer & (Offer.expires_at > now),
+            'expired': open_offer & (Offer.expires_at <= now),
+            'accepted': Offer.is_accepted == True,
+            'cancelled': Offer.is_cancelled == True
+        },
+        search_columns=(NFT.token_id, NFT.name)
+    )
 
 @admin_api_bp.route("/offers/<int:offer_id>/cancel", methods=["PATCH"])
 @jwt_required
@@ -96,6 +203,7 @@ def admin_cancel_offer(offer_id):
         return jsonify({"status": "info", 'data': 'accepted', "message": "Offer is already accepted."}), 200
 
     offer.is_cancelled = True
+    offer.nft.offers_count = NFT.offers_count - 1
     db.session.commit()
 
     return jsonify({"status": "success", 'data': 'cancelled', "message": "Offer successfully canceled."}), 200
@@ -104,9 +212,87 @@ def admin_cancel_offer(offer_id):
 @jwt_required
 @admin_required
 def get_activity():
-    likes: list[Like] = Like.query.all()
-    views: list[NFTView] = NFTView.query.all()
+    params = _list_query()
+    if isinstance(params, tuple):
+        return params
+
+    activity = union_all(*[
+        select(
+            model.id.label('id'),
+            literal(kind).label('type'),
+            NFT.name.label('nft_name'),
+            User.username.label('username'),
+            model.created_at.label('created_at')
+        )
+        .outerjoin(NFT, NFT.id == model.nft_id)
+        .outerjoin(User, User.id == model.user_id)
+        for kind, model in (('view', NFTView), ('like', Like))
+    ]).subquery()
+
+    return admin_list(
+        select(activity), params, 'activity', serialize_activity,
+        sort_columns={'created_at': activity.c.created_at, 'id': activity.c.id},
+        statuses={'view': activity.c.type == 'view', 'like': activity.c.type == 'like'},
+        search_columns=(activity.c.nft_name, activity.c.username),
+        entities=False
+    )
 
-    activity_dicts: list[dict] = [serialize_view(view) for view in views] + [serialize_like(like) for like in likes]
+@admin_api_bp.route('/analytics/series', methods=['GET'])
+@jwt_required
+@admin_required
+def get_activity_series():
+    try:
+        params: ActivitySeriesQuery = ActivitySeriesQuery(**request.args.to_dict())
+    except ValidationError as e:
+        errors = e.errors()
+        error_messages = [f"{err['loc'][0] if err['loc'] else 'query'}: {err['msg']}" for err in errors]
+        return jsonify({'status': 'error', 'errors': error_messages}), 400
+
+    start: datetime = truncate(params.from_, params.granularity)
+    end: datetime = params.to
+
+    rollups: dict[datetime, ActivityRollup] = {
+        rollup.bucket: rollup for rollup in ActivityRollup.query.filter(
+            ActivityRollup.granularity == params.granularity,
+            ActivityRollup.scope == params.scope,
+            ActivityRollup.scope_id == (params.id or 0),
+            ActivityRollup.bucket >= start,
+            ActivityRollup.bucket < end
+        )
+    }
 
-    return jsonify({'status': 'success', 'activity': activity_dicts}), 200
\ No newline at end of file
+    series: list[dict] = []
+    totals: dict = dict.fromkeys(METRICS, 0)
+    bucket = start
+    while bucket < end:
+        rollup: ActivityRollup | None = rollups.get(bucket)
+        point: dict = rollup.to_dict() if rollup else {'bucket': bucket.isoformat(), **dict.fromkeys(METRICS, 0)}
+        series.append(point)
+        for metric in METRICS:
+            totals[metric] += point[metric]
+        bucket += GRANULARITIES[params.granularity]
+
+    return jsonify({
+        'status': 'success',
+        'granularity': params.granularity,
+        'scope': params.scope,
+        'series': series,
+        'totals': totals
+    }), 200
+
+@admin_api_bp.route('/metrics', methods=['GET'])
+@jwt_required
+@admin_required
+def get_metrics():
+    return jsonify({
+        'status': 'success',
+        'views': view_recorder.stats(),
+        'likes': like_counter.stats(),
+        'auth': auth_cache.stats(),
+        'password_hashing': password_hasher.stats(),
+        'images': image_lookup.stats(),
+        'derivatives': image_derivatives.stats(),
+        'uploads': upload_stats(),
+        'listing': listing_metrics.snapshot(),
+        'autocomplete': autocomplete_index.stats()
+    }), 200
@@ -0,0 +1,40 @@
+from pydantic import BaseModel, Field, field_validator, model_validator
+from datetime import datetime, timezone
+from typing import Literal
+
+ADMIN_MAX_PAGE_SIZE: int = 500
+MAX_SERIES_BUCKETS: int = 2000
+
+class AdminListQuery(BaseModel):
+    page: int = Field(1, ge=1)
+    per_page: int = Field(50, ge=1, le=ADMIN_MAX_PAGE_SIZE)
+    sort: str | None = None
+    order: Literal['asc', 'desc'] = 'desc'
+    search: str | None = Field(None, max_length=100)
+    status: str | None = None
+    format: Literal['json', 'ndjson'] = 'json'
+
+class ActivitySeriesQuery(BaseModel):
+    from_: datetime = Field(alias='from')
+    to: datetime
+    granularity: Literal['hour', 'day'] = 'day'
+    scope: Literal['global', 'nft', 'collection'] = 'global'
+    id: int | None = Field(None, ge=1)
+
+    @field_validator('from_', 'to')
+    @classmethod
+    def to_naive_utc(cls, v: datetime) -> datetime:
+        # rollup buckets are stored as naive UTC
+        return v.astimezone(timezone.utc).replace(tzinfo=None) if v.tzinfo else v
+
+    @model_validator(mode='after')
+    def check_range(self):
+        if self.to <= self.from_:
+            raise ValueError('to must be later than from')
+        if self.scope != 'global' and self.id is None:
+            raise ValueError(f'id is required for the {self.scope} scope')
+
+        step_seconds: int = 3600 if self.granularity == 'hour' else 86400
+        if (self.to - self.from_).total_seconds() / step_seconds > MAX_SERIES_BUCKETS:
+            raise ValueError(f'range covers more than {MAX_SERIES_BUCKETS} {self.granularity} buckets')
+        return self
@@ -1,11 +1,84 @@
 
+from flask import Response, jsonify, stream_with_context
+from sqlalchemy import Select, func, or_, select
 from datetime import datetime, timezone
+from typing import Callable
+import json
+
+from app.api.admin.schemas import AdminListQuery
 from app.collection.models import NFTCollection
 from app.user.models import User
 from app.nft.models import NFT, Like, NFTView, Offer
+from app.images import image_url
+from app.extensions import db
+
+EXPORT_BATCH_SIZE: int = 1000
+
+def admin_list(
+    statement: Select,
+    params: AdminListQuery,
+    key: str,
+    serialize: Callable,
+    sort_columns: dict,
+    statuses: dict | None = None,
+    search_columns: tuple = (),
+    entities: bool = True
+):
+    """Sorted, filtered admin listing of `statement`: one page as JSON or every row as an NDJSON stream.
+
+    `sort_columns` maps `sort` values to columns, its first entry is the default and the
+    tie-breaker. `statuses` maps `status` values to WHERE clauses. Pass `entities=False`
+    when `statement` selects plain rows rather than ORM objects.
+    """
+    if params.sort is not None and params.sort not in sort_columns:
+        return jsonify({'status': 'error', 'errors': [f"sort: must be one of {', '.join(sort_columns)}"]}), 400
+    if params.status is not None and params.status not in (statuses or {}):
+        return jsonify({'status': 'error', 'errors': [f"status: must be one of {', '.join(statuses or {})}"]}), 400
+
+    if params.status is not None:
+        statement = statement.where(statuses[params.status])
+    if params.search and search_columns:
+        pattern = f'%{params.search.strip()}%'
+        statement = statement.where(or_(*[column.ilike(pattern) for column in search_columns]))
+
+    tie_breaker = next(iter(sort_columns.values()))
+    column = sort_columns[params.sort] if params.sort else tie_breaker
+    direction = (lambda value: value.asc()) if params.order == 'asc' else (lambda value: value.desc())
+    ordering = [direction(column)] if column is tie_breaker else [direction(column), direction(tie_breaker)]
+    statement = statement.order_by(*ordering)
+
+    if params.format == 'ndjson':
+        return _ndjson_export(statement, serialize, entities)
+
+    total: int = db.session.scalar(select(func.count()).select_from(statement.order_by(None).subquery()))
+    page = statement.offset((params.page - 1) * params.per_page).limit(params.per_page)
+    result = db.session.execute(page)
+    rows = result.scalars() if entities else result
+
+    return jsonify({
+        'status': 'success',
+        key: [serialize(row) for row in rows],
+        'pagination': {
+            'page': params.page,
+            'per_page': params.per_page,
+            'total': total,
+            'pages': (total + params.per_page - 1) // params.per_page
+        }
+    }), 200
+
+def _ndjson_export(statement: Select, serialize: Callable, entities: bool) -> Response:
+    """Stream every row of `statement` as one JSON document per line, EXPORT_BATCH_SIZE rows in memory at a time"""
+    def generate():
+        result = db.session.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        rows = result.scalars() if entities else result
+        for batch in rows.partitions():
+            yield ''.join(json.dumps(serialize(row), default=str) + '\n' for row in batch)
+            db.session.expunge_all()
 
-def serialize_user(user: User) -> dict:
-    user_all_nfts = user.created_nfts + user.owned_nfts
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def serialize_user(row) -> dict:
+    user: User = row.User
 
     return {
         "id": user.id,
@@ -15,16 +88,16 @@ def serialize_user(user: User) -> dict:
         "role": user.role,
         "balance": f"{user.balance:.2f} ETH" if user.balance is not None else "0.00 ETH",
         "status": 'active' if not user.is_blocked else 'blocked',
-        "nfts": [
-            {
-                "id": nft.id,
-                "name": nft.name,
-                "price": f"{nft.price:.2f} ETH" if nft.price is not None else "0.00 ETH",
-                "image": f'/nft/{nft.token_id}/get-image',
-                "url": f'/nft/{nft.token_id}'
-            }
-            for nft in user_all_nfts
-        ]
+        "nftCount": row.nft_count
+    }
+
+def serialize_user_nft(nft: NFT) -> dict:
+    return {
+        "id": nft.id,
+        "name": nft.name,
+        "price": f"{nft.price:.2f} ETH" if nft.price is not None else "0.00 ETH",
+        "image": image_url('nft', nft),
+        "url": f'/nft/{nft.token_id}'
     }
 
 def serialize_nft(nft: NFT) -> dict:
@@ -37,7 +110,7 @@ def serialize_nft(nft: NFT) -> dict:
         "listed": nft.is_listed,  
         "status": 'active' if not nft.is_blocked else 'blocked',
         "createdAt": nft.created_at.strftime("%Y-%m-%d") if nft.created_at else None,
-        "image": f'/nft/{nft.token_id}/get-image',
+        "image": image_url('nft', nft),
         "url": f'/nft/{nft.token_id}'
     }
 
@@ -49,7 +122,7 @@ def serialize_collection(collection: NFTCollection) -> dict:
         "owner": collection.user.username if collection.user else None,
         "category": collection.category.name if collection.category else None,
         "royalty": float(collection.royalty),
-        "nftCount": len(collection.total_nfts),
+        "nftCount": collection.total_nfts,
         "floorPrice": collection.floor,
         "volume": collection.volume,
     }
@@ -100,6 +173,15 @@ def serialize_offer(offer: Offer) -> dict:
         "status": status,
     }
 
+def serialize_activity(row) -> dict:
+    return {
+        "id": row.id,
+        "nftName": row.nft_name,
+        "user": row.username,
+        "type": row.type,
+        "timestamp": row.created_at.strftime("%Y-%m-%d %H:%M:%S") if row.created_at else None,
+    }
+
 def serialize_like(like: Like) -> dict:
     return {
         "id": like.id,
@@ -0,0 +1,184 @@
+from sqlalchemy import Select, bindparam, func, select, tuple_
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from flask import current_app
+import threading
+import time
+
+from app.api.pagination import SORT_KEYS, CursorPageParams, decode_cursor, encode_cursor
+from app.api.search.fts import match_clause, match_value
+from app.api.serializers import NFT_INFO, Serializer
+from app.nft.models import NFT, Like
+from app.extensions import db
+from config import settings
+
+@dataclass(frozen=True)
+class NFTListing:
+    """Filters of one NFT list request; every list endpoint is described by one of these"""
+
+    sort_by: int = 1
+    exclude_blocked: bool = False
+    owner_id: int | None = None
+    creator_id: int | None = None
+    liked_by: int | None = None
+    collection_id: int | None = None
+    category_ids: tuple[int, ...] = ()
+    media_types: tuple[int, ...] = ()
+    min_price: float | None = None
+    max_price: float | None = None
+    is_listed: bool | None = None
+    search: str | None = None
+    search_value: str | None = field(default=None, init=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if self.search:
+            object.__setattr__(self, 'search_value', match_value(NFT, self.search, column='name'))
+
+    @property
+    def shape(self) -> tuple:
+        """Which predicates are present; requests of the same shape share one cached statement"""
+        return (
+            db.engine.dialect.name,
+            self.sort_by,
+            self.exclude_blocked,
+            self.owner_id is not None,
+            self.creator_id is not None,
+            self.liked_by is not None,
+            self.collection_id is not None,
+            bool(self.category_ids),
+            bool(self.media_types),
+            self.min_price is not None,
+            self.max_price is not None,
+            self.is_listed,
+            self.search_value is not None,
+        )
+
+    @property
+    def params(self) -> dict:
+        return {
+            'owner_id': self.owner_id,
+            'creator_id': self.creator_id,
+            'liked_by': self.liked_by,
+            'collection_id': self.collection_id,
+            'category_ids': list(self.category_ids),
+            'media_types': list(self.media_types),
+            'min_price': self.min_price,
+            'max_price': self.max_price,
+            'search_match': self.search_value,
+        }
+
+def _filtered(shape: tuple) -> Select:
+    (
+        _, _, exclude_blocked, by_owner, by_creator, by_liker,
+        by_collection, by_category, by_media_type, has_min, has_max, is_listed, has_search
+    ) = shape
+
+    query = select(NFT)
+
+    if by_liker:
+        query = query.join(Like, Like.nft_id == NFT.id).where(Like.user_id == bindparam('liked_by'))
+    if exclude_blocked:
+        query = query.where(NFT.is_blocked == False)
+    if by_owner:
+        query = query.where(NFT.owner_id == bindparam('owner_id'))
+    if by_creator:
+        query = query.where(NFT.creator_id == bindparam('creator_id'))
+    if by_collection:
+        query = query.where(NFT.collection_id == bindparam('collection_id'))
+    if by_category:
+        query = query.where(NFT.category_id.in_(bindparam('category_ids', expanding=True)))
+    if by_media_type:
+        query = query.where(NFT.media_type.in_(bindparam('media_types', expanding=True)))
+    if has_min:
+        query = query.where(NFT.price >= bindparam('min_price'))
+    if has_max:
+        query = query.where(NFT.price <= bindparam('max_price'))
+    if is_listed is not None:
+        query = query.where(NFT.is_listed.is_(is_listed))
+    if has_search:
+        query = query.where(match_clause(NFT, bindparam('search_match'), column='name'))
+
+    return query
+
+@lru_cache(maxsize=256)
+def page_statement(shape: tuple, after_cursor: bool, serializer: Serializer = NFT_INFO) -> Select:
+    """Keyset page statement for `shape`, built once and reused with new bind values"""
+    column, descending = SORT_KEYS[shape[1]]
+    query = serializer.apply(_filtered(shape))
+
+    if after_cursor:
+        key = tuple_(column, NFT.id)
+        bound = tuple_(bindparam('cursor_value', type_=column.type), bindparam('cursor_id', type_=NFT.id.type))
+        query = query.where(key < bound if descending else key > bound)
+
+    if descending:
+        query = query.order_by(column.desc(), NFT.id.desc())
+    else:
+        query = query.order_by(column.asc(), NFT.id.asc())
+
+    return query.limit(bindparam('page_limit'))
+
+@lru_cache(maxsize=256)
+def count_statement(shape: tuple) -> Select:
+    return select(func.count()).select_from(_filtered(shape).subquery())
+
+@lru_cache(maxsize=256)
+def media_type_facet_statement(shape: tuple) -> Select:
+    """Count of matching NFTs per media type; `shape` must not filter on media type itself"""
+    filtered = _filtered(shape).subquery()
+    return select(filtered.c.media_type, func.count()).group_by(filtered.c.media_type)
+
+class ListingMetrics:
+    """Per-shape execution counters; the single place listing queries are timed"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.shapes: dict[tuple, dict] = {}
+
+    def record(self, shape: tuple, elapsed_ms: float) -> None:
+        with self._lock:
+            entry = self.shapes.setdefault(shape, {'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            entry['calls'] += 1
+            entry['total_ms'] += elapsed_ms
+            entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+
+        if elapsed_ms >= settings.app.LISTING_SLOW_QUERY_MS:
+            current_app.logger.warning('Slow NFT listing query %.1f ms for shape %s', elapsed_ms, shape)
+
+    def snapshot(self) -> list[dict]:
+        with self._lock:
+            return [{'shape': list(shape), **entry} for shape, entry in self.shapes.items()]
+
+listing_metrics = ListingMetrics()
+
+def fetch_page(
+    listing: NFTListing, page: CursorPageParams, serializer: Serializer = NFT_INFO
+) -> tuple[list[NFT], str | None, int | None]:
+    """Return one keyset page of `listing` loaded for `serializer`, the next page cursor and an optional total"""
+    column, _ = SORT_KEYS[listing.sort_by]
+    shape = listing.shape
+    params = {**listing.params, 'page_limit': page.limit + 1}
+
+    if page.cursor:
+        params['cursor_value'], params['cursor_id'] = decode_cursor(page.cursor, column)
+
+    started = time.perf_counter()
+    nfts: list[NFT] = db.session.scalars(page_statement(shape, bool(page.cursor), serializer), params).unique().all()
+    total: int | None = (
+        db.session.scalar(count_statement(shape), listing.params) if page.includeTotal else None
+    )
+    listing_metrics.record(shape, (time.perf_counter() - started) * 1000)
+
+    next_cursor: str | None = None
+    if len(nfts) > page.limit:
+        nfts = nfts[:page.limit]
+        last: NFT = nfts[-1]
+        next_cursor = encode_cursor(getattr(last, column.key), last.id)
+
+    return nfts, next_cursor, total
+
+def media_type_facets(listing: NFTListing) -> dict[int, int]:
+    """Per media type counts of `listing` ignoring its own media type filter, for the drops sidebar"""
+    unfiltered = replace(listing, media_types=())
+    rows = db.session.execute(media_type_facet_statement(unfiltered.shape), unfiltered.params).all()
+    return {media_type: count for media_type, count in rows if media_type is not None}
@@ -3,20 +3,22 @@ from datetime import datetime, timezone
 from decimal import Decimal
 from flask import abort
 from werkzeug.datastructures.file_storage import FileStorage
-from werkzeug.utils import secure_filename
-from sqlalchemy.orm import joinedload 
 from pydantic import ValidationError
 from flask.globals import request, g
 from requests import Response, get
 from flask.json import jsonify
-from sqlalchemy import func
 from uuid import uuid4
 
 from app.api.nft.schemas import NFTCreate, NFTCreateResponse, NFTFilterSchema, OfferCreate
-from app.nft.models import NFT, Category, Like, Offer, NFTView
-from app.collection.models import NFTCollection
+from app.nft.models import NFT, Category, MediaType, Offer, Sale
+from app.collection.models import CollectionStats, NFTCollection
+from app.collection.rankings import rankings_refresher
+from app.api.listing import NFTListing, fetch_page, media_type_facets
+from app.api.serializers import NFT_INFO
+from app.nft.likes import like_counter, toggle_like
+from app.storage import store_upload
 from app.jwt.decorators import jwt_required
-from app.utils import allowed_image_type
+from app.utils import allowed_image_type, lock_users, to_money
 from app.api.nft import nft_api_bp
 from app.user.models import User
 from app.extensions import db
@@ -35,8 +37,7 @@ def create_nft():
         return jsonify({'errors': ['No file selected']}), 400
         
     if file and allowed_image_type(file.filename):
-        filename: str = f'{uuid4().hex}-{secure_filename(file.filename)}'
-        file.save(settings.db.UPLOAD_FOLDER / 'nft-images' / filename)
+        filename: str = store_upload(file, settings.db.UPLOAD_FOLDER / 'nft-images')
     else:
         return jsonify({'errors': ['Invalid file type']}), 400
 
@@ -63,6 +64,7 @@ def create_nft():
         name=data.name.strip(),
         description=data.description.strip(),
         image_file=filename,
+        media_type=MediaType.from_filename(filename),
         price=data.price,
         category_id=data.category_id,
         creator_id=user_jwt_payload.get('user_id'),
@@ -78,6 +80,7 @@ def create_nft():
         nft.collection_id = collection.id
 
     db.session.add(nft)
+    CollectionStats.refresh(nft.collection_id)
     db.session.commit()
 
     return jsonify(NFTCreateResponse.model_validate(nft.to_dict()).model_dump()), 200
@@ -91,12 +94,9 @@ def get_nft_by_category(category_id):
     try:
 
         category_nfts: list[NFT] = (
-            db.session.query(NFT)
-            .outerjoin(NFT.likes)
-            .options(joinedload(NFT.likes))
+            NFT_INFO.apply(db.session.query(NFT))
             .filter(NFT.category_id == category.id, NFT.is_blocked == False)
-            .group_by(NFT.id)
-            .order_by(func.count(Like.id).desc())
+            .order_by(NFT.likes_count.desc(), NFT.id.desc())
             .limit(5)
             .all()
         )
@@ -106,7 +106,7 @@ def get_nft_by_category(category_id):
         {'status': 'success', 'nfts': []}
     ), 200
 
-    category_nfts_dicts: list[dict] = [nft.info() for nft in category_nfts]
+    category_nfts_dicts: list[dict] = NFT_INFO.many(category_nfts)
     return jsonify(
         {'status': 'success', 'nfts': category_nfts_dicts}
     ), 200
@@ -126,29 +126,16 @@ def like_nft(token_id):
     user_jwt_payload: dict = g.get('jwt_payload', None)
     if not user_jwt_payload:
         return jsonify({'status': 'error', 'errors': ['Invalid Token']}), 400
-    
-    nft_liked: Like = Like.query.filter_by(
-        user_id=user_jwt_payload.get('user_id'), 
-        token_id=nft.token_id
-    ).first()
-
-    if not nft_liked:
 
-        nft_like = Like(
-            nft_id=nft.id,
-            token_id=nft.token_id,
-            user_id=user_jwt_payload.get('user_id')
-        )
-        db.session.add(nft_like)
-        db.session.commit()
-
-        return jsonify({'status': 'success', 'message': 'liked', 'user': nft_like.to_dict()}), 200
+    nft_id, likes_count = nft.id, nft.likes_count
+    liked: bool = toggle_like(user_jwt_payload.get('user_id'), nft)
 
-    else:
-        db.session.delete(nft_liked)
-        db.session.commit()
-
-        return jsonify({'status': 'success', 'message': 'unLiked'}), 200
+    return jsonify({
+        'status': 'success',
+        'message': 'liked' if liked else 'unLiked',
+        'liked': liked,
+        'likes': likes_count + like_counter.pending(nft_id)
+    }), 200
     
 @nft_api_bp.route('/price/<token_id>')
 def get_rate(token_id):
@@ -190,7 +177,7 @@ def make_offer(token_id):
     if int(user_id) == nft.creator_id and int(user_id) == nft.owner_id:
         return jsonify({'status': 'error', 'errors': ['Can not make offer to owned nft']}), 400
     
-    user: User = User.query.filter_by(id=user_id).first()
+    user: User = lock_users(user_id).get(int(user_id))
     if not user:
         return jsonify({'errors': ['Not Found']}), 404
 
@@ -233,6 +220,7 @@ def make_offer(token_id):
     )
 
     db.session.add(offer)
+    nft.offers_count = NFT.offers_count + 1
     db.session.commit()
 
     return jsonify({'message': 'Offer submitted successfully'}), 200
@@ -257,6 +245,7 @@ def unlist_nft(token_id):
         return jsonify({'status': 'error', 'errors': ['Can not unlist item if you does not own it']}), 400
     
     nft.is_listed = False
+    CollectionStats.refresh(nft.collection_id)
 
     db.session.commit()
 
@@ -282,6 +271,7 @@ def list_nft(token_id):
         return jsonify({'status': 'error', 'errors': ['Can not list item if you does not own it']}), 400
     
     nft.is_listed = True
+    CollectionStats.refresh(nft.collection_id)
 
     db.session.commit()
 
@@ -290,7 +280,7 @@ def list_nft(token_id):
 @nft_api_bp.route('/<token_id>/buy', methods=['POST'])
 @jwt_required
 def buy_nft(token_id):
-    nft: NFT = NFT.query.filter_by(token_id=token_id).first()
+    nft: NFT = NFT.query.filter_by(token_id=token_id).with_for_update(of=NFT).first()
     if not nft:
         return jsonify({'errors': ['Not Found']}), 404
 
@@ -306,35 +296,52 @@ def buy_nft(token_id):
     if int(user_id) == nft.owner_id:
         return jsonify({'status': 'error', 'errors': ['Can not buy item if you already own it']}), 400
     
-    user: User = User.query.filter_by(id=user_id).first()
+    collection_owner_id: int | None = nft.collection.user_id if nft.collection else None
+    users: dict[int, User] = lock_users(user_id, nft.owner_id, collection_owner_id)
+
+    user: User = users.get(int(user_id))
     if not user:
         return jsonify({'errors': ['Not Found']}), 404
     
     if user.balance < nft.price:
         return jsonify({'status': 'error', 'errors': ['Not Enough Balance']}), 400
     
-    user.balance -= nft.price
-    previous_owner: User = User.query.get(nft.owner_id)
+    user.balance = to_money(user.balance, -nft.price)
+    previous_owner: User = users.get(nft.owner_id)
 
     royalty = Decimal("0")
     collection_owner: User = None
 
     if nft.collection:
-        collection_owner = User.query.get(nft.collection.user_id)
-        royalty = nft.price * (nft.collection.royalty / 100)
+        collection_owner = users.get(collection_owner_id)
+        royalty = to_money(nft.price * (nft.collection.royalty / 100))
 
-    if previous_owner:
-        if collection_owner and previous_owner.id == collection_owner.id:
-            previous_owner.balance += nft.price
-        else:
-            if collection_owner:
-                collection_owner.balance += royalty
-            previous_owner.balance += nft.price - royalty
+    try:
+        if previous_owner:
+            if collection_owner and previous_owner.id == collection_owner.id:
+                previous_owner.balance = to_money(previous_owner.balance, nft.price)
+            else:
+                if collection_owner:
+                    collection_owner.balance = to_money(collection_owner.balance, royalty)
+                previous_owner.balance = to_money(previous_owner.balance, nft.price, -royalty)
+    except ValueError:
+        db.session.rollback()
+        return jsonify({'status': 'error', 'errors': ['Seller balance limit exceeded']}), 400
+
+    db.session.add(Sale(
+        nft_id=nft.id,
+        collection_id=nft.collection_id,
+        seller_id=nft.owner_id,
+        buyer_id=user.id,
+        price=nft.price
+    ))
 
     nft.owner_id = user.id
     nft.is_listed = False
+    CollectionStats.refresh(nft.collection_id)
 
     db.session.commit()
+    rankings_refresher.notify()
 
     return jsonify({'message': 'Offer submitted successfully'}), 200
 
@@ -347,58 +354,37 @@ def drops_filter():
         error_messages = [f"{err['loc'][0]}: {err['msg']}" for err in errors]
         return jsonify({'status': 'error', 'errors': error_messages}), 400
 
-    query = NFT.query.filter(NFT.is_blocked == False)
-
-    if filters.categoryInputs:
-        query = query.filter(NFT.category_id.in_(filters.categoryInputs))
-
-    query = query.filter(NFT.price >= filters.minValue)
-
-    if filters.maxValue != -1:
-        query = query.filter(NFT.price <= filters.maxValue)
-
+    is_listed: bool | None = None
     if filters.isListedInputs:
         if 1 in filters.isListedInputs and 2 in filters.isListedInputs: 
             pass
         elif 1 in filters.isListedInputs:
-            query = query.filter(NFT.is_listed.is_(True))
+            is_listed = True
         elif 2 in filters.isListedInputs:
-            query = query.filter(NFT.is_listed.is_(False))
-
-    if filters.search:
-        search_term = f"%{filters.search.strip().lower()}%"
-        query = query.filter(func.lower(NFT.name).like(search_term))
-
-    if filters.sortBy == 1:
-        query = (
-            query.outerjoin(Offer)
-            .group_by(NFT.id)
-            .order_by(func.count(Offer.id).desc())
+            is_listed = False
+
+    listing: NFTListing = NFTListing(
+        sort_by=filters.sortBy,
+        exclude_blocked=True,
+        category_ids=tuple(filters.categoryInputs),
+        min_price=filters.minValue,
+        max_price=filters.maxValue if filters.maxValue != -1 else None,
+        is_listed=is_listed,
+        search=filters.search,
+        media_types=tuple(filters.fileTypeInputs)
     )
-    elif filters.sortBy == 2:
-        query = query.order_by(NFT.price.asc())
-    elif filters.sortBy == 3:
-        query = query.order_by(NFT.price.desc())
-    elif filters.sortBy == 4:
-        query = query.order_by(NFT.created_at.asc())
-    elif filters.sortBy == 5:
-        query = query.order_by(NFT.created_at.desc())
-    elif filters.sortBy == 6:
-        query = (
-            query.outerjoin(NFTView)
-            .group_by(NFT.id)
-            .order_by(func.count(NFTView.id).desc())
-        )
-    elif filters.sortBy == 7:
-        query = (
-            query.outerjoin(Like)
-            .group_by(NFT.id)
-            .order_by(func.count(Like.id).desc())
-        )
-
-    nfts = query.all()
 
-    if filters.fileTypeInputs:
-        nfts: list[NFT] = [nft for nft in nfts if nft.extension_id in filters.fileTypeInputs]
-
-    return jsonify({'nfts': [nft.info() for nft in nfts]}), 200
\ No newline at end of file
+    try:
+        nfts, next_cursor, total = fetch_page(listing, filters)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'errors': [str(e)]}), 400
+
+    response: dict = {
+        'nfts': NFT_INFO.many(nfts),
+        'next_cursor': next_cursor,
+        'total_estimate': total
+    }
+    if filters.includeFacets:
+        response['file_type_counts'] = media_type_facets(listing)
+
+    return jsonify(response), 200
\ No newline at end of file
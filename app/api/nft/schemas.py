@@ -7,6 +7,7 @@ from datetime import timedelta
 from decimal import Decimal
 
 from app.collection.models import NFTCollection
+from app.api.pagination import CursorPageParams
 from app.nft.models import Category
 
 class NFTCreate(BaseModel):
@@ -100,7 +101,7 @@ class OfferCreate(BaseModel):
         }
         return mapping[self.expires_in]
     
-class NFTFilterSchema(BaseModel):
+class NFTFilterSchema(CursorPageParams):
     categoryInputs: List[int] = []
     fileTypeInputs: List[int] = []
     isListedInputs: List[int] = []
@@ -108,6 +109,7 @@ class NFTFilterSchema(BaseModel):
     minValue: float = 0
     maxValue: float = -1
     search: str | None = None
+    includeFacets: bool = False
 
     @field_validator("categoryInputs", "fileTypeInputs", "isListedInputs", mode="before")
     @classmethod
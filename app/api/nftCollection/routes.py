@@ -1,17 +1,17 @@
 
-from decimal import ROUND_HALF_UP, Decimal
 from pydantic import ValidationError
 from flask.globals import request, g
 from flask.json import jsonify
-from sqlalchemy import func
 
-from app.api.nftCollection.schemas import NFTCollectionFilters, NFTCollectionResponse
+from app.api.nftCollection.schemas import CollectionRankingsQuery, NFTCollectionFilters, NFTCollectionResponse
 from app.api.nftCollection import nft_collection_api_bp
+from app.collection.models import CollectionRanking, NFTCollection
+from app.collection.rankings import rankings_refresher
 from app.collection.schemas import CollectionCreate
-from app.collection.models import NFTCollection
 from app.jwt.decorators import jwt_required
+from app.api.listing import NFTListing, fetch_page
+from app.api.serializers import NFT_INFO
 from app.api.utils import validate_image
-from app.nft.models import NFT, Like, NFTView, Offer
 from app.extensions import db
 from config import settings
 
@@ -91,90 +91,51 @@ def get_collection_nfts(collection_id):
         error_messages = [f"{err['loc'][0]}: {err['msg']}" for err in errors]
         return jsonify({'status': 'error', 'errors': error_messages}), 400
 
-    has_nfts = NFT.query.filter_by(collection_id=collection.id).all()
-    if not has_nfts:
-        return jsonify({'status': 'success', 'nfts': []}), 200
-    
-    query = NFT.query.filter(NFT.collection_id == collection.id)
-
+    is_listed: bool | None = None
     if filters.currentTab == 2:
-        query = query.filter(NFT.is_listed == True)
+        is_listed = True
 
     elif filters.currentTab == 3:
-        query = query.filter(NFT.is_listed == False)
+        is_listed = False
 
-    if filters.sortBy == 1:
-        query = (
-            query.outerjoin(Offer)
-            .group_by(NFT.id)
-            .order_by(func.count(Offer.id).desc())
+    listing: NFTListing = NFTListing(
+        sort_by=filters.sortBy,
+        collection_id=collection.id,
+        is_listed=is_listed
     )
-    elif filters.sortBy == 2:
-        query = query.order_by(NFT.price.asc())
-    elif filters.sortBy == 3:
-        query = query.order_by(NFT.price.desc())
-    elif filters.sortBy == 4:
-        query = query.order_by(NFT.created_at.asc())
-    elif filters.sortBy == 5:
-        query = query.order_by(NFT.created_at.desc())
-    elif filters.sortBy == 6:
-        query = (
-            query.outerjoin(NFTView)
-            .group_by(NFT.id)
-            .order_by(func.count(NFTView.id).desc())
-        )
-    elif filters.sortBy == 7:
-        query = (
-            query.outerjoin(Like)
-            .group_by(NFT.id)
-            .order_by(func.count(Like.id).desc())
-        )
-
-    nfts: list[NFT] = query.all()
-
-    collection_nfts_dicts: list[dict] = [nft.info() for nft in nfts]
+
+    try:
+        nfts, next_cursor, total = fetch_page(listing, filters)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'errors': [str(e)]}), 400
+
+    collection_nfts_dicts: list[dict] = NFT_INFO.many(nfts)
 
     return jsonify(
-        {'status': 'success', 'nfts': collection_nfts_dicts}
+        {'status': 'success', 'nfts': collection_nfts_dicts, 'next_cursor': next_cursor, 'total_estimate': total}
     ), 200
     
 @nft_collection_api_bp.route('/top-collections')
 def get_nft_collection_rankings():
-    collections = NFTCollection.query.all()
-
-    collection_data = []
-
-    for collection in collections:
-        nfts = collection.get_nfts()
-        if not nfts:
-            continue
-
-        total_volume = sum(nft.price for nft in nfts if nft.price)
-
-        total_sales = len([nft for nft in nfts if nft.price and nft.is_listed])
-
-        floor_prices = [nft.price for nft in nfts if nft.price]
-        floor_price = min(floor_prices) if floor_prices else Decimal("0.00")
-
-        total_nfts = collection.get_nfts_count
-
-        collection_data.append({
-            "id": collection.id,
-            "name": collection.name,
-            "volume": total_volume.quantize(Decimal('1.00'), rounding=ROUND_HALF_UP),
-            "floor_price": floor_price.quantize(Decimal('1.00'), rounding=ROUND_HALF_UP),
-            "sales": total_sales,
-            "owners": collection.owners_count,
-            'total_nfts': total_nfts
-        })
-
-    # Sort by volume descending
-    sorted_collections = sorted(collection_data, key=lambda c: float(c["volume"]), reverse=True)
-
-    # Add ranks
-    for idx, c in enumerate(sorted_collections):
-        c["rank"] = idx + 1
+    try:
+        params: CollectionRankingsQuery = CollectionRankingsQuery(**request.args.to_dict())
+    except ValidationError as e:
+        errors = e.errors()
+        error_messages = [f"{err['loc'][0]}: {err['msg']}" for err in errors]
+        return jsonify({'status': 'error', 'errors': error_messages}), 400
 
-    top_10_collections = sorted_collections[:10]
+    if not db.session.query(CollectionRanking.rank).filter_by(period=params.window).first():
+        # never computed yet: let the background refresher build it instead of this request
+        rankings_refresher.notify()
+        return jsonify([]), 200
+
+    rankings: list[CollectionRanking] = (
+        CollectionRanking.query
+        .filter(CollectionRanking.period == params.window)
+        .order_by(CollectionRanking.rank.asc())
+        .offset((params.page - 1) * params.per_page)
+        .limit(params.per_page)
+        .all()
+    )
 
-    return jsonify(top_10_collections), 200
\ No newline at end of file
+    return jsonify([ranking.to_dict() for ranking in rankings]), 200
@@ -1,7 +1,10 @@
 
-from pydantic import BaseModel, ConfigDict, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import Literal
 from datetime import datetime
 
+from app.api.pagination import CursorPageParams
+
 class NFTCollectionResponse(BaseModel):
     id: int
     name: str
@@ -23,7 +26,7 @@ class NFTCollectionResponse(BaseModel):
         arbitrary_types_allowed=True
     )
 
-class NFTCollectionFilters(BaseModel):
+class NFTCollectionFilters(CursorPageParams):
     currentTab: int = 1
     sortBy: int = 1
 
@@ -39,4 +42,9 @@ class NFTCollectionFilters(BaseModel):
     def validate_current_tab(cls, v):
         if v not in {1, 2, 3}:
             raise ValueError("sortBy must be one of 1, 2 or 3")
-        return v
\ No newline at end of file
+        return v
+
+class CollectionRankingsQuery(BaseModel):
+    window: Literal['24h', '7d', '30d', 'all'] = 'all'
+    page: int = Field(1, ge=1)
+    per_page: int = Field(10, ge=1, le=100)
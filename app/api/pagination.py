@@ -0,0 +1,62 @@
+from sqlalchemy.orm import InstrumentedAttribute
+from pydantic import BaseModel, Field
+from datetime import datetime
+from decimal import Decimal
+import binascii
+import base64
+import json
+
+from app.nft.models import NFT
+
+DEFAULT_PAGE_SIZE: int = 48
+MAX_PAGE_SIZE: int = 200
+
+# sortBy -> (sort column, descending)
+SORT_KEYS: dict[int, tuple[InstrumentedAttribute, bool]] = {
+    1: (NFT.offers_count, True),
+    2: (NFT.price, False),
+    3: (NFT.price, True),
+    4: (NFT.created_at, False),
+    5: (NFT.created_at, True),
+    6: (NFT.views_count, True),
+    7: (NFT.likes_count, True),
+}
+
+class CursorPageParams(BaseModel):
+    cursor: str | None = None
+    limit: int = Field(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+    includeTotal: bool = False
+
+def encode_cursor(value, row_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    elif isinstance(value, Decimal):
+        value = str(value)
+
+    raw: bytes = json.dumps([value, row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor: str, column: InstrumentedAttribute) -> tuple:
+    try:
+        raw: bytes = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        value, row_id = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+
+    if not isinstance(row_id, int):
+        raise ValueError('Invalid cursor')
+
+    try:
+        python_type = column.type.python_type
+        if value is None:
+            pass
+        elif python_type is datetime:
+            value = datetime.fromisoformat(value)
+        elif python_type is Decimal:
+            value = Decimal(value)
+        else:
+            value = python_type(value)
+    except (ArithmeticError, TypeError, ValueError):
+        raise ValueError('Invalid cursor')
+
+    return value, row_id
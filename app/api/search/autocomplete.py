@@ -0,0 +1,305 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect
+from dataclasses import dataclass
+from bisect import bisect_left, insort
+from flask import Flask
+import threading
+import logging
+import time
+import sys
+import re
+
+from app.collection.models import NFTCollection
+from app.user.models import User
+from app.nft.models import NFT
+from app.images import image_url
+from app.extensions import db
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r'\w+', re.UNICODE)
+SCAN_LIMIT: int = 512
+ENTRY_OVERHEAD_BYTES: int = 200
+
+@dataclass(slots=True)
+class Suggestion:
+    kind: str
+    id: int
+    title: str
+    subtitle: str
+    image: str
+    url: str
+    weight: int = 0
+    is_blocked: bool = False
+
+    def to_dict(self) -> dict:
+        return {
+            'type': self.kind,
+            'id': self.id,
+            'title': self.title,
+            'subtitle': self.subtitle,
+            'image': self.image,
+            'url': self.url,
+        }
+
+def _nft_suggestion(nft: NFT) -> Suggestion:
+    return Suggestion(
+        kind='nft',
+        id=nft.id,
+        title=nft.name,
+        subtitle='',
+        image=image_url('nft', nft),
+        url=f'/nft/{nft.token_id}',
+        weight=nft.likes_count or 0,
+        is_blocked=bool(nft.is_blocked)
+    )
+
+def _collection_suggestion(collection: NFTCollection) -> Suggestion:
+    return Suggestion(
+        kind='collection',
+        id=collection.id,
+        title=collection.name,
+        subtitle='',
+        image=image_url('collection-featured', collection),
+        url=f'/collection/{collection.id}'
+    )
+
+def _user_suggestion(user: User) -> Suggestion:
+    return Suggestion(
+        kind='user',
+        id=user.id,
+        title=user.username,
+        subtitle=user.display_name or '',
+        image=image_url('user-logo', user),
+        url=f'/user/profile/{user.id}',
+        is_blocked=bool(user.is_blocked)
+    )
+
+# model -> (suggestion kind, factory, attributes whose change needs a reindex)
+SUGGESTION_FACTORIES = {
+    NFT: ('nft', _nft_suggestion, ('name', 'is_blocked', 'image_file')),
+    NFTCollection: ('collection', _collection_suggestion, ('name', 'featured_file')),
+    User: ('user', _user_suggestion, ('username', 'display_name', 'is_blocked', 'profile_avatar')),
+}
+
+class AutocompleteIndex:
+    """In-process prefix index over NFT names, collection names and usernames.
+
+    Every word of an indexed title is stored in one sorted key list, so a prefix
+    lookup is a bisect plus a bounded scan. Each worker process keeps its own copy,
+    kept current by session commit hooks and rebuilt every AUTOCOMPLETE_REBUILD_SECONDS.
+    Builds run in a background thread; lookups return nothing until the first one finishes.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._keys: list[tuple[str, str, int]] = []
+        self._entries: dict[tuple[str, int], Suggestion] = {}
+        self._memory_bytes: int = 0
+        self._built_at: float | None = None
+        self._rebuilding: bool = False
+        self._backlog: list[tuple[list[Suggestion], list[tuple[str, int]]]] = []
+        self.app: Flask | None = None
+        self.skipped: int = 0
+
+    def init_app(self, app: Flask) -> None:
+        self.app = app
+        app.extensions['autocomplete_index'] = self
+
+        if not app.testing:
+            self._rebuild_in_background()
+
+    @staticmethod
+    def _words(text: str) -> list[str]:
+        return sorted(set(WORD_PATTERN.findall(text.lower())))
+
+    @staticmethod
+    def _entry_size(suggestion: Suggestion, words: list[str]) -> int:
+        strings = (suggestion.title, suggestion.subtitle, suggestion.image, suggestion.url, *words)
+        return ENTRY_OVERHEAD_BYTES * (1 + len(words)) + sum(sys.getsizeof(value) for value in strings)
+
+    def _index_words(self, suggestion: Suggestion) -> list[str]:
+        return self._words(f'{suggestion.title} {suggestion.subtitle}')
+
+    def _remove(self, kind: str, item_id: int) -> None:
+        suggestion = self._entries.pop((kind, item_id), None)
+        if not suggestion:
+            return
+
+        words = self._index_words(suggestion)
+        for word in words:
+            position = bisect_left(self._keys, (word, kind, item_id))
+            if position < len(self._keys) and self._keys[position] == (word, kind, item_id):
+                del self._keys[position]
+        self._memory_bytes -= self._entry_size(suggestion, words)
+
+    def _admit(self, suggestion: Suggestion) -> list[str] | None:
+        """Store the entry if it fits the memory budget; returns its words, or None if skipped"""
+        words = self._index_words(suggestion)
+        size = self._entry_size(suggestion, words)
+        if self._memory_bytes + size > settings.app.AUTOCOMPLETE_MEMORY_BUDGET_MB * 1024 * 1024:
+            self.skipped += 1
+            return None
+
+        self._entries[(suggestion.kind, suggestion.id)] = suggestion
+        self._memory_bytes += size
+        return words
+
+    def _put(self, suggestion: Suggestion) -> None:
+        self._remove(suggestion.kind, suggestion.id)
+
+        for word in self._admit(suggestion) or ():
+            insort(self._keys, (word, suggestion.kind, suggestion.id))
+
+    def build(self) -> None:
+        """Load every indexable row; swaps the new index in atomically.
+
+        Keys are appended unsorted and sorted once at the end. Changes committed
+        while a background rebuild runs are replayed onto the new index.
+        """
+        fresh = AutocompleteIndex()
+        queries = (
+            (NFT.query.with_entities(
+                NFT.id, NFT.name, NFT.token_id, NFT.likes_count, NFT.is_blocked, NFT.image_file
+            ), _nft_suggestion),
+            (NFTCollection.query.with_entities(
+                NFTCollection.id, NFTCollection.name, NFTCollection.featured_file
+            ), _collection_suggestion),
+            (User.query.with_entities(
+                User.id, User.username, User.display_name, User.is_blocked, User.profile_avatar
+            ), _user_suggestion),
+        )
+        for query, factory in queries:
+            for row in query.yield_per(1000):
+                suggestion = factory(row)
+                for word in fresh._admit(suggestion) or ():
+                    fresh._keys.append((word, suggestion.kind, suggestion.id))
+        fresh._keys.sort()
+
+        with self._lock:
+            self._keys = fresh._keys
+            self._entries = fresh._entries
+            self._memory_bytes = fresh._memory_bytes
+            self.skipped = fresh.skipped
+            self._built_at = time.monotonic()
+
+            backlog, self._backlog = self._backlog, []
+            for upserts, removals in backlog:
+                self._apply(upserts, removals)
+
+    def _rebuild_in_background(self) -> None:
+        def run():
+            with self.app.app_context():
+                try:
+                    self.build()
+                except Exception:
+                    logger.exception('Autocomplete index rebuild failed')
+                finally:
+                    db.session.remove()
+                    with self._lock:
+                        self._rebuilding = False
+                        self._backlog.clear()
+
+        self._rebuilding = True
+        threading.Thread(target=run, name='autocomplete-rebuild', daemon=True).start()
+
+    def ensure_built(self) -> bool:
+        """Start a background build if the index is missing or stale; True once it can serve lookups"""
+        with self._lock:
+            if self._rebuilding:
+                return self._built_at is not None
+            if (
+                self._built_at is None
+                or time.monotonic() - self._built_at > settings.app.AUTOCOMPLETE_REBUILD_SECONDS
+            ):
+                self._rebuild_in_background()
+        return self._built_at is not None
+
+    def _apply(self, upserts: list[Suggestion], removals: list[tuple[str, int]]) -> None:
+        for kind, item_id in removals:
+            self._remove(kind, item_id)
+        for suggestion in upserts:
+            self._put(suggestion)
+
+    def apply(self, upserts: list[Suggestion], removals: list[tuple[str, int]]) -> None:
+        with self._lock:
+            if self._rebuilding:
+                self._backlog.append((upserts, removals))
+            if self._built_at is not None:
+                self._apply(upserts, removals)
+
+    def suggest(self, term: str, limit: int = 8) -> list[Suggestion]:
+        """Top `limit` unblocked entries with a word starting with each word of `term`"""
+        words = WORD_PATTERN.findall(term.lower())
+        if not words:
+            return []
+
+        if not self.ensure_built():
+            return []
+        prefix, rest = words[-1], words[:-1]
+
+        with self._lock:
+            start = bisect_left(self._keys, (prefix,))
+            candidates: dict[tuple[str, int], Suggestion] = {}
+            for word, kind, item_id in self._keys[start:start + SCAN_LIMIT]:
+                if not word.startswith(prefix):
+                    break
+
+                suggestion = self._entries[(kind, item_id)]
+                if suggestion.is_blocked:
+                    continue
+                if rest and not all(
+                    any(indexed.startswith(part) for indexed in self._index_words(suggestion))
+                    for part in rest
+                ):
+                    continue
+                candidates[(kind, item_id)] = suggestion
+
+        lowered = term.strip().lower()
+        return sorted(
+            candidates.values(),
+            key=lambda item: (not item.title.lower().startswith(lowered), -item.weight, len(item.title))
+        )[:limit]
+
+    def stats(self) -> dict:
+        return {
+            'entries': len(self._entries),
+            'keys': len(self._keys),
+            'memory_bytes': self._memory_bytes,
+            'memory_budget_bytes': settings.app.AUTOCOMPLETE_MEMORY_BUDGET_MB * 1024 * 1024,
+            'skipped': self.skipped,
+        }
+
+autocomplete_index = AutocompleteIndex()
+
+@event.listens_for(Session, 'after_flush')
+def _collect_autocomplete_changes(session: Session, flush_context) -> None:
+    pending = session.info.setdefault('autocomplete_pending', {'upserts': {}, 'removals': set()})
+
+    for obj in session.new | session.dirty:
+        factory = SUGGESTION_FACTORIES.get(type(obj))
+        if not factory:
+            continue
+
+        _, build, watched = factory
+        state = inspect(obj)
+        if obj in session.dirty and not any(state.attrs[name].history.has_changes() for name in watched):
+            continue
+        suggestion = build(obj)
+        pending['upserts'][(suggestion.kind, suggestion.id)] = suggestion
+
+    for obj in session.deleted:
+        factory = SUGGESTION_FACTORIES.get(type(obj))
+        if factory:
+            pending['removals'].add((factory[0], obj.id))
+
+@event.listens_for(Session, 'after_commit')
+def _apply_autocomplete_changes(session: Session) -> None:
+    pending = session.info.pop('autocomplete_pending', None)
+    if pending:
+        autocomplete_index.apply(list(pending['upserts'].values()), list(pending['removals']))
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_autocomplete_changes(session: Session) -> None:
+    session.info.pop('autocomplete_pending', None)
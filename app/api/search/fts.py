@@ -0,0 +1,187 @@
+from sqlalchemy import BindParameter, Float, Integer, func, literal_column, or_, select, text
+from markupsafe import Markup, escape
+from sqlalchemy.exc import DBAPIError
+import logging
+import re
+
+from app.extensions import db
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+MAX_QUERY_TOKENS: int = 8
+
+# table -> indexed columns, most important first (first column weighs most in ranking)
+FTS_COLUMNS: dict[str, tuple[str, ...]] = {
+    'nfts': ('name', 'description'),
+    'nftcollections': ('name',),
+    'users': ('username',),
+}
+
+# columns searched with ILIKE '%term%' (admin lists, LIKE fallbacks); Postgres gets trigram indexes for them
+TRIGRAM_COLUMNS: dict[str, tuple[str, ...]] = {
+    'nfts': ('name', 'token_id'),
+    'nftcollections': ('name',),
+    'users': ('username', 'display_name', 'email'),
+}
+
+logger = logging.getLogger(__name__)
+
+def _fts_table(table: str) -> str:
+    return f'{table}_fts'
+
+def _install_sqlite(connection) -> None:
+    for table, columns in FTS_COLUMNS.items():
+        fts = _fts_table(table)
+        column_list = ', '.join(columns)
+        new_values = ', '.join(f'new.{column}' for column in columns)
+        old_values = ', '.join(f'old.{column}' for column in columns)
+
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+            f"{column_list}, content='{table}', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        ))
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values}); END"
+        ))
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); END"
+        ))
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {column_list} ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+            f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values}); END"
+        ))
+        connection.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+def _postgres_vector(columns: tuple[str, ...]) -> str:
+    weights = 'ABCD'
+    return ' || '.join(
+        f"setweight(to_tsvector('simple', coalesce({column}, '')), '{weights[min(index, 3)]}')"
+        for index, column in enumerate(columns)
+    )
+
+def _install_postgres(connection) -> None:
+    for table, columns in FTS_COLUMNS.items():
+        connection.execute(text(
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS ({_postgres_vector(columns)}) STORED"
+        ))
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector ON {table} USING GIN (search_vector)"
+        ))
+
+    try:
+        with connection.begin_nested():
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    except DBAPIError as e:
+        logger.warning('pg_trgm is not available, ILIKE searches will scan: %s', e.orig)
+        return
+
+    for table, columns in TRIGRAM_COLUMNS.items():
+        for column in columns:
+            connection.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_{column}_trgm ON {table} USING GIN ({column} gin_trgm_ops)"
+            ))
+
+def install_fts(db) -> None:
+    """Create (or rebuild) the full-text index of every searchable table"""
+    with db.engine.begin() as connection:
+        if connection.dialect.name == 'sqlite':
+            _install_sqlite(connection)
+        elif connection.dialect.name == 'postgresql':
+            _install_postgres(connection)
+
+def query_tokens(term: str | None) -> list[str]:
+    if not term:
+        return []
+    return TOKEN_PATTERN.findall(term.lower())[:MAX_QUERY_TOKENS]
+
+def _sqlite_match(tokens: list[str], column: str | None = None) -> str:
+    expression = ' '.join(f'"{token}"*' for token in tokens)
+    return f'{column} : ({expression})' if column else expression
+
+def _postgres_query(tokens: list[str], weight: str = ''):
+    return func.to_tsquery('simple', ' & '.join(f'{token}:*{weight}' for token in tokens))
+
+def search_ids(model, term: str, limit: int | None = None):
+    """Select `id` of `model` rows matching every token of `term` as a prefix, best match first"""
+    tokens = query_tokens(term)
+    if not tokens:
+        return None
+
+    table: str = model.__tablename__
+    columns = FTS_COLUMNS[table]
+    dialect: str = db.engine.dialect.name
+
+    if dialect == 'sqlite':
+        fts = _fts_table(table)
+        weights = ', '.join(str(10.0 / (index + 1)) for index in range(len(columns)))
+        statement = f'SELECT rowid AS id, bm25({fts}, {weights}) AS rank FROM {fts} WHERE {fts} MATCH :match ORDER BY rank'
+        if limit:
+            statement += f' LIMIT {int(limit)}'
+        return text(statement).bindparams(match=_sqlite_match(tokens)).columns(id=Integer, rank=Float)
+
+    if dialect == 'postgresql':
+        ts_query = _postgres_query(tokens)
+        vector = literal_column(f'{table}.search_vector')
+        rank = func.ts_rank(vector, ts_query)
+        query = select(model.id, rank.label('rank')).where(vector.op('@@')(ts_query)).order_by(rank.desc())
+        return query.limit(limit) if limit else query
+
+    query = select(model.id).where(or_(
+        *[getattr(model, column).ilike(f'%{token}%') for column in columns for token in tokens]
+    ))
+    return query.limit(limit) if limit else query
+
+def match_value(model, term: str | None, column: str | None = None) -> str | None:
+    """Bind value for `match_clause`, or None when `term` has nothing searchable"""
+    tokens = query_tokens(term)
+    if not tokens:
+        return None
+
+    dialect: str = db.engine.dialect.name
+
+    if dialect == 'sqlite':
+        return _sqlite_match(tokens, column)
+
+    if dialect == 'postgresql':
+        weight = ''
+        if column:
+            weight = 'ABCD'[min(FTS_COLUMNS[model.__tablename__].index(column), 3)]
+        return ' & '.join(f'{token}:*{weight}' for token in tokens)
+
+    return f"%{' '.join(tokens)}%"
+
+def match_clause(model, param: BindParameter, column: str | None = None):
+    """WHERE clause restricting `model` to rows whose indexed text (or just `column`) matches `param`"""
+    table: str = model.__tablename__
+    dialect: str = db.engine.dialect.name
+
+    if dialect == 'sqlite':
+        fts = _fts_table(table)
+        matched = text(f'SELECT rowid FROM {fts} WHERE {fts} MATCH :{param.key}').bindparams(param).columns(rowid=Integer)
+        return model.id.in_(matched)
+
+    if dialect == 'postgresql':
+        return literal_column(f'{table}.search_vector').op('@@')(func.to_tsquery('simple', param))
+
+    columns = (column,) if column else FTS_COLUMNS[table]
+    return or_(*[getattr(model, name).ilike(param) for name in columns])
+
+def highlight(value: str | None, term: str) -> Markup:
+    """HTML-escape `value` and wrap every word starting with a query token in <mark>"""
+    tokens = query_tokens(term)
+    if not value or not tokens:
+        return escape(value or '')
+
+    pattern = re.compile(r'\b(' + '|'.join(re.escape(token) for token in tokens) + r')\w*', re.IGNORECASE)
+    parts: list[str] = []
+    position = 0
+    for found in pattern.finditer(value):
+        parts.append(escape(value[position:found.start()]))
+        parts.append(Markup('<mark>{}</mark>').format(found.group(0)))
+        position = found.end()
+    parts.append(escape(value[position:]))
+    return Markup('').join(parts)
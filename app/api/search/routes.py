@@ -1,13 +1,14 @@
-
 from flask import jsonify, request
-from sqlalchemy import func, or_
 
-from app.api.search.utils import serialize_collection, serialize_nft, serialize_user
+from app.api.search.utils import ranked_matches, serialize_collection, serialize_nft, serialize_user
+from app.api.search.autocomplete import autocomplete_index
 from app.collection.models import NFTCollection
 from app.jwt.decorators import jwt_required
+from app.api.search.fts import highlight
 from app.api.search import search_api_bp
 from app.user.models import User
 from app.nft.models import NFT
+from config import settings
 
 @search_api_bp.route("/")
 @jwt_required
@@ -17,23 +18,35 @@ def search():
     if not query:
         return jsonify({"nfts": [], "collections": [], "users": []})
 
-    nfts = NFT.query.filter(
-        or_(
-            func.lower(NFT.name).like(f"%{query}%"),
-            func.lower(NFT.description).like(f"%{query}%")
-        )
-    ).limit(10).all()
+    nfts: list[NFT] = ranked_matches(NFT, query)
+    collections: list[NFTCollection] = ranked_matches(NFTCollection, query)
+    users: list[User] = ranked_matches(User, query)
 
-    collections = NFTCollection.query.filter(
-        func.lower(NFTCollection.name).like(f"%{query}%")
-    ).limit(10).all()
+    return jsonify({'status': 'success', 'data': {
+        "nfts": [
+            {**serialize_nft(nft), "highlight": {
+                "title": highlight(nft.name, query),
+                "subtitle": highlight(nft.description, query)
+            }}
+            for nft in nfts
+        ],
+        "collections": [
+            {**serialize_collection(c), "highlight": {"title": highlight(c.name, query)}}
+            for c in collections
+        ],
+        "users": [
+            {**serialize_user(u), "highlight": {"title": highlight(u.username, query)}}
+            for u in users
+        ],
+    }}), 200
+
+@search_api_bp.route("/autocomplete")
+def autocomplete():
+    query = request.args.get("q", "").strip()
 
-    users = User.query.filter(
-        func.lower(User.username).like(f"%{query}%")
-    ).limit(10).all()
+    if not query:
+        return jsonify({'status': 'success', 'data': []}), 200
 
-    return jsonify({'status': 'success', 'data': {
-        "nfts": [serialize_nft(nft) for nft in nfts],
-        "collections": [serialize_collection(c) for c in collections],
-        "users": [serialize_user(u) for u in users],
-    }}), 200
\ No newline at end of file
+    suggestions = autocomplete_index.suggest(query, limit=settings.app.AUTOCOMPLETE_LIMIT)
+
+    return jsonify({'status': 'success', 'data': [suggestion.to_dict() for suggestion in suggestions]}), 200
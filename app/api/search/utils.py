@@ -1,15 +1,31 @@
 
 from app.collection.models import NFTCollection
+from app.api.search.fts import search_ids
 from app.user.models import User
+from app.images import image_url
+from app.extensions import db
 from app.nft.models import NFT
 from config import settings
 
+def ranked_matches(model, term: str, limit: int = 10) -> list:
+    """Load `model` rows matching `term` from the full-text index, best match first"""
+    ids_query = search_ids(model, term, limit=limit)
+    if ids_query is None:
+        return []
+
+    ids: list[int] = [row.id for row in db.session.execute(ids_query)]
+    if not ids:
+        return []
+
+    by_id: dict = {item.id: item for item in model.query.filter(model.id.in_(ids)).all()}
+    return [by_id[item_id] for item_id in ids if item_id in by_id]
+
 def serialize_nft(nft: NFT) -> dict:
     return {
         "id": nft.id,
         "title": nft.name,
         "subtitle": nft.description,
-        "image": f'/nft/{nft.token_id}/get-image',     
+        "image": image_url('nft', nft, size=settings.app.GRID_IMAGE_WIDTH),
         "price": f"{nft.price}",
         "url": f'/nft/{nft.token_id}'
     }
@@ -19,7 +35,7 @@ def serialize_collection(collection: NFTCollection) -> dict:
         "id": collection.id,
         "title": collection.name,
         "subtitle": collection.description or "",
-        "image": f'/collection/{collection.id}/get-image/featured',
+        "image": image_url('collection-featured', collection),
         "url": f'/collection/{collection.id}'
     }
 
@@ -28,6 +44,6 @@ def serialize_user(user: User) -> dict:
         "id": user.id,
         "title": user.username,
         "subtitle": user.bio or "",
-        "image": f'/user/{user.id}/get-image/logo',
+        "image": image_url('user-logo', user),
         "url": f'user/profile/{user.id}' 
     }
\ No newline at end of file
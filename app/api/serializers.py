@@ -0,0 +1,75 @@
+from sqlalchemy.orm import joinedload, selectinload
+from contextlib import contextmanager
+from dataclasses import dataclass
+from sqlalchemy import event
+from typing import Callable
+
+from app.nft.models import NFT, Offer
+from app.extensions import db
+
+@dataclass(frozen=True, eq=False)
+class Serializer:
+    """One output shape: the function producing it and the relationships it reads.
+
+    Many-to-one relationships are joined into the list query itself, collections
+    are fetched with one extra IN query, so a page costs the same number of
+    queries whatever its size. Relationships are named rather than referenced
+    because `configure_relationships` replaces some of them after import.
+    """
+
+    name: str
+    model: type
+    dump: Callable
+    joined: tuple[str, ...] = ()
+    selected: tuple[str, ...] = ()
+
+    @property
+    def options(self) -> tuple:
+        return (
+            *(joinedload(getattr(self.model, relationship)) for relationship in self.joined),
+            *(selectinload(getattr(self.model, relationship)) for relationship in self.selected),
+        )
+
+    def apply(self, query):
+        """Add the loader options of this shape to a select / legacy query"""
+        return query.options(*self.options)
+
+    def many(self, items) -> list[dict]:
+        return [self.dump(item) for item in items]
+
+NFT_INFO = Serializer('nft.info', NFT, NFT.info, joined=('owner',))
+NFT_DETAIL = Serializer('nft.to_dict', NFT, NFT.to_dict, joined=('owner', 'creator', 'category'))
+OFFER_INFO = Serializer('offer.info', Offer, Offer.info, joined=('nft', 'buyer'))
+
+class QueryCounter:
+    """Counts statements sent to the database while active"""
+
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement)
+
+@contextmanager
+def count_queries():
+    """Context manager yielding a `QueryCounter` of every statement run inside it"""
+    counter = QueryCounter()
+    event.listen(db.engine, 'before_cursor_execute', counter._record)
+    try:
+        yield counter
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', counter._record)
+
+@contextmanager
+def assert_max_queries(limit: int):
+    """Fail with the offending statements when the block runs more than `limit` queries"""
+    with count_queries() as counter:
+        yield counter
+
+    if counter.count > limit:
+        statements = '\n'.join(counter.statements)
+        raise AssertionError(f'Expected at most {limit} queries, got {counter.count}:\n{statements}')
@@ -4,12 +4,15 @@ from flask import g, jsonify, request
 from pydantic import ValidationError
 from decimal import Decimal
 
-from sqlalchemy import func
-
 from app.api.user.schemas import UserProfileFilters, UserProfileUpdate
-from app.nft.models import NFT, Like, NFTView, Offer
+from app.nft.models import NFT, Offer, Sale
 from app.api.user.utils import validate_user_id
+from app.api.listing import NFTListing, fetch_page
+from app.api.serializers import OFFER_INFO, NFT_INFO
+from app.collection.rankings import rankings_refresher
+from app.collection.models import CollectionStats
 from app.jwt.decorators import jwt_required
+from app.utils import lock_users, to_money
 from app.api.utils import update_old_image
 from app.api.user import user_api_bp
 from app.user.models import User
@@ -82,51 +85,22 @@ def get_user_created_nfts(user_id: int):
         error_messages = [f"{err['loc'][0]}: {err['msg']}" for err in errors]
         return jsonify({'status': 'error', 'errors': error_messages}), 400
 
-    query = NFT.query
-
-    if filters.currentTab == 1:
-        query = query.filter(NFT.owner_id == validated_user.id)
-
-    elif filters.currentTab == 2:
-        query = query.filter(NFT.creator_id == validated_user.id)
-
-    if filters.search:
-        search_term = f"%{filters.search.strip().lower()}%"
-        query = query.filter(func.lower(NFT.name).like(search_term))
-
-    if filters.sortBy == 1:
-        query = (
-            query.outerjoin(Offer)
-            .group_by(NFT.id)
-            .order_by(func.count(Offer.id).desc())
+    listing: NFTListing = NFTListing(
+        sort_by=filters.sortBy,
+        owner_id=validated_user.id if filters.currentTab == 1 else None,
+        creator_id=validated_user.id if filters.currentTab == 2 else None,
+        search=filters.search
     )
-    elif filters.sortBy == 2:
-        query = query.order_by(NFT.price.asc())
-    elif filters.sortBy == 3:
-        query = query.order_by(NFT.price.desc())
-    elif filters.sortBy == 4:
-        query = query.order_by(NFT.created_at.asc())
-    elif filters.sortBy == 5:
-        query = query.order_by(NFT.created_at.desc())
-    elif filters.sortBy == 6:
-        query = (
-            query.outerjoin(NFTView)
-            .group_by(NFT.id)
-            .order_by(func.count(NFTView.id).desc())
-        )
-    elif filters.sortBy == 7:
-        query = (
-            query.outerjoin(Like)
-            .group_by(NFT.id)
-            .order_by(func.count(Like.id).desc())
-        )
 
-    nfts = query.all()
+    try:
+        nfts, next_cursor, total = fetch_page(listing, filters)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'errors': [str(e)]}), 400
 
-    user_nfts_dicts = [nft.info() for nft in nfts]
+    user_nfts_dicts: list[dict] = NFT_INFO.many(nfts)
 
     return jsonify(
-        {'status': 'success', 'data': user_nfts_dicts}
+        {'status': 'success', 'data': user_nfts_dicts, 'next_cursor': next_cursor, 'total_estimate': total}
     ), 200
 
 @user_api_bp.route('/my', methods=['POST'])
@@ -151,53 +125,21 @@ def user_private_api():
         error_messages = [f"{err['loc'][0]}: {err['msg']}" for err in errors]
         return jsonify({'status': 'error', 'errors': error_messages}), 400
 
-    if filters.currentTab == 5:
-        query = (
-            db.session.query(NFT)
-            .join(Like, NFT.id == Like.nft_id)
-            .filter(Like.user_id == validated_user.id)
-            .group_by(NFT.id)
-        )
-    else:
-        query = NFT.query
-    
-    if filters.search:
-        search_term = f"%{filters.search.strip().lower()}%"
-        query = query.filter(func.lower(NFT.name).like(search_term))
-    
-    if filters.sortBy == 1:
-        query = (
-            query.outerjoin(Offer)
-            .group_by(NFT.id)
-            .order_by(func.count(Offer.id).desc())
+    listing: NFTListing = NFTListing(
+        sort_by=filters.sortBy,
+        liked_by=validated_user.id if filters.currentTab == 5 else None,
+        search=filters.search
     )
-    elif filters.sortBy == 2:
-        query = query.order_by(NFT.price.asc())
-    elif filters.sortBy == 3:
-        query = query.order_by(NFT.price.desc())
-    elif filters.sortBy == 4:
-        query = query.order_by(NFT.created_at.asc())
-    elif filters.sortBy == 5:
-        query = query.order_by(NFT.created_at.desc())
-    elif filters.sortBy == 6:
-        query = (
-            query.outerjoin(NFTView)
-            .group_by(NFT.id)
-            .order_by(func.count(NFTView.id).desc())
-        )
-    elif filters.sortBy == 7:
-        query = (
-            query.outerjoin(Like)
-            .group_by(NFT.id)
-            .order_by(func.count(Like.id).desc())
-        )
 
-    nfts = query.all()
+    try:
+        nfts, next_cursor, total = fetch_page(listing, filters)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'errors': [str(e)]}), 400
 
-    user_nfts_dicts: list[dict] = [nft.info() for nft in nfts]
+    user_nfts_dicts: list[dict] = NFT_INFO.many(nfts)
 
     return jsonify(
-        {'status': 'success', 'data': user_nfts_dicts}
+        {'status': 'success', 'data': user_nfts_dicts, 'next_cursor': next_cursor, 'total_estimate': total}
     ), 200
 
 @user_api_bp.route('/offers', methods=['GET'])
@@ -215,9 +157,9 @@ def get_offers():
     if isinstance(validated_user, tuple): 
         return validated_user
     
-    offers: list[Offer] = Offer.query.filter_by(owner_id=user_id).all()
+    offers: list[Offer] = OFFER_INFO.apply(Offer.query.filter_by(owner_id=user_id)).all()
 
-    user_offers_dicts: list[dict] = [offer.info() for offer in offers if offer.is_active]
+    user_offers_dicts: list[dict] = OFFER_INFO.many(offer for offer in offers if offer.is_active)
 
     return jsonify(
         {'status': 'success', 'data': user_offers_dicts}
@@ -247,6 +189,7 @@ def reject_offer(offer_id):
         return jsonify({'status': 'error', 'errors': ['Offer already cancelled/rejected']}), 400
 
     offer.is_cancelled = True
+    offer.nft.offers_count = NFT.offers_count - 1
     db.session.commit()
 
     return jsonify({'message': 'Offer rejected successfully'}), 200
@@ -262,7 +205,7 @@ def accept_offer(offer_id):
     if not user_id:
         return jsonify({'status': 'error', 'errors': ['Invalid token payload']}), 400
 
-    offer: Offer = Offer.query.get(offer_id)
+    offer: Offer = db.session.get(Offer, offer_id, with_for_update=True)
     if not offer:
         return jsonify({'status': 'error', 'errors': ['Offer not found']}), 404
 
@@ -277,18 +220,31 @@ def accept_offer(offer_id):
     if not offer.is_active:
         return jsonify({"status": "error", "errors": ["Offer has expired"]}), 400
     
-    nft: NFT = offer.nft
+    nft: NFT = db.session.get(NFT, offer.nft_id, with_for_update=True)
     if nft.owner_id != user_id:
         return jsonify({"status": "error", "errors": ["You are not the owner of this NFT"]}), 403
     
-    seller: User = nft.owner
-    buyer: User = offer.buyer
+    users: dict[int, User] = lock_users(nft.owner_id, offer.buyer_id)
+    seller: User = users[nft.owner_id]
+    buyer: User = users[offer.buyer_id]
 
     if buyer.balance < offer.amount:
         return jsonify({"status": "error", "errors": ["Buyer has insufficient funds"]}), 400
 
-    buyer.balance -= offer.amount
-    seller.balance += offer.amount
+    try:
+        buyer.balance = to_money(buyer.balance, -offer.amount)
+        seller.balance = to_money(seller.balance, offer.amount)
+    except ValueError:
+        db.session.rollback()
+        return jsonify({"status": "error", "errors": ["Seller balance limit exceeded"]}), 400
+
+    db.session.add(Sale(
+        nft_id=nft.id,
+        collection_id=nft.collection_id,
+        seller_id=seller.id,
+        buyer_id=buyer.id,
+        price=offer.amount
+    ))
 
     nft.owner_id = buyer.id
     nft.price = offer.amount
@@ -304,7 +260,11 @@ def accept_offer(offer_id):
     for other in other_offers:
         other.is_cancelled = True
 
+    nft.offers_count = NFT.offers_count - (len(other_offers) + 1)
+    CollectionStats.refresh(nft.collection_id)
+
     db.session.commit()
+    rankings_refresher.notify()
 
     return jsonify({"status": "success", "message": "Offer accepted, NFT transferred, other offers cancelled"}), 200
 
@@ -317,11 +277,11 @@ def get_completed_offers():
     if not user_id:
         return jsonify({"status": "error", "errors": ["Unauthorized"]}), 401
 
-    sold_offers: list[Offer] = Offer.query.filter(
+    sold_offers: list[Offer] = OFFER_INFO.apply(Offer.query.filter(
         Offer.is_accepted == True
-    ).order_by(Offer.created_at.desc()).all()
+    )).order_by(Offer.created_at.desc()).all()
 
-    user_offers_dicts: list[dict] = [offer.info() for offer in sold_offers]
+    user_offers_dicts: list[dict] = OFFER_INFO.many(sold_offers)
 
     return jsonify({'status': 'success', 'data': user_offers_dicts}), 200
 
@@ -345,10 +305,15 @@ def add_funds(user_id):
     
     try:
         amount = Decimal(str(data['amount']))
-    except (TypeError, ValueError):
+    except (KeyError, TypeError, ValueError, ArithmeticError):
         return jsonify({'errors': ['Invalid amount format']}), 400
 
-    validated_user.balance += amount
+    validated_user = lock_users(validated_user.id)[validated_user.id]
+    try:
+        validated_user.balance = to_money(validated_user.balance, amount)
+    except (ValueError, ArithmeticError):
+        db.session.rollback()
+        return jsonify({'status': 'error', 'errors': ['Amount is out of range']}), 400
 
     db.session.commit()
 
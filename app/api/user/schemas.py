@@ -1,6 +1,8 @@
 
 from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
 
+from app.api.pagination import CursorPageParams
+
 class UserProfileUpdate(BaseModel):
     display_name: str
     email: EmailStr
@@ -10,7 +12,7 @@ class UserProfileUpdate(BaseModel):
         from_attributes=True, 
     )
 
-class UserProfileFilters(BaseModel):
+class UserProfileFilters(CursorPageParams):
     currentTab: int = 1
     sortBy: int = 1
     search: str | None = None
@@ -1,12 +1,11 @@
 
 from werkzeug.datastructures import FileStorage
-from werkzeug.utils import secure_filename
 from flask.json import jsonify
 from pydantic import BaseModel
 from flask import request
 from pathlib import Path
-from uuid import uuid4
 
+from app.storage import store_upload
 from app.utils import allowed_image_type
 
 def validate_values(
@@ -49,8 +48,7 @@ def validate_image(
         return jsonify({'errors': [f'No {image_attribute} file selected']}), 400
         
     if file and allowed_image_type(file.filename) and save_image:
-        filename: str = f'{uuid4().hex}-{secure_filename(file.filename)}'
-        file.save(save_folder / filename)
+        filename: str = store_upload(file, save_folder)
     else:
         return jsonify({'errors': ['Invalid file type']}), 400
 
@@ -67,13 +65,6 @@ def update_old_image(
     if not file or file.filename == "":
         return old_filename
     
-    filename = secure_filename(file.filename)
-    unique_name = f"{uuid4().hex}_{filename}"
-    file_path = upload_dir / unique_name
-    file.save(file_path)
-
-    old_path = upload_dir / old_filename
-    if old_path.exists():
-        old_path.unlink()
-
-    return unique_name
\ No newline at end of file
+    # the old file may be shared with other rows; its reference is released when
+    # this change is committed and the collector removes it once unreferenced
+    return store_upload(file, upload_dir)
\ No newline at end of file
@@ -0,0 +1,333 @@
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.exc import OperationalError
+from flask.globals import current_app
+from sqlalchemy import create_engine, func, select, text
+import threading
+import tempfile
+import statistics
+import random
+import click
+import time
+
+from app.api.search.autocomplete import autocomplete_index
+from app.api.serializers import assert_max_queries
+from concurrent.futures import ThreadPoolExecutor
+from app.nft.likes import like_counter
+from app.collection.models import NFTCollection
+from app.jwt.decorators import jwt_required
+from app.jwt.utils import decode_jwt, encode_jwt, generate_tokens
+from app.jwt.keys import KeyRing
+from app.user.passwords import HasherBusy, password_hasher
+from app.jwt.cache import auth_cache
+from app.user.models import User
+from app.nft.models import NFT, Like, Offer
+from app.extensions import configure_engine, db, engine_options
+
+def _timed(fn, repeat: int) -> list[float]:
+    timings: list[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+def _report(label: str, timings: list[float]) -> None:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1] if len(timings) > 1 else timings[0]
+    click.echo(
+        f'{label:<28} mean {statistics.mean(timings):8.3f} ms   '
+        f'p50 {statistics.median(timings):8.3f} ms   p95 {p95:8.3f} ms'
+    )
+
+@click.command('bench-autocomplete')
+@click.option('--queries', default=500, help='Number of prefixes to look up')
+def bench_autocomplete(queries: int):
+    """Compare autocomplete index lookups with the LIKE scan path"""
+    with current_app.app_context():
+        names: list[str] = [name for (name,) in NFT.query.with_entities(NFT.name).all() if name]
+        if not names:
+            click.echo('No NFTs to benchmark against.')
+            return
+
+        prefixes: list[str] = [
+            random.choice(names).lower()[:random.randint(1, 4)] for _ in range(queries)
+        ]
+
+        started = time.perf_counter()
+        autocomplete_index.build()
+        click.echo(f'Index build: {(time.perf_counter() - started) * 1000:.1f} ms, {autocomplete_index.stats()}')
+
+        lookups = iter(prefixes)
+        _report('index suggest', _timed(lambda: autocomplete_index.suggest(next(lookups)), queries))
+
+        def like_path(prefix: str) -> None:
+            NFT.query.filter(NFT.name.ilike(f'%{prefix}%')).limit(10).all()
+            NFTCollection.query.filter(NFTCollection.name.ilike(f'%{prefix}%')).limit(10).all()
+            User.query.filter(User.username.ilike(f'%{prefix}%')).limit(10).all()
+
+        lookups = iter(prefixes)
+        _report('LIKE scans', _timed(lambda: like_path(next(lookups)), queries))
+
+# (endpoint label, method, url, json body, needs auth, max queries whatever the page size)
+QUERY_BUDGETS: list[tuple[str, str, str, dict | None, bool, int]] = [
+    ('drops filter', 'POST', '/api/nft/filter', {'limit': 200}, False, 2),
+    ('category top nfts', 'GET', '/api/nft/get-category-nfts/{category_id}', None, False, 2),
+    ('user profile nfts', 'POST', '/api/user/{user_id}', {'limit': 200}, False, 2),
+    ('my liked nfts', 'POST', '/api/user/my', {'currentTab': 5, 'limit': 200}, True, 3),
+    ('collection nfts', 'POST', '/api/nft-collection/{collection_id}/get-nfts', {'limit': 200}, False, 3),
+    ('received offers', 'GET', '/api/user/offers', None, True, 3),
+    ('completed offers', 'GET', '/api/user/offers/completed', None, True, 2),
+]
+
+@click.command('check-query-counts')
+def check_query_counts():
+    """Call every list endpoint and fail if one runs more queries than its budget"""
+    with current_app.app_context():
+        nft: NFT | None = NFT.query.filter(NFT.collection_id.isnot(None)).first() or NFT.query.first()
+        offer: Offer | None = Offer.query.first()
+        if not nft:
+            click.echo('No NFTs to check against.')
+            return
+
+        user_id: int = offer.owner_id if offer else nft.owner_id
+        access_token, _ = generate_tokens(user_id)
+        ids: dict = {'category_id': nft.category_id, 'user_id': user_id, 'collection_id': nft.collection_id or 0}
+
+    client = current_app.test_client()
+    failed: bool = False
+    for label, method, url, body, auth, budget in QUERY_BUDGETS:
+        headers: dict = {'Authorization': f'Bearer {access_token}'} if auth else {}
+        try:
+            with assert_max_queries(budget) as counter:
+                response = client.open(url.format(**ids), method=method, json=body, headers=headers)
+        except AssertionError as e:
+            failed = True
+            click.echo(f'{label:<20} FAIL  {e}')
+            continue
+        click.echo(f'{label:<20} {response.status_code}  {counter.count}/{budget} queries')
+
+    if failed:
+        raise click.ClickException('Query budget exceeded')
+
+@click.command('bench-likes')
+@click.option('--threads', default=16, help='Concurrent users toggling the same NFT')
+@click.option('--toggles', default=50, help='Toggles per user, rounded up to an even number')
+def bench_likes(threads: int, toggles: int):
+    """Hammer one NFT with like toggles from many threads and verify the stored count"""
+    toggles += toggles % 2
+    with current_app.app_context():
+        nft: NFT | None = NFT.query.filter_by(is_blocked=False).first()
+        user_ids: list[int] = [user_id for (user_id,) in User.query.with_entities(User.id).limit(threads)]
+        if not nft or not user_ids:
+            click.echo('Need at least one NFT and one user to benchmark against.')
+            return
+
+        token_id: str = nft.token_id
+        like_counter.flush()
+        rows_before: int = Like.query.filter_by(nft_id=nft.id).count()
+        stored_before: int = nft.likes_count
+
+    app = current_app._get_current_object()
+
+    def hammer(user_id: int) -> tuple[list[float], int]:
+        client = app.test_client()
+        headers: dict = {'Authorization': f'Bearer {generate_tokens(user_id)[0]}'}
+        errors: int = 0
+
+        def toggle() -> None:
+            nonlocal errors
+            if client.get(f'/api/nft/{token_id}/like-nft', headers=headers).status_code != 200:
+                errors += 1
+
+        return _timed(toggle, toggles), errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(user_ids)) as pool:
+        results = list(pool.map(hammer, user_ids))
+    elapsed = time.perf_counter() - started
+
+    timings: list[float] = [timing for result, _ in results for timing in result]
+    errors: int = sum(errors for _, errors in results)
+    click.echo(f'{len(timings)} toggles from {len(user_ids)} users in {elapsed:.2f} s ({len(timings) / elapsed:.0f}/s), {errors} errors')
+    _report('like toggle', timings)
+
+    with app.app_context():
+        like_counter.flush()
+        db.session.expire_all()
+        rows: int = Like.query.filter_by(token_id=token_id).count()
+        stored: int = NFT.query.filter_by(token_id=token_id).first().likes_count
+        likers: int = db.session.scalar(
+            select(func.count(func.distinct(Like.user_id))).where(Like.token_id == token_id)
+        )
+
+    click.echo(f'likes rows {rows} (before {rows_before}), likes_count {stored} (before {stored_before})')
+    if rows != rows_before or stored != stored_before or likers != rows:
+        raise click.ClickException('Like count mismatch after concurrent toggles')
+    click.echo('Final count verified.')
+
+def _sqlite_workload(url: str, profile: str, seconds: float, readers: int, writers: int, rows: int) -> dict:
+    engine = create_engine(url, **engine_options(url))
+    configure_engine(engine, profile)
+
+    with engine.begin() as connection:
+        connection.execute(text('CREATE TABLE bench (id INTEGER PRIMARY KEY, owner_id INTEGER, views INTEGER)'))
+        connection.execute(text('CREATE INDEX ix_bench_owner_id ON bench (owner_id)'))
+        connection.execute(
+            text('INSERT INTO bench (id, owner_id, views) VALUES (:id, :owner_id, 0)'),
+            [{'id': row_id, 'owner_id': row_id % 100} for row_id in range(1, rows + 1)]
+        )
+
+    counts: dict = {'reads': 0, 'writes': 0, 'locked': 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def work(write: bool) -> None:
+        done = locked = 0
+        while time.monotonic() < deadline:
+            try:
+                with engine.begin() as connection:
+                    if write:
+                        connection.execute(
+                            text('UPDATE bench SET views = views + 1 WHERE id = :id'), {'id': random.randint(1, rows)}
+                        )
+                    else:
+                        connection.execute(
+                            text('SELECT id, views FROM bench WHERE owner_id = :owner_id LIMIT 48'),
+                            {'owner_id': random.randint(0, 99)}
+                        ).all()
+                done += 1
+            except OperationalError:
+                locked += 1
+        with lock:
+            counts['writes' if write else 'reads'] += done
+            counts['locked'] += locked
+
+    threads = [threading.Thread(target=work, args=(index < writers,)) for index in range(readers + writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with engine.connect() as connection:
+        counts['journal_mode'] = connection.exec_driver_sql('PRAGMA journal_mode').scalar()
+    engine.dispose()
+    return counts
+
+@click.command('bench-sqlite')
+@click.option('--seconds', default=5.0, help='Duration of each run')
+@click.option('--readers', default=8, help='Reader threads')
+@click.option('--writers', default=2, help='Writer threads, one commit per update')
+@click.option('--rows', default=10000, help='Rows in the scratch table')
+def bench_sqlite(seconds: float, readers: int, writers: int, rows: int):
+    """Compare mixed read/write throughput of SQLite's default settings and the tuned profile"""
+    for profile in ('default', 'tuned'):
+        with tempfile.TemporaryDirectory() as folder:
+            counts = _sqlite_workload(f'sqlite:///{folder}/bench.db', profile, seconds, readers, writers, rows)
+
+        click.echo(
+            f"{profile:<8} journal={counts['journal_mode']:<7} "
+            f"reads {counts['reads'] / seconds:9.0f}/s   writes {counts['writes'] / seconds:7.0f}/s   "
+            f"locked errors {counts['locked']}"
+        )
+
+@click.command('bench-auth')
+@click.option('--requests', 'count', default=2000, help='Authenticated calls per run')
+def bench_auth(count: int):
+    """Per-request cost of jwt_required with a cold and a warm auth cache"""
+    with current_app.app_context():
+        user: User | None = User.query.filter_by(is_blocked=False).first()
+        if not user:
+            click.echo('No users to authenticate as.')
+            return
+        access_token, _ = generate_tokens(user.id, user.role)
+
+    protected = jwt_required(lambda: None)
+    headers: dict = {'Authorization': f'Bearer {access_token}'}
+
+    def call(cold: bool) -> None:
+        if cold:
+            auth_cache.clear()
+        with current_app.test_request_context(headers=headers):
+            protected()
+
+    _report('verify + user lookup', _timed(lambda: call(True), count))
+    auth_cache.clear()
+    _report('cached', _timed(lambda: call(False), count))
+    click.echo(auth_cache.stats())
+
+def _benchmark_key(algorithm: str):
+    if algorithm == 'EdDSA':
+        return ed25519.Ed25519PrivateKey.generate()
+    if algorithm == 'ES256':
+        return ec.generate_private_key(ec.SECP256R1())
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+@click.command('bench-tokens')
+@click.option('--tokens', default=2000, help='Tokens signed and verified per algorithm')
+def bench_tokens(tokens: int):
+    """Sign and verify throughput of every supported JWT algorithm with fresh in-memory keys"""
+    now = datetime.now(timezone.utc)
+    payload: dict = {'user_id': 1, 'role': 'user', 'iat': now, 'exp': now + timedelta(minutes=15), 'type': 'access'}
+
+    for algorithm in ('RS256', 'ES256', 'EdDSA'):
+        private_key = _benchmark_key(algorithm)
+        keys = KeyRing.from_keys(private_key, [private_key.public_key()], algorithm)
+
+        started = time.perf_counter()
+        signed: list[str] = [encode_jwt(payload, keys) for _ in range(tokens)]
+        sign_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for token in signed:
+            decode_jwt(token, keys)
+        verify_seconds = time.perf_counter() - started
+
+        click.echo(
+            f'{algorithm:<6} sign {tokens / sign_seconds:9.0f}/s   verify {tokens / verify_seconds:9.0f}/s   '
+            f'token {len(signed[0])} bytes'
+        )
+
+@click.command('bench-login')
+@click.option('--rounds', 'rounds_list', default='10,11,12', help='Comma separated bcrypt cost factors')
+@click.option('--logins', default=64, help='Password checks per cost factor')
+@click.option('--clients', default=16, help='Concurrent login requests')
+def bench_login(rounds_list: str, logins: int, clients: int):
+    """Password check throughput of the hashing executor at several bcrypt cost factors"""
+    click.echo(f'{password_hasher.workers} hashing workers, {clients} concurrent clients')
+
+    for rounds in [int(value) for value in rounds_list.split(',')]:
+        hashed: bytes = password_hasher.hash('benchmark-password', rounds=rounds)
+        before: dict = password_hasher.stats()
+
+        def check(_) -> bool | None:
+            try:
+                return password_hasher.verify('benchmark-password', hashed)
+            except HasherBusy:
+                return None
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            checks = list(pool.map(check, range(logins)))
+        seconds = time.perf_counter() - started
+
+        served: int = logins - checks.count(None)
+        after: dict = password_hasher.stats()
+        queue_ms = (
+            after['mean_queue_ms'] * after['completed'] - before['mean_queue_ms'] * before['completed']
+        ) / (served or 1)
+        if not all(result for result in checks if result is not None):
+            raise click.ClickException(f'Password check failed at cost {rounds}')
+        click.echo(
+            f'cost {rounds:<3} {served / seconds:8.1f} logins/s   mean queue {queue_ms:8.1f} ms   '
+            f'rejected {logins - served}'
+        )
+
+def register_benchmarks(app) -> None:
+    app.cli.add_command(bench_autocomplete)
+    app.cli.add_command(check_query_counts)
+    app.cli.add_command(bench_likes)
+    app.cli.add_command(bench_sqlite)
+    app.cli.add_command(bench_auth)
+    app.cli.add_command(bench_tokens)
+    app.cli.add_command(bench_login)
@@ -1,11 +1,25 @@
 
+from sqlalchemy import func, select, update
+from concurrent.futures import ThreadPoolExecutor
 from flask.globals import current_app
+from datetime import timedelta
 import click
 
+from app.collection.models import CollectionRanking, CollectionStats, NFTCollection
+from app.collection.rankings import refresh_rankings
 from app.api.allowedwallets.models import AllowedWallet
+from app.api.search.fts import install_fts
 from app.user.models import User
-from app.nft.models import NFT
+from app.nft.models import NFT, ActivityRollup, Sale
+from app.nft.activity import compact_activity
+from app.advisor import analyze_shape, missing_indexes, query_shapes
+from app.storage import BLOB_NAME, collect_garbage, folder_key, migrate_upload, recount_references, sweep_orphans, upload_sources
+from app.derivatives import DERIVED_FOLDER_NAME, derivative_path, image_derivatives, remove_derivatives
+from app.shards import iter_uploads, move_flat_renditions, move_to_shard
+from app.utils import add_missing_columns, allowed_image_type, fill_media_types, recount_nft_counters, remove_duplicate_rows
+from app.images import IMAGE_SOURCES
 from app.extensions import db
+from config import settings
 
 @click.command('add-admin')
 @click.argument('username')
@@ -66,49 +80,260 @@ def show_admins():
 @click.command('delete-all-nft')
 def delete_all_nft():
     from flask import current_app
-    import os
 
     from app.nft.models import NFT
     from app.utils import delete_table
     from config import settings
 
-    for file in os.listdir(settings.db.UPLOAD_FOLDER / 'nft-images'):
-        os.remove(settings.db.UPLOAD_FOLDER / 'nft-images' / file)
+    for path in iter_uploads(settings.db.UPLOAD_FOLDER / 'nft-images'):
+        path.unlink()
+        remove_derivatives(path)
 
     with current_app.app_context():
+        db.session.query(CollectionStats).delete()
+        db.session.query(ActivityRollup).filter(ActivityRollup.scope != 'global').delete()
+        db.session.commit()
         delete_table(NFT, db)
         db.create_all()
+        install_fts(db)
+        recount_references()
 
 @click.command('delete-all-collections')
 def delete_all_collections():
     from flask import current_app
-    import os
 
-    from app.collection.models import NFTCollection
     from app.utils import delete_table
     from config import settings
 
-    for file in os.listdir(settings.db.UPLOAD_FOLDER / 'collection-featured'):
-        os.remove(settings.db.UPLOAD_FOLDER / 'collection-featured' / file)
+    for path in iter_uploads(settings.db.UPLOAD_FOLDER / 'collection-featured'):
+        path.unlink()
+        remove_derivatives(path)
 
-    for file in os.listdir(settings.db.UPLOAD_FOLDER / 'collection-logo'):
-        os.remove(settings.db.UPLOAD_FOLDER / 'collection-logo' / file)
+    for path in iter_uploads(settings.db.UPLOAD_FOLDER / 'collection-logo'):
+        path.unlink()
+        remove_derivatives(path)
 
-    for file in os.listdir(settings.db.UPLOAD_FOLDER / 'collection-baner'):
-        os.remove(settings.db.UPLOAD_FOLDER / 'collection-baner' / file)
+    for path in iter_uploads(settings.db.UPLOAD_FOLDER / 'collection-baner'):
+        path.unlink()
+        remove_derivatives(path)
 
     with current_app.app_context():
         db.session.query(NFT).filter(NFT.collection_id.isnot(None)).update(
             {NFT.collection_id: None}, synchronize_session=False
         )
+        db.session.query(Sale).filter(Sale.collection_id.isnot(None)).update(
+            {Sale.collection_id: None}, synchronize_session=False
+        )
+        db.session.query(ActivityRollup).filter(ActivityRollup.scope == 'collection').delete()
         db.session.commit()
         db.session.close()
         db.engine.dispose()
+        delete_table(CollectionRanking, db)
+        delete_table(CollectionStats, db)
         delete_table(NFTCollection, db)
         db.create_all()
+        install_fts(db)
+        recount_references()
+
+@click.command('recount')
+def recount():
+    with current_app.app_context():
+        duplicates: int = remove_duplicate_rows(db)
+        recounted: int = recount_nft_counters(db)
+        collection_ids: list[int] = db.session.scalars(select(NFTCollection.id)).all()
+        for collection_id in collection_ids:
+            CollectionStats.refresh(collection_id)
+        db.session.commit()
+        # the unique view and like indexes skipped by migrate while duplicates existed
+        add_missing_columns(db)
+
+        click.echo(f'Removed {duplicates} duplicate views and likes.')
+        click.echo(f'Recounted likes, views and offers for {recounted} NFTs.')
+        click.echo(f'Rebuilt stats for {len(collection_ids)} collections.')
+
+@click.command('refresh-rankings')
+def refresh_collection_rankings():
+    with current_app.app_context():
+        refresh_rankings()
+        click.echo('Collection rankings refreshed.')
+
+@click.command('search-reindex')
+def search_reindex():
+    with current_app.app_context():
+        install_fts(db)
+        click.echo('Search index rebuilt.')
+
+@click.command('backfill-media-types')
+@click.option('--all', 'refill', is_flag=True, help='Recompute rows that already have a media type')
+def backfill_media_types(refill: bool):
+    with current_app.app_context():
+        updated: int = fill_media_types(db, refill)
+
+        missing: int = db.session.scalar(select(func.count(NFT.id)).where(NFT.media_type.is_(None)))
+        click.echo(f'Set media type for {updated} NFTs, {missing} left without a known type.')
+
+@click.command('compact-activity')
+@click.option('--full', is_flag=True, help='Rebuild every bucket instead of only the latest ones')
+def compact_activity_rollups(full: bool):
+    with current_app.app_context():
+        since = compact_activity(full=full)
+        click.echo(f"Activity rollups rebuilt from {since.isoformat() if since else 'the beginning'}.")
+
+@click.command('db-advise')
+@click.option('--create', is_flag=True, help='Create declared indexes that are missing')
+@click.option('--analyze', is_flag=True, help='Refresh planner statistics first')
+@click.option('--verbose', is_flag=True, help='Print the full plan of every query shape')
+@click.option('--strict', is_flag=True, help='Exit with an error when a shape still scans a whole table')
+def db_advise(create: bool, analyze: bool, verbose: bool, strict: bool):
+    with current_app.app_context():
+        missing = missing_indexes()
+        if missing and create:
+            add_missing_columns(db)
+            created = set(missing) - set(missing_indexes())
+            click.echo(f'Created {len(created)} of {len(missing)} missing indexes.')
+            missing = missing_indexes()
+
+        for table, index in missing:
+            click.echo(f'MISSING  {index} on {table}')
+        if not missing:
+            click.echo('All declared indexes exist.')
+
+        if analyze:
+            with db.engine.begin() as connection:
+                connection.exec_driver_sql('ANALYZE')
+
+        scanning: int = 0
+        for label, statement, params in query_shapes():
+            report = analyze_shape(label, statement, params)
+            if report.full_scans:
+                scanning += 1
+                status = f"FULL SCAN {', '.join(sorted(set(report.full_scans)))}"
+            else:
+                status = 'ok'
+            if report.temp_sorts:
+                status += f' (+{report.temp_sorts} temp sort)'
+            click.echo(f'{label:<24} {status}')
+
+            if verbose:
+                for line in report.plan:
+                    click.echo(f'    {line}')
+
+        click.echo(f'{scanning} query shapes scan a whole table.')
+        if strict and (scanning or missing):
+            raise click.ClickException('Index advice not satisfied')
+
+@click.command('build-derivatives')
+@click.option('--all', 'rebuild', is_flag=True, help='Render again images that already have derivatives')
+def build_derivatives(rebuild: bool):
+    with current_app.app_context():
+        widths = image_derivatives.widths
+        futures = []
+        # only uploads; images shipped with the app are small and served as they are
+        folders = {source.folder for source in IMAGE_SOURCES.values() if source.folder.is_relative_to(settings.db.UPLOAD_FOLDER)}
+        for folder in sorted(folder for folder in folders if folder.is_dir()):
+            for original in sorted(iter_uploads(folder)):
+                if not allowed_image_type(original.name):
+                    continue
+                if not rebuild and derivative_path(original, widths[-1], 'jpg').exists():
+                    continue
+                future = image_derivatives.submit(original)
+                if future:
+                    futures.append((original, future))
+
+        failed: int = 0
+        for original, future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                failed += 1
+                click.echo(f'FAILED  {original}: {e}')
+        click.echo(f'Rendered derivatives of {len(futures) - failed} images, {failed} failed.')
+
+@click.command('migrate-uploads')
+def migrate_uploads():
+    with current_app.app_context():
+        migrated: int = 0
+        duplicates: int = 0
+        reclaimed: int = 0
+        for _, source in upload_sources():
+            if not source.folder.is_dir():
+                continue
+            column = getattr(source.model, source.column)
+            for path in sorted(iter_uploads(source.folder)):
+                if BLOB_NAME.match(path.name):
+                    continue
+                size: int = path.stat().st_size
+                filename, duplicate = migrate_upload(path, source.folder)
+                db.session.execute(update(source.model).where(column == path.name).values({column: filename}))
+                db.session.commit()
+                migrated += 1
+                if duplicate:
+                    duplicates += 1
+                    reclaimed += size
+
+        changed = recount_references()
+        click.echo(f'Moved {migrated} uploads to content-addressed names, {duplicates} were duplicates.')
+        click.echo(f'Reclaimed {reclaimed / 1024 / 1024:.2f} MiB; updated {changed} reference counts.')
+
+@click.command('uploads-gc')
+@click.option('--recount', is_flag=True, help='Rebuild reference counts from the image columns first')
+@click.option('--grace', type=int, default=None, help='Seconds a blob must be unreferenced (default UPLOAD_GC_GRACE_SECONDS)')
+def uploads_gc(recount: bool, grace: int | None):
+    with current_app.app_context():
+        if recount:
+            click.echo(f'Updated {recount_references()} reference counts.')
+        removed, reclaimed = collect_garbage(timedelta(seconds=grace) if grace is not None else None)
+        click.echo(f'Removed {removed} unreferenced uploads, reclaimed {reclaimed / 1024 / 1024:.2f} MiB.')
+
+@click.command('sweep-uploads')
+@click.option('--grace', type=int, default=None, help='Only files older than this many seconds (default UPLOAD_GC_GRACE_SECONDS)')
+@click.option('--batch-size', type=int, default=None, help='Names checked against the database per query')
+@click.option('--dry-run', is_flag=True, help='Only report what would be deleted')
+def sweep_uploads(grace: int | None, batch_size: int | None, dry_run: bool):
+    with current_app.app_context():
+        removed, reclaimed = sweep_orphans(
+            timedelta(seconds=grace) if grace is not None else None, batch_size, dry_run=dry_run
+        )
+        verb = 'Would remove' if dry_run else 'Removed'
+        click.echo(f'{verb} {removed} orphaned uploads, {reclaimed / 1024 / 1024:.2f} MiB.')
+
+@click.command('shard-uploads')
+@click.option('--workers', type=int, default=8, help='Files moved in parallel')
+@click.option('--batch-size', type=int, default=1000, help='Files listed and moved per batch')
+def shard_uploads(workers: int, batch_size: int):
+    with current_app.app_context():
+        moved: int = 0
+        leftovers: int = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='shard-uploads') as executor:
+            for _, source in upload_sources():
+                if not source.folder.is_dir():
+                    continue
+                # both layouts are served while this runs, so the app can stay up
+                flat = [entry for entry in source.folder.iterdir() if entry.is_file() and not entry.name.startswith('.')]
+                for start in range(0, len(flat), batch_size):
+                    moved += sum(executor.map(move_to_shard, flat[start:start + batch_size]))
+                    click.echo(f'{folder_key(source.folder)}: {min(start + batch_size, len(flat))}/{len(flat)}')
+
+                # renditions rendered to the flat path while their original was being moved
+                leftovers += move_flat_renditions(source.folder)
+                flat_derived = source.folder / DERIVED_FOLDER_NAME
+                if flat_derived.is_dir() and not any(flat_derived.iterdir()):
+                    flat_derived.rmdir()
+        click.echo(f'Moved {moved} uploads and {leftovers} leftover renditions into the sharded layout.')
 
 def register_commands(app) -> None:
     app.cli.add_command(create_admin)
     app.cli.add_command(show_admins)
     app.cli.add_command(delete_all_nft)
-    app.cli.add_command(delete_all_collections)
\ No newline at end of file
+    app.cli.add_command(delete_all_collections)
+    app.cli.add_command(recount)
+    app.cli.add_command(refresh_collection_rankings)
+    app.cli.add_command(search_reindex)
+    app.cli.add_command(backfill_media_types)
+    app.cli.add_command(compact_activity_rollups)
+    app.cli.add_command(db_advise)
+    app.cli.add_command(build_derivatives)
+    app.cli.add_command(migrate_uploads)
+    app.cli.add_command(uploads_gc)
+    app.cli.add_command(sweep_uploads)
+    app.cli.add_command(shard_uploads)
\ No newline at end of file
@@ -1,11 +1,13 @@
 
-from decimal import Decimal
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text,  Numeric
+from decimal import ROUND_HALF_UP, Decimal
+from sqlalchemy import DateTime, ForeignKey, Integer, String, Text,  Numeric, distinct, func, select
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime, timezone
 
+from app.images import ImageSource, register_image_source
 from app.nft.models import NFT
 from app.extensions import db
+from config import settings
 
 class NFTCollection(db.Model):
     __tablename__ = 'nftcollections'
@@ -27,30 +29,31 @@ class NFTCollection(db.Model):
     category = relationship('CollectionCategory', back_populates='collections')
     nfts = relationship('NFT', foreign_keys=[NFT.collection_id], lazy='select', back_populates='collection')
 
+    stats = relationship('CollectionStats', uselist=False, lazy='joined', cascade='all, delete-orphan')
+
     def get_nfts(self) -> list[NFT]:
         return NFT.query.filter_by(collection_id=self.id).all()
     
     @property
-    def total_nfts(self):
-        return self.get_nfts()
+    def total_nfts(self) -> int:
+        return self.stats.item_count if self.stats else 0
 
     @property
-    def get_nfts_count(self) -> list[NFT]:
-        return NFT.query.filter_by(collection_id=self.id).count()
+    def get_nfts_count(self) -> int:
+        return self.total_nfts
 
     @property
     def floor(self):
-        prices: list[int] = [nft.price for nft in self.get_nfts()]
-        if not prices: return 0
-        return min(prices)
+        if not self.stats or self.stats.floor_price is None: return 0
+        return self.stats.floor_price
 
     @property
     def volume(self):
-        return sum([nft.price for nft in self.get_nfts()])
+        return self.stats.volume if self.stats else 0
     
     @property
     def owners_count(self):
-        return len(set([nft.owner for nft in self.get_nfts()]))
+        return self.stats.owners_count if self.stats else 0
 
     def to_dict(self):
         return {
@@ -69,6 +72,12 @@ class NFTCollection(db.Model):
             'nfts': self.nfts
         }
 
+for image, column in (('featured', 'featured_file'), ('baner', 'baner_file'), ('logo', 'logo_file')):
+    register_image_source(f'collection-{image}', ImageSource(
+        NFTCollection, key='id', column=column, folder=settings.db.UPLOAD_FOLDER / f'collection-{image}',
+        path=f'/collection/{{}}/get-image/{image}'
+    ))
+
 class CollectionCategory(db.Model):
     __tablename__ = 'collectionCategories'
 
@@ -78,4 +87,69 @@ class CollectionCategory(db.Model):
     logo_file: Mapped[str] = mapped_column(String(300), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
 
-    collections = relationship('NFTCollection', foreign_keys=[NFTCollection.category_id], lazy=True)
\ No newline at end of file
+    collections = relationship('NFTCollection', foreign_keys=[NFTCollection.category_id], lazy=True)
+class CollectionStats(db.Model):
+    __tablename__ = 'collection_stats'
+
+    collection_id: Mapped[int] = mapped_column(Integer, ForeignKey('nftcollections.id', ondelete='CASCADE'), primary_key=True)
+    item_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    listed_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    floor_price: Mapped[Decimal | None] = mapped_column(Numeric(10, 2), nullable=True)
+    volume: Mapped[Decimal] = mapped_column(Numeric(36, 2), nullable=False, default=0)
+    owners_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    @classmethod
+    def refresh(cls, collection_id: int | None) -> None:
+        """Recompute stats of one collection with a single aggregate query, inside the current transaction"""
+        if collection_id is None:
+            return
+
+        item_count, listed_count, floor_price, volume, owners_count = db.session.execute(
+            select(
+                func.count(NFT.id),
+                func.count(NFT.id).filter(NFT.is_listed == True),
+                func.min(NFT.price).filter(NFT.is_listed == True),
+                func.coalesce(func.sum(NFT.price), 0),
+                func.count(distinct(NFT.owner_id))
+            ).where(NFT.collection_id == collection_id)
+        ).one()
+
+        stats: CollectionStats = db.session.get(cls, collection_id)
+        if not stats:
+            stats = cls(collection_id=collection_id)
+            db.session.add(stats)
+
+        stats.item_count = item_count
+        stats.listed_count = listed_count
+        stats.floor_price = floor_price
+        stats.volume = volume
+        stats.owners_count = owners_count
+
+class CollectionRanking(db.Model):
+    __tablename__ = 'collection_rankings'
+
+    period: Mapped[str] = mapped_column(String(8), primary_key=True)
+    rank: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    collection_id: Mapped[int] = mapped_column(Integer, ForeignKey('nftcollections.id', ondelete='CASCADE'), nullable=False)
+    volume: Mapped[Decimal] = mapped_column(Numeric(36, 2), nullable=False, default=0)
+    sales: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    floor_price: Mapped[Decimal | None] = mapped_column(Numeric(10, 2), nullable=True)
+    owners_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    item_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    collection = relationship('NFTCollection', lazy='joined')
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.collection_id,
+            "name": self.collection.name,
+            "volume": self.volume.quantize(Decimal('1.00'), rounding=ROUND_HALF_UP),
+            "floor_price": (self.floor_price or Decimal('0')).quantize(Decimal('1.00'), rounding=ROUND_HALF_UP),
+            "sales": self.sales,
+            "owners": self.owners_count,
+            "total_nfts": self.item_count,
+            "rank": self.rank
+        }
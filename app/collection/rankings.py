@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import DateTime, delete, func, insert, literal, select, true
+from flask import Flask
+import threading
+import logging
+import time
+
+from app.collection.models import CollectionRanking, CollectionStats, NFTCollection
+from app.nft.models import Sale
+from app.extensions import db
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+RANKING_PERIODS: dict[str, timedelta | None] = {
+    '24h': timedelta(hours=24),
+    '7d': timedelta(days=7),
+    '30d': timedelta(days=30),
+    'all': None,
+}
+
+def _rankings_select(period: str, since: datetime | None, refreshed_at: datetime):
+    sales = (
+        select(
+            Sale.collection_id,
+            func.sum(Sale.price).label('volume'),
+            func.count(Sale.id).label('sales')
+        )
+        .where(Sale.created_at >= since if since else true())
+        .group_by(Sale.collection_id)
+        .subquery()
+    )
+    volume = func.coalesce(sales.c.volume, 0)
+
+    return (
+        select(
+            literal(period),
+            func.row_number().over(
+                order_by=(volume.desc(), CollectionStats.volume.desc(), NFTCollection.id.asc())
+            ),
+            NFTCollection.id,
+            volume,
+            func.coalesce(sales.c.sales, 0),
+            CollectionStats.floor_price,
+            CollectionStats.owners_count,
+            CollectionStats.item_count,
+            literal(refreshed_at, DateTime)
+        )
+        .select_from(NFTCollection)
+        .join(CollectionStats, CollectionStats.collection_id == NFTCollection.id)
+        .outerjoin(sales, sales.c.collection_id == NFTCollection.id)
+        .where(CollectionStats.item_count > 0)
+    )
+
+def refresh_rankings() -> None:
+    """Rebuild the leaderboard of every period, one INSERT ... SELECT per period"""
+    now = datetime.now(timezone.utc)
+    columns = [
+        CollectionRanking.period,
+        CollectionRanking.rank,
+        CollectionRanking.collection_id,
+        CollectionRanking.volume,
+        CollectionRanking.sales,
+        CollectionRanking.floor_price,
+        CollectionRanking.owners_count,
+        CollectionRanking.item_count,
+        CollectionRanking.refreshed_at,
+    ]
+
+    for period, delta in RANKING_PERIODS.items():
+        since = now - delta if delta else None
+        db.session.execute(delete(CollectionRanking).where(CollectionRanking.period == period))
+        db.session.execute(
+            insert(CollectionRanking).from_select(columns, _rankings_select(period, since, now))
+        )
+
+    db.session.commit()
+
+class RankingsRefresher:
+    """Background thread that refreshes collection rankings on an interval or after trades"""
+
+    def __init__(self) -> None:
+        self.app: Flask | None = None
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._last_refresh: float = 0.0
+
+    def init_app(self, app: Flask) -> None:
+        self.app = app
+        app.extensions['rankings_refresher'] = self
+
+        if not app.testing:
+            self.start()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._thread = threading.Thread(target=self._run, name='rankings-refresher', daemon=True)
+        self._thread.start()
+
+    def notify(self) -> None:
+        """Ask for an early refresh, e.g. after a sale"""
+        self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(timeout=settings.app.RANKINGS_REFRESH_SECONDS)
+            self._wake.clear()
+
+            wait = settings.app.RANKINGS_MIN_REFRESH_SECONDS - (time.monotonic() - self._last_refresh)
+            if wait > 0:
+                time.sleep(wait)
+
+            with self.app.app_context():
+                try:
+                    refresh_rankings()
+                except Exception:
+                    db.session.rollback()
+                    logger.exception('Collection rankings refresh failed')
+                finally:
+                    db.session.remove()
+
+            self._last_refresh = time.monotonic()
+
+rankings_refresher = RankingsRefresher()
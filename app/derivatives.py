@@ -0,0 +1,179 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from PIL import Image, ImageOps
+from collections import Counter
+from pathlib import Path
+from flask import Flask
+import multiprocessing
+import threading
+import logging
+import os
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+DERIVED_FOLDER_NAME: str = 'derived'
+POSTER: str = 'poster'
+# format -> (file extension, Pillow save options)
+DERIVATIVE_FORMATS: dict[str, tuple[str, dict]] = {
+    'WEBP': ('webp', {'quality': 80, 'method': 4}),
+    'JPEG': ('jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+def derivative_path(original: Path, size: int | str, extension: str) -> Path:
+    """Where the `size` rendition of `original` is stored: <folder>/derived/<filename>.<size>.<extension>"""
+    return original.parent / DERIVED_FOLDER_NAME / f'{original.name}.{size}.{extension}'
+
+def _save(image: Image.Image, original: Path, size: int | str) -> list[str]:
+    written: list[str] = []
+    for image_format, (extension, options) in DERIVATIVE_FORMATS.items():
+        target = derivative_path(original, size, extension)
+        converted = image
+        if image_format == 'JPEG' and image.mode != 'RGB':
+            converted = Image.new('RGB', image.size, 'white')
+            converted.paste(image, mask=image.getchannel('A') if 'A' in image.getbands() else None)
+
+        # write next to the target and rename, so a half-written file is never served
+        partial = target.with_name(f'.{target.name}.{os.getpid()}')
+        converted.save(partial, image_format, **options)
+        os.replace(partial, target)
+        written.append(target.name)
+    return written
+
+def render_derivatives(original: str, widths: tuple[int, ...]) -> list[str]:
+    """Write the fixed-width renditions of `original` (and a poster when it is animated).
+
+    Runs in a worker process; animated images are rendered from their first frame.
+    Widths above the original's are not upscaled.
+    """
+    source = Path(original)
+    (source.parent / DERIVED_FOLDER_NAME).mkdir(exist_ok=True)
+
+    with Image.open(source) as opened:
+        animated: bool = getattr(opened, 'is_animated', False)
+        opened.seek(0)
+        has_alpha: bool = 'A' in opened.getbands() or 'transparency' in opened.info
+        frame = ImageOps.exif_transpose(opened).convert('RGBA' if has_alpha else 'RGB')
+
+    written: list[str] = []
+    if animated:
+        written += _save(frame, source, POSTER)
+
+    for width in widths:
+        if frame.width > width:
+            resized = frame.resize((width, round(frame.height * width / frame.width)), Image.Resampling.LANCZOS)
+        else:
+            resized = frame
+        written += _save(resized, source, width)
+    return written
+
+def remove_derivatives(original: Path) -> None:
+    for derived in (original.parent / DERIVED_FOLDER_NAME).glob(f'{original.name}.*'):
+        derived.unlink(missing_ok=True)
+
+class DerivativePipeline:
+    """Renders resized WebP/JPEG copies of uploads on a process pool.
+
+    Uploads only enqueue their file; until the renditions exist the image routes
+    fall back to the original. `submit` runs from commit hooks, so it never raises:
+    a failure is counted and logged, and a pool broken by a dead worker is replaced.
+    """
+
+    def __init__(self) -> None:
+        self.app: Flask | None = None
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending: set[str] = set()
+        self.counters: Counter = Counter()
+
+    def init_app(self, app: Flask) -> None:
+        self.app = app
+        app.extensions['image_derivatives'] = self
+
+    @property
+    def widths(self) -> tuple[int, ...]:
+        return settings.app.IMAGE_DERIVATIVE_WIDTHS
+
+    @staticmethod
+    def _context():
+        """Workers come from a forkserver, or are spawned where there is none.
+
+        Forking the app process itself could copy locks held by its background threads.
+        The forkserver preloads this module, which imports the whole `app` package
+        (blueprints, models, key ring, settings) once there instead of in every worker;
+        it never calls create_app, so no background job or connection is started.
+        """
+        if 'forkserver' not in multiprocessing.get_all_start_methods():
+            return multiprocessing.get_context('spawn')
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload([__name__])
+        return context
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=settings.app.IMAGE_DERIVATIVE_WORKERS,
+                    mp_context=self._context()
+                )
+            return self._executor
+
+    def submit(self, original: Path) -> Future | None:
+        key = str(original)
+        with self._lock:
+            if key in self._pending:
+                return None
+            self._pending.add(key)
+        self.counters['submitted'] += 1
+
+        executor: ProcessPoolExecutor | None = None
+        try:
+            executor = self._pool()
+            future = executor.submit(render_derivatives, key, self.widths)
+        except Exception as error:
+            with self._lock:
+                self._pending.discard(key)
+            self.counters['failed'] += 1
+            logger.warning('Queueing derivatives of %s failed: %s', key, error)
+            if isinstance(error, BrokenProcessPool) and executor:
+                self._replace(executor)
+            return None
+
+        future.add_done_callback(lambda done: self._finished(key, executor, done))
+        return future
+
+    def _replace(self, broken: ProcessPoolExecutor) -> None:
+        """Drop a pool whose worker died; the next submit starts a fresh one"""
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = None
+        self.counters['pool_restarts'] += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _finished(self, key: str, executor: ProcessPoolExecutor, future: Future) -> None:
+        with self._lock:
+            self._pending.discard(key)
+        error = 'cancelled' if future.cancelled() else future.exception()
+        if error:
+            self.counters['failed'] += 1
+            logger.warning('Rendering derivatives of %s failed: %s', key, error)
+            if isinstance(error, BrokenProcessPool):
+                self._replace(executor)
+        else:
+            self.counters['rendered'] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            'widths': list(self.widths),
+            'pending': pending,
+            'submitted': self.counters['submitted'],
+            'rendered': self.counters['rendered'],
+            'failed': self.counters['failed'],
+            'pool_restarts': self.counters['pool_restarts'],
+        }
+
+image_derivatives = DerivativePipeline()
@@ -1,16 +1,97 @@
-
 from flask_limiter.util import get_remote_address
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
+from sqlalchemy.engine import make_url
 from flask_limiter import Limiter
-from sqlalchemy import Engine, event
+from sqlalchemy import Engine, Numeric, event
+from sqlalchemy.types import TypeDecorator
+from decimal import Decimal
+
+from config import settings
 
 db = SQLAlchemy()
 limiter = Limiter(key_func=get_remote_address, default_limits=["200 per day", "50 per hour"])
 login_manager = LoginManager()
 
-@event.listens_for(Engine, "connect")
-def enforce_foreign_keys(dbapi_connection, connection_record):
-    cursor = dbapi_connection.cursor()
-    cursor.execute("PRAGMA foreign_keys=ON")
-    cursor.close()
+class Money(TypeDecorator):
+    """Numeric column that reads back the Decimal that was written on every backend.
+
+    SQLite keeps NUMERIC values as doubles and SQLAlchemy expands them to `scale`
+    digits (0.1 reads as 0.100000000000000006); going through the shortest float
+    repr instead returns 0.1, as Postgres does.
+    """
+
+    impl = Numeric
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'sqlite':
+            return dialect.type_descriptor(Numeric(self.impl.precision, self.impl.scale, asdecimal=False))
+        return dialect.type_descriptor(self.impl)
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and dialect.name == 'sqlite':
+            return float(value)
+        return value
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, Decimal):
+            return value
+        return Decimal(repr(value))
+
+def sqlite_pragmas(profile: str) -> dict[str, str | int]:
+    """PRAGMAs run on every new SQLite connection of `profile`.
+
+    Foreign keys are always enforced. WAL lets readers work while one writer commits,
+    NORMAL sync is durable in WAL mode except for the last commits on power loss, and
+    busy_timeout makes a writer wait for the lock instead of failing with "database is locked".
+    """
+    if profile != 'tuned':
+        return {'foreign_keys': 'ON'}
+
+    return {
+        'foreign_keys': 'ON',
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': settings.db.SQLITE_BUSY_TIMEOUT_MS,
+        'mmap_size': settings.db.SQLITE_MMAP_SIZE_MB * 1024 * 1024,
+        'cache_size': -settings.db.SQLITE_CACHE_SIZE_MB * 1024,
+        'temp_store': 'MEMORY',
+    }
+
+def configure_engine(engine: Engine, sqlite_profile: str) -> None:
+    """Per-connection setup of `engine`; only SQLite needs any, other backends are left untouched"""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    pragmas = sqlite_pragmas(sqlite_profile)
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+def engine_options(database_url: str) -> dict:
+    """Pool settings for threaded servers; SQLite file databases get a thread-shareable pool,
+    Postgres connections are pinged on checkout so a restarted server does not fail requests"""
+    url = make_url(database_url)
+    backend: str = url.get_backend_name()
+    if backend == 'sqlite' and url.database in (None, '', ':memory:'):
+        return {}
+
+    options: dict = {
+        'pool_size': settings.db.DB_POOL_SIZE,
+        'max_overflow': settings.db.DB_MAX_OVERFLOW,
+        'pool_timeout': settings.db.DB_POOL_TIMEOUT,
+        'pool_recycle': settings.db.DB_POOL_RECYCLE,
+    }
+    if backend == 'postgresql':
+        options['pool_pre_ping'] = True
+    if backend == 'sqlite':
+        options['connect_args'] = {
+            'check_same_thread': False,
+            'timeout': settings.db.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        }
+    return options
@@ -0,0 +1,181 @@
+from flask import Response, abort, request, send_from_directory
+from sqlalchemy import event, inspect, select
+from collections import Counter, OrderedDict
+from sqlalchemy.orm import Session
+from dataclasses import dataclass
+from pathlib import Path
+import threading
+import hashlib
+import time
+
+from app.derivatives import POSTER, derivative_path
+from app.shards import resolve_upload
+from app.extensions import db
+from config import settings
+
+IMMUTABLE_MAX_AGE: int = 365 * 24 * 3600
+
+@dataclass(frozen=True)
+class ImageSource:
+    """Where one kind of image lives: the row that names the file and the folder holding it"""
+
+    model: type
+    key: str
+    column: str
+    folder: Path
+    path: str
+    blocked: str | None = None
+    defaults: tuple[str, ...] = ()
+    defaults_folder: Path | None = None
+
+IMAGE_SOURCES: dict[str, ImageSource] = {}
+
+def register_image_source(name: str, source: ImageSource) -> None:
+    IMAGE_SOURCES[name] = source
+
+def image_version(filename: str) -> str:
+    # stored filenames are the hash of their content (older ones carry a uuid per upload)
+    return hashlib.sha256(filename.encode()).hexdigest()[:16]
+
+def image_url(name: str, obj, size: int | str | None = None) -> str:
+    """URL of the `name` image of `obj`, versioned so browsers may cache it forever.
+
+    `size` asks for a fixed-width rendition (or the poster frame of an animation).
+    """
+    source = IMAGE_SOURCES[name]
+    url: str = source.path.format(getattr(obj, source.key))
+    filename: str | None = getattr(obj, source.column)
+    if not filename:
+        return url
+    url = f'{url}?v={image_version(filename)}'
+    return f'{url}&size={size}' if size else url
+
+def _derivative(original: Path, size: str | None) -> tuple[Path, str] | None:
+    """Rendition of `original` for `size` in the best format the client accepts, if it exists yet"""
+    if size != POSTER and (not size or not size.isdigit() or int(size) not in settings.app.IMAGE_DERIVATIVE_WIDTHS):
+        return None
+
+    extensions = ('webp', 'jpg') if 'image/webp' in request.accept_mimetypes else ('jpg',)
+    for extension in extensions:
+        derived = derivative_path(original, size, extension)
+        if derived.exists():
+            return derived, extension
+    return None
+
+class ImageLookup:
+    """LRU of (image kind, key) -> (filename, blocked) so serving an image skips the database.
+
+    Entries are dropped on commit when the filename or blocked flag of their row
+    changes or the row is deleted. Commits made by other worker processes are not
+    seen here, so entries also expire after IMAGE_LOOKUP_TTL_SECONDS.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, str], tuple[str, bool, float]] = OrderedDict()
+        self.counters: Counter = Counter()
+
+    def get(self, name: str, key) -> tuple[str, bool] | None:
+        cache_key = (name, str(key))
+        with self._lock:
+            cached = self._entries.get(cache_key)
+            if cached and cached[2] > time.monotonic():
+                self._entries.move_to_end(cache_key)
+                self.counters['hits'] += 1
+                return cached[0], cached[1]
+            self.counters['misses'] += 1
+
+        source = IMAGE_SOURCES[name]
+        columns = [getattr(source.model, source.column)]
+        if source.blocked:
+            columns.append(getattr(source.model, source.blocked))
+        row = db.session.execute(
+            select(*columns).where(getattr(source.model, source.key) == key)
+        ).first()
+        if not row or not row[0]:
+            return None
+
+        found = (row[0], bool(row[1]) if source.blocked else False)
+        with self._lock:
+            self._entries[cache_key] = (*found, time.monotonic() + settings.app.IMAGE_LOOKUP_TTL_SECONDS)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > settings.app.IMAGE_LOOKUP_CACHE_SIZE:
+                self._entries.popitem(last=False)
+        return found
+
+    def invalidate(self, cache_keys) -> None:
+        with self._lock:
+            for cache_key in cache_keys:
+                self._entries.pop(cache_key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.counters['hits'], 'misses': self.counters['misses']}
+
+image_lookup = ImageLookup()
+
+def send_image(name: str, key) -> Response:
+    """Serve the `name` image of the row identified by `key`.
+
+    The ETag is the image version; a request carrying the current version in `v`
+    is cacheable for a year as immutable, any other is revalidated every time.
+    With `size`, the WebP (or JPEG) rendition is sent once it has been rendered.
+    """
+    found = image_lookup.get(name, key)
+    if not found:
+        return abort(404)
+
+    filename, blocked = found
+    if blocked:
+        return abort(403)
+
+    source = IMAGE_SOURCES[name]
+    folder: Path = source.defaults_folder if filename in source.defaults else source.folder
+    version: str = image_version(filename)
+    immutable: bool = request.args.get('v') == version
+
+    original: Path = resolve_upload(folder, filename)
+    size: str | None = request.args.get('size')
+    if size:
+        derived = _derivative(original, size)
+        if not derived:
+            # still rendering (or no such size): the original, without letting it be cached as the rendition
+            return send_from_directory(original.parent, original.name, etag=version, max_age=None)
+
+        path, extension = derived
+        response: Response = send_from_directory(
+            path.parent, path.name, etag=f'{version}-{size}-{extension}',
+            max_age=IMMUTABLE_MAX_AGE if immutable else None
+        )
+        response.vary.add('Accept')
+    else:
+        response = send_from_directory(
+            original.parent, original.name, etag=version, max_age=IMMUTABLE_MAX_AGE if immutable else None
+        )
+
+    if immutable:
+        response.cache_control.immutable = True
+    return response
+
+@event.listens_for(Session, 'after_flush')
+def _collect_image_changes(session: Session, flush_context) -> None:
+    changed: set[tuple[str, str]] = session.info.setdefault('images_pending', set())
+
+    for name, source in IMAGE_SOURCES.items():
+        watched = (source.column, source.blocked) if source.blocked else (source.column,)
+        for obj in session.dirty | session.deleted:
+            if not isinstance(obj, source.model):
+                continue
+            state = inspect(obj)
+            if obj in session.deleted or any(state.attrs[attr].history.has_changes() for attr in watched):
+                changed.add((name, str(getattr(obj, source.key))))
+
+@event.listens_for(Session, 'after_commit')
+def _apply_image_changes(session: Session) -> None:
+    changed = session.info.pop('images_pending', None)
+    if changed:
+        image_lookup.invalidate(changed)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_image_changes(session: Session) -> None:
+    session.info.pop('images_pending', None)
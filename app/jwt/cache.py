@@ -0,0 +1,121 @@
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+from collections import Counter, OrderedDict
+import threading
+import hashlib
+import time
+
+from app.user.models import User
+from app.extensions import db
+from config import settings
+
+class AuthCache:
+    """Per-process cache in front of `jwt_required`.
+
+    Verified access tokens are kept by SHA-256 digest until their own `exp`, so a
+    repeated bearer token skips the RSA verify. The (exists, is_blocked) status of
+    their user is kept for JWT_USER_STATUS_TTL_SECONDS and dropped as soon as a commit
+    changes `is_blocked` or deletes the user. Both maps are LRU-bounded.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._tokens: OrderedDict[bytes, tuple[dict, float]] = OrderedDict()
+        self._users: OrderedDict[int, tuple[bool, bool, float]] = OrderedDict()
+        self.counters: Counter = Counter()
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get_payload(self, token: str) -> dict | None:
+        key = self._digest(token)
+        with self._lock:
+            cached = self._tokens.get(key)
+            if cached and cached[1] > time.time():
+                self._tokens.move_to_end(key)
+                self.counters['token_hits'] += 1
+                return cached[0].copy()
+            if cached:
+                del self._tokens[key]
+            self.counters['token_misses'] += 1
+        return None
+
+    def put_payload(self, token: str, payload: dict) -> None:
+        expires_at = payload.get('exp')
+        if not isinstance(expires_at, (int, float)):
+            return
+
+        with self._lock:
+            self._tokens[self._digest(token)] = (payload.copy(), float(expires_at))
+            while len(self._tokens) > settings.jwt.TOKEN_CACHE_SIZE:
+                self._tokens.popitem(last=False)
+
+    def user_status(self, user_id: int) -> tuple[bool, bool]:
+        """(exists, is_blocked) of `user_id`, from the cache or one indexed lookup"""
+        with self._lock:
+            cached = self._users.get(user_id)
+            if cached and cached[2] > time.monotonic():
+                self._users.move_to_end(user_id)
+                self.counters['user_hits'] += 1
+                return cached[0], cached[1]
+            self.counters['user_misses'] += 1
+
+        is_blocked = db.session.execute(
+            select(User.is_blocked).where(User.id == user_id)
+        ).scalar_one_or_none()
+        status = (is_blocked is not None, bool(is_blocked))
+
+        with self._lock:
+            self._users[user_id] = (*status, time.monotonic() + settings.jwt.USER_STATUS_TTL_SECONDS)
+            self._users.move_to_end(user_id)
+            while len(self._users) > settings.jwt.TOKEN_CACHE_SIZE:
+                self._users.popitem(last=False)
+        return status
+
+    def invalidate_users(self, user_ids) -> None:
+        with self._lock:
+            for user_id in user_ids:
+                if self._users.pop(user_id, None):
+                    self.counters['user_invalidations'] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tokens.clear()
+            self._users.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'tokens': len(self._tokens),
+                'users': len(self._users),
+                'token_hits': self.counters['token_hits'],
+                'token_misses': self.counters['token_misses'],
+                'user_hits': self.counters['user_hits'],
+                'user_misses': self.counters['user_misses'],
+                'user_invalidations': self.counters['user_invalidations'],
+            }
+
+auth_cache = AuthCache()
+
+@event.listens_for(Session, 'after_flush')
+def _collect_user_status_changes(session: Session, flush_context) -> None:
+    changed: set[int] = session.info.setdefault('auth_pending', set())
+
+    for obj in session.dirty:
+        if isinstance(obj, User) and inspect(obj).attrs.is_blocked.history.has_changes():
+            changed.add(obj.id)
+
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            changed.add(obj.id)
+
+@event.listens_for(Session, 'after_commit')
+def _apply_user_status_changes(session: Session) -> None:
+    changed = session.info.pop('auth_pending', None)
+    if changed:
+        auth_cache.invalidate_users(changed)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_user_status_changes(session: Session) -> None:
+    session.info.pop('auth_pending', None)
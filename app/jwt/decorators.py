@@ -5,7 +5,7 @@ from flask.globals import g
 from functools import wraps
 
 from app.jwt.utils import verify_token
-from app.user.models import User
+from app.jwt.cache import auth_cache
 
 def jwt_required(fn):
     @wraps(fn)
@@ -16,15 +16,22 @@ def jwt_required(fn):
             return jsonify({"error": "Authorization header missing or invalid"}), 401
             
         token: str = authorization.split()[1]
-        payload: dict = verify_token(token)
+        payload: dict | None = auth_cache.get_payload(token)
 
-        if not payload:
-            return jsonify({"error": "Invalid token"}), 401
+        if payload is None:
+            payload = verify_token(token)
+            if not payload:
+                return jsonify({"error": "Invalid token"}), 401
+            auth_cache.put_payload(token, payload)
         
-        if not User.query.filter_by(id=payload.get('user_id', None)).first():
+        exists, is_blocked = auth_cache.user_status(payload.get('user_id', None))
+        if not exists:
             return jsonify({"error": "Invalid token"}), 401
 
-        g.jwt_payload = payload.copy()
+        if is_blocked:
+            return jsonify({"error": "Account blocked"}), 403
+
+        g.jwt_payload = payload
 
         return fn(*args, **kwargs)
     return wrapper
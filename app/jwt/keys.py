@@ -0,0 +1,124 @@
+from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat, load_pem_private_key, load_pem_public_key
+from cryptography.hazmat.primitives.asymmetric.ec import SECP256R1, EllipticCurvePublicKey
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
+from jwt.algorithms import get_default_algorithms
+from dataclasses import dataclass, field
+from pathlib import Path
+import hashlib
+import base64
+import json
+
+from config import settings
+
+# members of each key type that go into the RFC 7638 thumbprint
+THUMBPRINT_MEMBERS: dict[str, tuple[str, ...]] = {
+    'RSA': ('e', 'kty', 'n'),
+    'EC': ('crv', 'kty', 'x', 'y'),
+    'OKP': ('crv', 'kty', 'x'),
+}
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+def key_algorithm(public_key) -> str:
+    """JWS algorithm used with `public_key`, decided by its type"""
+    if isinstance(public_key, Ed25519PublicKey):
+        return 'EdDSA'
+    if isinstance(public_key, EllipticCurvePublicKey) and isinstance(public_key.curve, SECP256R1):
+        return 'ES256'
+    if isinstance(public_key, RSAPublicKey):
+        return 'RS256'
+    raise ValueError(f'Unsupported JWT key type {type(public_key).__name__}')
+
+def public_jwk(public_key, algorithm: str) -> dict:
+    """JWK of `public_key` with its RFC 7638 thumbprint as `kid`"""
+    jwk: dict = get_default_algorithms()[algorithm].to_jwk(public_key, as_dict=True)
+    members = {name: jwk[name] for name in THUMBPRINT_MEMBERS[jwk['kty']]}
+    thumbprint = hashlib.sha256(json.dumps(members, separators=(',', ':'), sort_keys=True).encode()).digest()
+    return {**jwk, 'kid': _b64url(thumbprint), 'use': 'sig', 'alg': algorithm}
+
+@dataclass(frozen=True)
+class VerifyingKey:
+    kid: str
+    algorithm: str
+    key: object
+    jwk: dict
+    pem: str
+
+@dataclass
+class KeyRing:
+    """Parsed signing key plus every public key tokens may still be signed with.
+
+    PyJWT takes `cryptography` key objects as they are, so nothing is parsed per
+    token. Each key is used with the algorithm of its type (RS256, ES256 or EdDSA),
+    so switching the signing pair to another algorithm keeps verifying tokens of the
+    old one. New tokens carry the signing key's `kid`; to rotate, point the
+    private/public key paths at the new pair and list the old public key in
+    JWT_ROTATED_PUBLIC_KEY_PATHS until the last token it signed has expired.
+    Tokens issued before `kid` headers existed are checked against every key of the
+    algorithm named in their header, the signing key first.
+    """
+
+    algorithm: str
+    private_key: object
+    signing_kid: str
+    keys: dict[str, VerifyingKey] = field(default_factory=dict)
+    jwks_body: bytes = b''
+    etag: str = ''
+
+    @classmethod
+    def load(cls, private_key_path: Path, public_key_paths: list[Path], algorithm: str) -> 'KeyRing':
+        private_key = load_pem_private_key(private_key_path.read_bytes(), password=None)
+        public_keys = [load_pem_public_key(path.read_bytes()) for path in public_key_paths]
+        try:
+            return cls.from_keys(private_key, public_keys, algorithm)
+        except ValueError as e:
+            raise ValueError(f'{private_key_path}: {e}') from e
+
+    @classmethod
+    def from_keys(cls, private_key, public_keys: list, algorithm: str) -> 'KeyRing':
+        """Ring signing with `private_key`; its public half must be one of `public_keys`"""
+        signing_algorithm: str = key_algorithm(private_key.public_key())
+        if signing_algorithm != algorithm:
+            raise ValueError(f'signing key is for {signing_algorithm} but JWT_ALGORITHM is {algorithm}')
+
+        keys: dict[str, VerifyingKey] = {}
+        for public_key in public_keys:
+            key_alg = key_algorithm(public_key)
+            jwk = public_jwk(public_key, key_alg)
+            pem = public_key.public_bytes(Encoding.PEM, PublicFormat.SubjectPublicKeyInfo).decode()
+            keys[jwk['kid']] = VerifyingKey(kid=jwk['kid'], algorithm=key_alg, key=public_key, jwk=jwk, pem=pem)
+
+        signing_kid: str = public_jwk(private_key.public_key(), algorithm)['kid']
+        if signing_kid not in keys:
+            raise ValueError('none of the public keys is the public half of the signing key')
+
+        jwks_body = json.dumps({'keys': [key.jwk for key in keys.values()]}, sort_keys=True).encode()
+        return cls(
+            algorithm=algorithm,
+            private_key=private_key,
+            signing_kid=signing_kid,
+            keys=keys,
+            jwks_body=jwks_body,
+            etag=hashlib.sha256(jwks_body).hexdigest()[:32],
+        )
+
+    @property
+    def signing_key(self) -> VerifyingKey:
+        return self.keys[self.signing_kid]
+
+    def verifying_keys(self, kid: str | None, algorithm: str | None) -> list[VerifyingKey]:
+        """Keys a token with header `kid` and `alg` may have been signed with"""
+        if kid is not None:
+            return [self.keys[kid]] if kid in self.keys else []
+        return sorted(
+            (key for key in self.keys.values() if key.algorithm == algorithm),
+            key=lambda key: key.kid != self.signing_kid
+        )
+
+key_ring = KeyRing.load(
+    settings.jwt.PRIVATE_KEY,
+    [settings.jwt.PUBLIC_KEY, *settings.jwt.ROTATED_PUBLIC_KEYS],
+    settings.jwt.ALGORITHM
+)
@@ -5,16 +5,25 @@ from flask.json import jsonify
 from flask import Response
 
 from app.jwt.utils import verify_token, generate_tokens
+from app.jwt.keys import key_ring
 from config import settings
 from app.jwt import jwt_bp
 
+def _cacheable(response: Response) -> Response:
+    response.set_etag(key_ring.etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = settings.jwt.JWKS_MAX_AGE_SECONDS
+    return response.make_conditional(request)
+
 @jwt_bp.route('/public-key', methods=['GET'])
 def get_public_key() -> Response:
-    try:
-        public_key: str = settings.jwt.PUBLIC_KEY.read_text()
-        return jsonify({'status': 'success', 'key': public_key}), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    signing_key = key_ring.signing_key
+    return _cacheable(jsonify({'status': 'success', 'key': signing_key.pem, 'kid': signing_key.kid}))
+
+@jwt_bp.route('/jwks.json', methods=['GET'])
+def get_jwks() -> Response:
+    """Every key a valid token may be signed with, for verifying tokens outside this app"""
+    return _cacheable(Response(key_ring.jwks_body, mimetype='application/jwk-set+json'))
     
 @jwt_bp.route('/refresh', methods=['POST'])
 def refresh() -> Response:
@@ -1,31 +1,36 @@
-
 from datetime import datetime, timedelta, timezone
 from typing import Any
 import jwt
 
+from app.jwt.keys import KeyRing, key_ring
 from config import settings
 
-def encode_jwt(
-    payload: dict[str, Any],
-    key: str = settings.jwt.PRIVATE_KEY.read_text(),
-    algorithm: str = settings.jwt.ALGORITHM
-) -> str:
+def encode_jwt(payload: dict[str, Any], keys: KeyRing = key_ring) -> str:
     payload_copy = payload.copy()
     return jwt.encode(
         payload=payload_copy,
-        key=key,
-        algorithm=algorithm
+        key=keys.private_key,
+        algorithm=keys.algorithm,
+        headers={'kid': keys.signing_kid}
     )
 
-def decode_jwt(
-    token: str | bytes,
-    key: str = settings.jwt.PUBLIC_KEY.read_text(),
-    algorithm: str = settings.jwt.ALGORITHM
-) -> dict: 
+def decode_jwt(token: str | bytes, keys: KeyRing = key_ring) -> dict:
+    header: dict = jwt.get_unverified_header(token)
+    candidates = keys.verifying_keys(header.get('kid'), header.get('alg'))
+    if not candidates:
+        raise jwt.InvalidTokenError('Unknown signing key')
+
+    # only tokens without a `kid` can have more than one candidate
+    for verifying_key in candidates[:-1]:
+        try:
+            return jwt.decode(jwt=token, key=verifying_key.key, algorithms=[verifying_key.algorithm])
+        except jwt.InvalidSignatureError:
+            continue
+
     return jwt.decode(
         jwt=token,
-        key=key,
-        algorithms=[algorithm]
+        key=candidates[-1].key,
+        algorithms=[candidates[-1].algorithm]
     )
 
 def generate_tokens(user_id: int, role: str = 'user') -> tuple[str]:
@@ -13,9 +13,9 @@ from app.collection.models import NFTCollection
 from app.main.decorators import admin_required
 from app.main.utils import validate_wallet_id
 from app.jwt.utils import generate_tokens
+from app.user.passwords import HasherBusy
 from app.extensions import login_manager
-from app.nft.models import NFT, Category, Offer
-from config import ALLOWED_EXTENSIONS
+from app.nft.models import NFT, Category, MediaType, Offer
 from app.user.models import User
 from app.extensions import db
 from app.main import main_bp
@@ -25,6 +25,11 @@ from config import settings
 def load_user(user_id):
     return User.query.get(int(user_id))
 
+def _hasher_busy():
+    response = jsonify({"message": "Too many sign-ins right now, please try again shortly"})
+    response.headers["Retry-After"] = str(settings.app.PASSWORD_HASH_RETRY_AFTER_SECONDS)
+    return response, 503
+
 
 @main_bp.route("/", methods=['GET'])
 def index_page():
@@ -70,7 +75,10 @@ def create_acount():
         wallet=data.wallet_id,
         email=data.email,
     )
-    new_user.hash_password(data.password)
+    try:
+        new_user.hash_password(data.password)
+    except HasherBusy:
+        return _hasher_busy()
 
     db.session.add(new_user)
     db.session.commit()
@@ -119,11 +127,19 @@ def login():
     if not user:
         return jsonify({"message": "User with that email Doesn't exists"}), 400
 
-    if not User.query.filter_by(username=data.username):
-        return jsonify({"message": "Username Doesn't exists"}), 400
-
-    if not user.validate_password(data.password):
-        return jsonify({"message": "Invalid Password"}), 400
+    try:
+        if not user.validate_password(data.password):
+            return jsonify({"message": "Invalid Password"}), 400
+    except HasherBusy:
+        return _hasher_busy()
+
+    if user.password_needs_rehash():
+        try:
+            user.hash_password(data.password)
+            db.session.commit()
+        except HasherBusy:
+            # the stored hash still works, rehash on a later login
+            pass
 
     access_token, refresh_token = generate_tokens(user.id, user.role)
 
@@ -165,7 +181,7 @@ def logout():
 def drops_page():
     nft_categories: list[Category] = Category.query.all()
 
-    return render_template('main/drops.html', categories=nft_categories, file_types=ALLOWED_EXTENSIONS)
+    return render_template('main/drops.html', categories=nft_categories, file_types=list(MediaType))
 
 @main_bp.route('/admin', methods=['GET'])
 @admin_required
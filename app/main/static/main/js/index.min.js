@@ -1,4 +1,4 @@
-import{fetchWithAuth}from"./../../../main/main/js/useAuth.min.js";let trustedByScroller=document.querySelector("#trustedBy"),trustedByScrollerInner=trustedByScroller.querySelector(".scroll__items"),categoryBtns=document.querySelectorAll(".categories__btn"),nftsWrapper=document.querySelector(".categories__drops-wrapper"),loader=document.getElementById("categoryLoader"),moreCategoryBtnText=document.querySelector("#categoriesMoreBtn .btn__text"),currentCategory=sessionStorage.getItem("currentCategory")??1,hoverTime=null,scrollable=!1;function initApp(){initCategoryBtns(),addAnimation(),document.addEventListener("DOMContentLoaded",async()=>{await loadNfts(currentCategory),await getCollections()})}function initCategoryScroll(){5<nftsWrapper.children.length&&(nftsWrapper.addEventListener("mouseenter",()=>{hoverTime=setTimeout(()=>{scrollable=!0,nftsWrapper.classList.add("scroll")},700)}),nftsWrapper.addEventListener("mouseleave",()=>{clearTimeout(hoverTime),scrollable=!1,nftsWrapper.classList.remove("scroll")}),nftsWrapper.addEventListener("wheel",categoryScroll,{passive:!1}))}function categoryScroll(e){scrollable&&0!==e.deltaY&&(e.preventDefault(),nftsWrapper.scrollLeft+=e.deltaY)}function addAnimation(){Array.from(trustedByScrollerInner.children).forEach(e=>{e=e.cloneNode(!0);e.setAttribute("aria-hidden",!0),trustedByScrollerInner.appendChild(e)})}function changeCategoryMoreBtn(e){e=e.querySelector(".categories__btn-text").textContent;moreCategoryBtnText.textContent="View All in "+e}function initCategoryBtns(){var e=categoryBtns[currentCategory-1];e.classList.add("active"),changeCategoryMoreBtn(e),categoryBtns.forEach(e=>{e.addEventListener("click",nftsByCategory)})}async function nftsByCategory(e){categoryBtns.forEach(e=>e.classList.remove("active"));var e=e.target.closest(".categories__btn"),t=(e.classList.add("active"),e.dataset.categoryid);sessionStorage.setItem("currentCategory",t),changeCategoryMoreBtn(e),loader.style.display="flex",nftsWrapper.style.display="none",await loadNfts(t)}async function loadNfts(e){try{var t=await fetchWithAuth("api/nft/get-category-nfts/"+e,{method:"GET"}),r=await t.json();t.ok?0===r.nfts.length?noNftsRender(e):renderNfts(r.nfts):(noNftsRender(e),console.log(r.error))}catch(e){console.error(e)}finally{setTimeout(()=>{loader.style.display="none",nftsWrapper.style.display="flex"},200)}}async function renderNfts(e){var t;nftsWrapper.innerHTML="";for(t of e)t.image=await(async e=>{e=await fetch(`/nft/${e}/get-image`);if(e.ok)return e.url;console.log(e)})(t.token_id),renderNft(t)}function noNftsRender(e){var e=categoryBtns[e-1].querySelector(".categories__btn-text").textContent,t=(nftsWrapper.innerHTML="",document.createElement("div"));t.classList.add("no-drops-card"),t.innerHTML=`
+import{fetchWithAuth}from"./../../../main/main/js/useAuth.min.js";let trustedByScroller=document.querySelector("#trustedBy"),trustedByScrollerInner=trustedByScroller.querySelector(".scroll__items"),categoryBtns=document.querySelectorAll(".categories__btn"),nftsWrapper=document.querySelector(".categories__drops-wrapper"),loader=document.getElementById("categoryLoader"),moreCategoryBtnText=document.querySelector("#categoriesMoreBtn .btn__text"),currentCategory=sessionStorage.getItem("currentCategory")??1,hoverTime=null,scrollable=!1;function initApp(){initCategoryBtns(),addAnimation(),document.addEventListener("DOMContentLoaded",async()=>{await loadNfts(currentCategory),await getCollections()})}function initCategoryScroll(){5<nftsWrapper.children.length&&(nftsWrapper.addEventListener("mouseenter",()=>{hoverTime=setTimeout(()=>{scrollable=!0,nftsWrapper.classList.add("scroll")},700)}),nftsWrapper.addEventListener("mouseleave",()=>{clearTimeout(hoverTime),scrollable=!1,nftsWrapper.classList.remove("scroll")}),nftsWrapper.addEventListener("wheel",categoryScroll,{passive:!1}))}function categoryScroll(e){scrollable&&0!==e.deltaY&&(e.preventDefault(),nftsWrapper.scrollLeft+=e.deltaY)}function addAnimation(){Array.from(trustedByScrollerInner.children).forEach(e=>{e=e.cloneNode(!0);e.setAttribute("aria-hidden",!0),trustedByScrollerInner.appendChild(e)})}function changeCategoryMoreBtn(e){e=e.querySelector(".categories__btn-text").textContent;moreCategoryBtnText.textContent="View All in "+e}function initCategoryBtns(){var e=categoryBtns[currentCategory-1];e.classList.add("active"),changeCategoryMoreBtn(e),categoryBtns.forEach(e=>{e.addEventListener("click",nftsByCategory)})}async function nftsByCategory(e){categoryBtns.forEach(e=>e.classList.remove("active"));var e=e.target.closest(".categories__btn"),t=(e.classList.add("active"),e.dataset.categoryid);sessionStorage.setItem("currentCategory",t),changeCategoryMoreBtn(e),loader.style.display="flex",nftsWrapper.style.display="none",await loadNfts(t)}async function loadNfts(e){try{var t=await fetchWithAuth("api/nft/get-category-nfts/"+e,{method:"GET"}),r=await t.json();t.ok?0===r.nfts.length?noNftsRender(e):renderNfts(r.nfts):(noNftsRender(e),console.log(r.error))}catch(e){console.error(e)}finally{setTimeout(()=>{loader.style.display="none",nftsWrapper.style.display="flex"},200)}}async function renderNfts(e){var t;nftsWrapper.innerHTML="";for(t of e)t.image=t.image||await(async e=>{e=await fetch(`/nft/${e}/get-image`);if(e.ok)return e.url;console.log(e)})(t.token_id),renderNft(t)}function noNftsRender(e){var e=categoryBtns[e-1].querySelector(".categories__btn-text").textContent,t=(nftsWrapper.innerHTML="",document.createElement("div"));t.classList.add("no-drops-card"),t.innerHTML=`
     <div class="no-drops-icon">🚫</div>
     <h2>No Latest Drops In ${e}</h2>
     <p>Come back soon — new NFTs are dropping regularly!</p>
@@ -0,0 +1,150 @@
+from sqlalchemy import Numeric, delete, func, insert, literal, select, union_all
+from datetime import datetime, timedelta
+from flask import Flask
+import threading
+import logging
+import time
+
+from app.nft.models import NFT, ActivityRollup, Like, NFTView, Offer, Sale
+from app.extensions import db
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES: dict[str, timedelta] = {
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+}
+
+# SQLite keeps DateTime as text in SQLAlchemy's own format, buckets must compare equal to bound values
+SQLITE_BUCKET_FORMATS: dict[str, str] = {
+    'hour': '%Y-%m-%d %H:00:00.000000',
+    'day': '%Y-%m-%d 00:00:00.000000',
+}
+
+METRICS: tuple[str, ...] = ('views', 'likes', 'offers', 'sales', 'volume')
+
+def truncate(moment: datetime, granularity: str) -> datetime:
+    moment = moment.replace(minute=0, second=0, microsecond=0, tzinfo=None)
+    return moment.replace(hour=0) if granularity == 'day' else moment
+
+def _bucket(column, granularity: str):
+    if db.engine.dialect.name == 'postgresql':
+        return func.date_trunc(granularity, column)
+    return func.strftime(SQLITE_BUCKET_FORMATS[granularity], column)
+
+def _event_select(model, created_at, collection_id, counts: dict, volume, since: datetime | None):
+    query = select(
+        _bucket(created_at, 'hour').label('bucket'),
+        model.nft_id.label('nft_id'),
+        collection_id.label('collection_id'),
+        *[literal(counts.get(metric, 0)).label(metric) for metric in METRICS[:-1]],
+        volume.label('volume')
+    )
+    if collection_id is NFT.collection_id:
+        query = query.join(NFT, NFT.id == model.nft_id)
+    return query.where(created_at >= since) if since else query
+
+def _hourly_events(since: datetime | None):
+    no_volume = literal(0, Numeric(36, 18))
+    return union_all(
+        _event_select(NFTView, NFTView.created_at, NFT.collection_id, {'views': 1}, no_volume, since),
+        _event_select(Like, Like.created_at, NFT.collection_id, {'likes': 1}, no_volume, since),
+        _event_select(Offer, Offer.created_at, NFT.collection_id, {'offers': 1}, no_volume, since),
+        _event_select(Sale, Sale.created_at, Sale.collection_id, {'sales': 1}, Sale.price, since),
+    ).subquery()
+
+def _rollup_insert(source, granularity: str, bucket, scope: str, scope_id=None, *where):
+    columns = [
+        ActivityRollup.granularity,
+        ActivityRollup.scope,
+        ActivityRollup.scope_id,
+        ActivityRollup.bucket,
+        *[getattr(ActivityRollup, metric) for metric in METRICS],
+    ]
+    query = select(
+        literal(granularity),
+        literal(scope),
+        scope_id if scope_id is not None else literal(0),
+        bucket,
+        *[func.sum(source.c[metric]) for metric in METRICS]
+    ).select_from(source).where(*where)
+
+    if scope_id is not None:
+        query = query.where(scope_id.isnot(None)).group_by(bucket, scope_id)
+    else:
+        query = query.group_by(bucket)
+
+    return insert(ActivityRollup).from_select(columns, query)
+
+def compact_activity(full: bool = False) -> datetime | None:
+    """Recompute rollups from the last (possibly partial) hourly bucket onwards.
+
+    Hourly rows are aggregated from the raw event tables, daily rows from the hourly
+    ones. Earlier buckets are left untouched, so a like removed after its hour was
+    compacted stays counted there. Returns the first recomputed hour (None: everything).
+    """
+    since: datetime | None = None
+    if not full:
+        since = db.session.scalar(
+            select(func.max(ActivityRollup.bucket)).where(ActivityRollup.granularity == 'hour')
+        )
+
+    day_since = truncate(since, 'day') if since else None
+    for granularity, start in (('hour', since), ('day', day_since)):
+        query = delete(ActivityRollup).where(ActivityRollup.granularity == granularity)
+        if start:
+            query = query.where(ActivityRollup.bucket >= start)
+        db.session.execute(query)
+
+    events = _hourly_events(since)
+    for scope, scope_id in (('global', None), ('nft', events.c.nft_id), ('collection', events.c.collection_id)):
+        db.session.execute(_rollup_insert(events, 'hour', events.c.bucket, scope, scope_id))
+
+    hourly = select(ActivityRollup).where(ActivityRollup.granularity == 'hour')
+    if day_since:
+        hourly = hourly.where(ActivityRollup.bucket >= day_since)
+    hourly = hourly.subquery()
+    for scope in ('global', 'nft', 'collection'):
+        db.session.execute(_rollup_insert(
+            hourly, 'day', _bucket(hourly.c.bucket, 'day'), scope, hourly.c.scope_id, hourly.c.scope == scope
+        ))
+
+    db.session.commit()
+    return since
+
+class ActivityCompactor:
+    """Background thread that folds new events into the activity rollups every ACTIVITY_ROLLUP_SECONDS"""
+
+    def __init__(self) -> None:
+        self.app: Flask | None = None
+        self._thread: threading.Thread | None = None
+
+    def init_app(self, app: Flask) -> None:
+        self.app = app
+        app.extensions['activity_compactor'] = self
+
+        if not app.testing:
+            self.start()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._thread = threading.Thread(target=self._run, name='activity-compactor', daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self.app.app_context():
+                try:
+                    compact_activity()
+                except Exception:
+                    db.session.rollback()
+                    logger.exception('Activity rollup compaction failed')
+                finally:
+                    db.session.remove()
+
+            time.sleep(settings.app.ACTIVITY_ROLLUP_SECONDS)
+
+activity_compactor = ActivityCompactor()
@@ -0,0 +1,132 @@
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy import bindparam, delete, update
+from collections import Counter
+from flask import Flask
+import threading
+import logging
+import atexit
+import time
+
+from app.nft.models import NFT, Like
+from app.extensions import db
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+class LikeCounter:
+    """Buffers `NFT.likes_count` deltas and applies them in one executemany UPDATE.
+
+    Toggling a like writes only the `likes` row; the hot NFT row is touched once per
+    LIKE_COUNTER_FLUSH_SECONDS no matter how many toggles hit it in between.
+    """
+
+    def __init__(self) -> None:
+        self.app: Flask | None = None
+        self._lock = threading.Lock()
+        self._deltas: Counter = Counter()
+        self._thread: threading.Thread | None = None
+        self.flushes: int = 0
+
+    def init_app(self, app: Flask) -> None:
+        self.app = app
+        app.extensions['like_counter'] = self
+
+        if not app.testing:
+            self.start()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._thread = threading.Thread(target=self._run, name='like-counter', daemon=True)
+        self._thread.start()
+        atexit.register(self.flush_all)
+
+    def add(self, nft_id: int, delta: int) -> None:
+        with self._lock:
+            self._deltas[nft_id] += delta
+
+    def pending(self, nft_id: int) -> int:
+        with self._lock:
+            return self._deltas.get(nft_id, 0)
+
+    def flush(self) -> int:
+        """Apply buffered deltas; returns how many NFT rows were updated"""
+        with self._lock:
+            deltas, self._deltas = self._deltas, Counter()
+
+        changes = [{'liked_id': nft_id, 'delta': delta} for nft_id, delta in deltas.items() if delta]
+        if not changes:
+            return 0
+
+        nfts = NFT.__table__
+        try:
+            db.session.execute(
+                update(nfts)
+                .where(nfts.c.id == bindparam('liked_id'))
+                .values(likes_count=nfts.c.likes_count + bindparam('delta')),
+                changes
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            for change in changes:
+                self.add(change['liked_id'], change['delta'])
+            raise
+
+        self.flushes += 1
+        return len(changes)
+
+    def flush_all(self) -> None:
+        if not self.app:
+            return
+
+        with self.app.app_context():
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Flushing like counters failed')
+            finally:
+                db.session.remove()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(settings.app.LIKE_COUNTER_FLUSH_SECONDS)
+            self.flush_all()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'pending_nfts': len(self._deltas), 'flushes': self.flushes}
+
+like_counter = LikeCounter()
+
+def _insert():
+    if db.engine.dialect.name == 'postgresql':
+        return postgresql_insert(Like)
+    return sqlite_insert(Like)
+
+def toggle_like(user_id: int, nft: NFT) -> bool:
+    """Remove the like of `user_id` on `nft` if there is one, otherwise add it; returns True when liked.
+
+    Each branch is one statement checked against the unique (user_id, nft_id) index,
+    so concurrent toggles can never leave duplicate rows or double count.
+    """
+    removed = db.session.execute(
+        delete(Like).where(Like.user_id == user_id, Like.nft_id == nft.id).returning(Like.id)
+    ).first()
+    if removed:
+        db.session.commit()
+        like_counter.add(nft.id, -1)
+        return False
+
+    added = db.session.execute(
+        _insert()
+        .values(user_id=user_id, nft_id=nft.id, token_id=nft.token_id)
+        .on_conflict_do_nothing(index_elements=['user_id', 'nft_id'])
+        .returning(Like.id)
+    ).first()
+    db.session.commit()
+    if added:
+        like_counter.add(nft.id, 1)
+    return True
@@ -1,14 +1,40 @@
 from sqlalchemy.types import Integer, String, Boolean, Text, DateTime, Numeric
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from decimal import ROUND_HALF_UP, Decimal
-from sqlalchemy.schema import ForeignKey
+from sqlalchemy.schema import ForeignKey, Index
 from datetime import datetime, timedelta, timezone
+from enum import IntEnum
 
-from config import ALLOWED_EXTENSIONS
-from app.extensions import db
+from app.images import ImageSource, image_url, register_image_source
+from app.extensions import Money, db
+from config import settings
+
+class MediaType(IntEnum):
+    """Stable ids of uploadable image types, stored in `NFT.media_type` and sent as `fileTypeInputs`"""
+
+    PNG = 1
+    JPG = 2
+    JPEG = 3
+    GIF = 4
+    JFIF = 5
+
+    @classmethod
+    def from_filename(cls, filename: str) -> 'MediaType | None':
+        if '.' not in filename:
+            return None
+        return cls.__members__.get(filename.rsplit('.', 1)[1].upper())
 
 class NFT(db.Model):
     __tablename__ = "nfts"
+    __table_args__ = (
+        Index('ix_nfts_owner_id_created_at', 'owner_id', 'created_at'),
+        Index('ix_nfts_creator_id_created_at', 'creator_id', 'created_at'),
+        Index('ix_nfts_collection_id_is_listed', 'collection_id', 'is_listed'),
+        Index('ix_nfts_category_id_likes_count', 'category_id', 'likes_count'),
+        Index('ix_nfts_is_blocked_offers_count', 'is_blocked', 'offers_count'),
+        Index('ix_nfts_is_blocked_created_at', 'is_blocked', 'created_at'),
+        Index('ix_nfts_is_blocked_price', 'is_blocked', 'price'),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, nullable=False)
     token_id: Mapped[str] = mapped_column(String(100), nullable=False, unique=True)
@@ -22,12 +48,20 @@ class NFT(db.Model):
     category_id: Mapped[int] = mapped_column(Integer, ForeignKey('categories.id'), nullable=False)
     collection_id: Mapped[int] = mapped_column(Integer, ForeignKey('nftcollections.id'), nullable=True)
 
+    media_type: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
+
     is_listed: Mapped[bool] = mapped_column(Boolean, default=True)
     is_blocked: Mapped[bool] = mapped_column(Boolean, default=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime, default=lambda: datetime.now(timezone.utc)
     )
 
+    # denormalized counters, kept in step with likes/views/offers rows by the
+    # routes that change them (see `flask recount` for a full rebuild)
+    likes_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default='0')
+    views_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default='0')
+    offers_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default='0')
+
     likes = relationship(
         'Like', 
         back_populates='nft',
@@ -44,10 +78,10 @@ class NFT(db.Model):
         return str(self.owner.username)
 
     def get_likes(self):
-        return len(Like.query.filter_by(token_id=self.token_id).all())
+        return self.likes_count or 0
 
     def get_views(self):
-        return len(NFTView.query.filter_by(token_id=self.token_id).all())
+        return self.views_count or 0
 
     @property
     def owner_name(self):
@@ -60,24 +94,27 @@ class NFT(db.Model):
     @property
     def total_views(self):
         return self.get_views()
+
+    @property
+    def total_offers(self):
+        return self.offers_count or 0
     
     @property
     def extension_id(self):
-        ext: str = self.image_file.rsplit('.', 1)[-1].lower()
-        ext_id = None
-        for index, ext_type in enumerate(ALLOWED_EXTENSIONS, 1):
-            if ext_type == ext: 
-                ext_id = index
-        return ext_id
+        if self.media_type is not None:
+            return self.media_type
+        media_type = MediaType.from_filename(self.image_file)
+        return int(media_type) if media_type else None
 
     def info(self):
         return {
             'name': self.name,
             "owner": self.owner.username if self.owner else "None",
-            'owner_id': self.owner.id,
+            'owner_id': self.owner_id,
             "price": float(self.price) if self.price else "None",
             "is_listed": self.is_listed,
             'token_id': self.token_id,
+            'image': image_url('nft', self, size=settings.app.GRID_IMAGE_WIDTH),
             'created_at': self.created_at
         }
 
@@ -127,15 +164,27 @@ class Category(db.Model):
     def __str__(self):
         return f'{self.name.capitalize()} Category'
 
+register_image_source('nft', ImageSource(
+    NFT, key='token_id', column='image_file', folder=settings.db.UPLOAD_FOLDER / 'nft-images',
+    path='/nft/{}/get-image', blocked='is_blocked'
+))
+register_image_source('category', ImageSource(
+    Category, key='id', column='logo', folder=settings.db.APP_FILES / 'category-icons', path='/nft/category/{}'
+))
+
 class Like(db.Model):
     __tablename__ = 'likes'
+    __table_args__ = (
+        Index('uq_likes_user_id_nft_id', 'user_id', 'nft_id', unique=True),
+        Index('ix_likes_nft_id', 'nft_id'),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, nullable=False)
 
     nft_id: Mapped[int] = mapped_column(Integer, ForeignKey('nfts.id', ondelete='CASCADE'), nullable=False)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
     token_id: Mapped[str] = mapped_column(String(100), nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True)
     
     user = relationship('User', back_populates='liked_nfts')
     nft = relationship('NFT', back_populates='likes')
@@ -149,13 +198,17 @@ class Like(db.Model):
     
 class NFTView(db.Model):
     __tablename__ = 'views'
+    __table_args__ = (
+        Index('uq_views_user_id_nft_id', 'user_id', 'nft_id', unique=True),
+        Index('ix_views_nft_id', 'nft_id'),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, nullable=False)
 
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
     nft_id: Mapped[int] = mapped_column(Integer, ForeignKey('nfts.id', ondelete='CASCADE'), nullable=False)
     token_id: Mapped[str] = mapped_column(String(100), nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True)
 
     user = relationship('User', back_populates='views')
     nft = relationship('NFT', back_populates='views')
@@ -169,6 +222,13 @@ class NFTView(db.Model):
     
 class Offer(db.Model):
     __tablename__ = "offers"
+    __table_args__ = (
+        Index('ix_offers_nft_id_buyer_id', 'nft_id', 'buyer_id'),
+        Index('ix_offers_owner_id', 'owner_id'),
+        Index('ix_offers_buyer_id', 'buyer_id'),
+        Index('ix_offers_is_accepted_created_at', 'is_accepted', 'created_at'),
+        Index('ix_offers_expires_at', 'expires_at'),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
@@ -187,12 +247,12 @@ class Offer(db.Model):
         foreign_keys=[owner_id]
     )
 
-    price_at_offer: Mapped[Decimal] = mapped_column(Numeric(36, 18), nullable=False)
-    amount: Mapped[Decimal] = mapped_column(Numeric(36, 18), nullable=False)
+    price_at_offer: Mapped[Decimal] = mapped_column(Money(36, 18), nullable=False)
+    amount: Mapped[Decimal] = mapped_column(Money(36, 18), nullable=False)
 
     expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=datetime.now(timezone.utc)
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True
     )
 
     is_accepted: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -227,4 +287,44 @@ class Offer(db.Model):
             'price_at_offer': self.price_at_offer, 
             'expires_in': self.expires_at.isoformat(),
             'created_at': self.created_at.isoformat()
-        }
\ No newline at end of file
+        }
+
+class Sale(db.Model):
+    __tablename__ = 'sales'
+    __table_args__ = (
+        Index('ix_sales_collection_id_created_at', 'collection_id', 'created_at'),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, nullable=False)
+
+    nft_id: Mapped[int] = mapped_column(Integer, ForeignKey('nfts.id', ondelete='CASCADE'), nullable=False)
+    collection_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    seller_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
+    buyer_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
+    price: Mapped[Decimal] = mapped_column(Money(36, 18), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True)
+
+class ActivityRollup(db.Model):
+    """Views, likes, offers and sales per hour or day, globally (scope_id 0), per NFT or per collection"""
+    __tablename__ = 'activity_rollups'
+
+    granularity: Mapped[str] = mapped_column(String(4), primary_key=True)
+    scope: Mapped[str] = mapped_column(String(10), primary_key=True)
+    scope_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    bucket: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+
+    views: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    likes: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    offers: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    sales: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    volume: Mapped[Decimal] = mapped_column(Money(36, 18), nullable=False, default=0)
+
+    def to_dict(self) -> dict:
+        return {
+            'bucket': self.bucket.isoformat(),
+            'views': self.views,
+            'likes': self.likes,
+            'offers': self.offers,
+            'sales': self.sales,
+            'volume': float(self.volume)
+        }
@@ -0,0 +1,164 @@
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy import bindparam, update
+from collections import Counter
+from flask import Flask
+import threading
+import logging
+import atexit
+import queue
+import time
+
+from app.nft.models import NFT, NFTView
+from app.extensions import db
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_FLUSH_ATTEMPTS: int = 3
+
+class ViewRecorder:
+    """Takes NFT page views off the request path.
+
+    `record` only enqueues; a background thread writes the queue in batches of
+    VIEW_FLUSH_SIZE (or every VIEW_FLUSH_SECONDS) with one INSERT ... ON CONFLICT DO
+    NOTHING against the unique (user_id, nft_id) index, then bumps `views_count` of
+    the NFTs whose rows were really inserted. A full queue drops the view, and so
+    does a failed flush once a view has been tried MAX_FLUSH_ATTEMPTS times;
+    otherwise the failed batch goes back on the queue.
+    """
+
+    def __init__(self) -> None:
+        self.app: Flask | None = None
+        self._queue: queue.Queue | None = None
+        self._wake = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.counters: Counter = Counter()
+        self.last_flush_ms: float = 0.0
+
+    def init_app(self, app: Flask) -> None:
+        self.app = app
+        self._queue = queue.Queue(maxsize=settings.app.VIEW_QUEUE_MAX)
+        app.extensions['view_recorder'] = self
+
+        if not app.testing:
+            self.start()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._thread = threading.Thread(target=self._run, name='view-recorder', daemon=True)
+        self._thread.start()
+        atexit.register(self.flush_all)
+
+    def record(self, user_id: int, nft: NFT) -> None:
+        try:
+            self._queue.put_nowait((user_id, nft.id, nft.token_id, 1))
+        except queue.Full:
+            self.counters['dropped'] += 1
+            return
+
+        self.counters['queued'] += 1
+        if self._queue.qsize() >= settings.app.VIEW_FLUSH_SIZE:
+            self._wake.set()
+
+    def _insert(self):
+        if db.engine.dialect.name == 'postgresql':
+            return postgresql_insert(NFTView)
+        return sqlite_insert(NFTView)
+
+    def flush(self) -> int:
+        """Write up to VIEW_FLUSH_SIZE queued views; returns how many were new"""
+        batch: dict[tuple[int, int], dict] = {}
+        taken: list[tuple[int, int, str, int]] = []
+        while len(taken) < settings.app.VIEW_FLUSH_SIZE:
+            try:
+                view = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            taken.append(view)
+            user_id, nft_id, token_id, _ = view
+            batch[(user_id, nft_id)] = {'user_id': user_id, 'nft_id': nft_id, 'token_id': token_id}
+
+        if not batch:
+            return 0
+
+        started = time.perf_counter()
+        with self._flush_lock:
+            try:
+                statement = (
+                    self._insert()
+                    .on_conflict_do_nothing(index_elements=['user_id', 'nft_id'])
+                    .returning(NFTView.nft_id)
+                )
+                inserted = Counter(db.session.scalars(statement, list(batch.values())).all())
+                if inserted:
+                    nfts = NFT.__table__
+                    db.session.execute(
+                        update(nfts)
+                        .where(nfts.c.id == bindparam('viewed_id'))
+                        .values(views_count=nfts.c.views_count + bindparam('new_views')),
+                        [{'viewed_id': nft_id, 'new_views': count} for nft_id, count in inserted.items()]
+                    )
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                self.counters['failed_flushes'] += 1
+                self._requeue(taken)
+                raise
+
+        new_views = sum(inserted.values())
+        self.counters['flushes'] += 1
+        self.counters['inserted'] += new_views
+        self.counters['duplicates'] += len(taken) - new_views
+        self.last_flush_ms = (time.perf_counter() - started) * 1000
+        return new_views
+
+    def _requeue(self, views: list[tuple[int, int, str, int]]) -> None:
+        """Put the views of a failed flush back on the queue; those out of attempts or room are dropped"""
+        for user_id, nft_id, token_id, attempts in views:
+            if attempts >= MAX_FLUSH_ATTEMPTS:
+                self.counters['dropped'] += 1
+                continue
+            try:
+                self._queue.put_nowait((user_id, nft_id, token_id, attempts + 1))
+            except queue.Full:
+                self.counters['dropped'] += 1
+
+    def flush_all(self) -> None:
+        """Drain the whole queue, e.g. on shutdown"""
+        if not self.app or not self._queue:
+            return
+
+        with self.app.app_context():
+            try:
+                while not self._queue.empty():
+                    self.flush()
+            except Exception:
+                db.session.rollback()
+                logger.exception('Flushing queued NFT views failed')
+            finally:
+                db.session.remove()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(timeout=settings.app.VIEW_FLUSH_SECONDS)
+            self._wake.clear()
+            self.flush_all()
+
+    def stats(self) -> dict:
+        return {
+            'queue_depth': self._queue.qsize() if self._queue else 0,
+            'queue_max': settings.app.VIEW_QUEUE_MAX,
+            'queued': self.counters['queued'],
+            'dropped': self.counters['dropped'],
+            'inserted': self.counters['inserted'],
+            'duplicates': self.counters['duplicates'],
+            'flushes': self.counters['flushes'],
+            'failed_flushes': self.counters['failed_flushes'],
+            'last_flush_ms': round(self.last_flush_ms, 3),
+        }
+
+view_recorder = ViewRecorder()
@@ -0,0 +1,87 @@
+from collections.abc import Iterator
+from pathlib import Path
+import hashlib
+import re
+import os
+
+from app.derivatives import DERIVED_FOLDER_NAME
+
+CONTENT_ADDRESSED = re.compile(r'^[0-9a-f]{64}\.')
+SHARD_PATTERN: str = '??/??'
+
+def shard_of(filename: str) -> tuple[str, str]:
+    """Two-level hash prefix of `filename`; content-addressed names are their own hash"""
+    digest = filename if CONTENT_ADDRESSED.match(filename) else hashlib.sha256(filename.encode()).hexdigest()
+    return digest[:2], digest[2:4]
+
+def sharded_path(folder: Path, filename: str) -> Path:
+    """Where `filename` lives in the sharded layout: <folder>/ab/cd/<filename>"""
+    return folder.joinpath(*shard_of(filename), filename)
+
+def resolve_upload(folder: Path, filename: str) -> Path:
+    """Path of `filename` in `folder`, sharded or still flat.
+
+    Both layouts are looked up so files can be moved while the app serves them;
+    a file found in neither belongs in the sharded layout.
+    """
+    sharded = sharded_path(folder, filename)
+    if sharded.exists():
+        return sharded
+    flat = folder / filename
+    return flat if flat.exists() else sharded
+
+def iter_uploads(folder: Path) -> Iterator[Path]:
+    """Every stored file under `folder`, flat ones first"""
+    for entry in folder.iterdir():
+        if entry.is_file() and not entry.name.startswith('.'):
+            yield entry
+    for entry in folder.glob(f'{SHARD_PATTERN}/*'):
+        if entry.is_file() and not entry.name.startswith('.'):
+            yield entry
+
+def original_name(rendition: Path) -> str:
+    """Name of the upload a <name>.<size>.<ext> rendition was made from"""
+    return rendition.name.rsplit('.', 2)[0]
+
+def derived_folders(folder: Path) -> list[Path]:
+    return [path for path in (folder / DERIVED_FOLDER_NAME, *folder.glob(f'{SHARD_PATTERN}/{DERIVED_FOLDER_NAME}')) if path.is_dir()]
+
+def _move_renditions(renditions: list[Path], original: Path) -> int:
+    if not renditions:
+        return 0
+    (original.parent / DERIVED_FOLDER_NAME).mkdir(exist_ok=True)
+    moved: int = 0
+    for rendition in renditions:
+        try:
+            os.replace(rendition, original.parent / DERIVED_FOLDER_NAME / rendition.name)
+        except FileNotFoundError:
+            continue
+        moved += 1
+    return moved
+
+def move_to_shard(flat: Path) -> bool:
+    """Move a flat upload and its derivatives into the sharded layout; False if it was already moved"""
+    target = sharded_path(flat.parent, flat.name)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.replace(flat, target)
+    except FileNotFoundError:
+        return False
+
+    derived = flat.parent / DERIVED_FOLDER_NAME
+    if derived.is_dir():
+        _move_renditions(list(derived.glob(f'{flat.name}.*')), target)
+    return True
+
+def move_flat_renditions(folder: Path) -> int:
+    """Move renditions left in the flat derived folder next to their already sharded original; returns how many"""
+    derived = folder / DERIVED_FOLDER_NAME
+    if not derived.is_dir():
+        return 0
+
+    moved: int = 0
+    for rendition in list(derived.iterdir()):
+        target = sharded_path(folder, original_name(rendition))
+        if target.exists():
+            moved += _move_renditions([rendition], target)
+    return moved
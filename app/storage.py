@@ -0,0 +1,427 @@
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Mapped, Session, mapped_column
+from sqlalchemy import DateTime, Integer, String, case, delete, event, func, inspect, select
+from werkzeug.datastructures import FileStorage
+from datetime import datetime, timedelta, timezone
+from werkzeug.utils import secure_filename
+from collections import Counter
+from pathlib import Path
+from flask import Flask
+from uuid import uuid4
+import threading
+import hashlib
+import logging
+import time
+import re
+import os
+
+from app.derivatives import DERIVED_FOLDER_NAME, image_derivatives, remove_derivatives
+from app.shards import derived_folders, iter_uploads, original_name, resolve_upload, sharded_path
+from app.images import IMAGE_SOURCES
+from app.extensions import db
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# <sha256 of the content><extension>, e.g. 9f86d0...0a08.png
+BLOB_NAME = re.compile(r'^[0-9a-f]{64}\.[a-z0-9]+$')
+PARTIAL_PREFIX: str = '.upload-'
+STAGING_FOLDER_NAME: str = '.staging'
+
+class StoredBlob(db.Model):
+    """One content-addressed upload and how many image columns point at it.
+
+    Rows are kept up to date by the flush listeners below; `released_at` is set when
+    the last reference goes, and the collector removes the file once it has been
+    unreferenced for UPLOAD_GC_GRACE_SECONDS.
+    """
+    __tablename__ = 'stored_blobs'
+
+    folder: Mapped[str] = mapped_column(String(64), primary_key=True)
+    filename: Mapped[str] = mapped_column(String(80), primary_key=True)
+    size: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    refcount: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    released_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, index=True)
+
+def upload_sources():
+    """Image sources whose files are uploads (not images shipped with the app)"""
+    for name, source in IMAGE_SOURCES.items():
+        if source.folder.is_relative_to(settings.db.UPLOAD_FOLDER):
+            yield name, source
+
+def folder_key(folder: Path) -> str:
+    return folder.relative_to(settings.db.UPLOAD_FOLDER).as_posix()
+
+def upload_extension(filename: str) -> str:
+    suffix = Path(secure_filename(filename)).suffix.lower()
+    return suffix if suffix[1:].isalnum() else ''
+
+def hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        while chunk := source.read(settings.app.UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def staging_folder() -> Path:
+    return settings.db.UPLOAD_FOLDER / STAGING_FOLDER_NAME
+
+upload_counters: Counter = Counter()
+
+def store_upload(file: FileStorage, folder: Path) -> str:
+    """Stage `file` for `folder` under the SHA-256 of its content and return that filename.
+
+    The upload is hashed while it is streamed into the staging area. It is moved into
+    `folder` when the current transaction commits and deleted on rollback, or at the
+    end of the request if nothing was committed.
+    """
+    staging = staging_folder()
+    staging.mkdir(exist_ok=True)
+
+    digest = hashlib.sha256()
+    partial = staging / f'{PARTIAL_PREFIX}{uuid4().hex}'
+    with open(partial, 'wb') as target:
+        while chunk := file.stream.read(settings.app.UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+            target.write(chunk)
+
+    filename: str = f'{digest.hexdigest()}{upload_extension(file.filename)}'
+    staged: dict[Path, Path] = db.session.info.setdefault('staged_uploads', {})
+    if folder / filename in staged:
+        partial.unlink()
+    else:
+        staged[folder / filename] = partial
+        upload_counters['staged'] += 1
+    return filename
+
+def _promote_uploads(staged: dict[Path, Path]) -> None:
+    """Move committed uploads out of staging, then queue renditions of the new ones.
+
+    Runs after the commit, so nothing may raise: a file that can not be moved is
+    logged and left in staging, and the others are still promoted.
+    """
+    stored_files: list[Path] = []
+    for key, partial in staged.items():
+        try:
+            stored = resolve_upload(key.parent, key.name)
+            if stored.exists():
+                upload_counters['deduplicated'] += 1
+                upload_counters['bytes_saved'] += partial.stat().st_size
+                partial.unlink()
+                # a fresh reference: keep the sweeper from taking it for an old orphan
+                os.utime(stored)
+            else:
+                stored.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(partial, stored)
+                upload_counters['stored'] += 1
+                stored_files.append(stored)
+        except Exception:
+            upload_counters['promote_failed'] += 1
+            logger.exception('Promoting staged upload %s to %s failed', partial, key)
+
+    for stored in stored_files:
+        try:
+            image_derivatives.submit(stored)
+        except Exception:
+            logger.exception('Queueing derivatives of %s failed', stored)
+
+def discard_staged_uploads(session: Session) -> None:
+    for partial in session.info.pop('staged_uploads', {}).values():
+        partial.unlink(missing_ok=True)
+        upload_counters['discarded'] += 1
+
+def migrate_upload(path: Path, folder: Path) -> tuple[str, bool]:
+    """Move a legacy upload of `folder` to its sharded content address; returns (new name, was a duplicate)"""
+    filename: str = f'{hash_file(path)}{upload_extension(path.name)}'
+    duplicate: bool = resolve_upload(folder, filename).exists()
+
+    derived = path.parent / DERIVED_FOLDER_NAME
+    if duplicate:
+        path.unlink()
+        remove_derivatives(path)
+    else:
+        stored = sharded_path(folder, filename)
+        stored.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(path, stored)
+        renditions = list(derived.glob(f'{path.name}.*')) if derived.is_dir() else []
+        if renditions:
+            (stored.parent / DERIVED_FOLDER_NAME).mkdir(exist_ok=True)
+        for rendition in renditions:
+            os.replace(rendition, stored.parent / DERIVED_FOLDER_NAME / f'{filename}{rendition.name[len(path.name):]}')
+    return filename, duplicate
+
+def _blob_upsert(connection, folder: str, filename: str, delta: int, size: int, released_at: datetime):
+    insert = postgresql_insert if connection.dialect.name == 'postgresql' else sqlite_insert
+    refcount = StoredBlob.refcount + delta
+    return insert(StoredBlob).values(
+        folder=folder,
+        filename=filename,
+        size=size,
+        refcount=max(delta, 0),
+        released_at=released_at if delta <= 0 else None
+    ).on_conflict_do_update(
+        index_elements=['folder', 'filename'],
+        set_={'refcount': refcount, 'released_at': case((refcount <= 0, released_at), else_=None)}
+    )
+
+@event.listens_for(Session, 'before_flush')
+def _collect_blob_references(session: Session, flush_context, instances) -> None:
+    deltas: Counter = session.info.setdefault('blob_deltas', Counter())
+
+    for _, source in upload_sources():
+        folder = folder_key(source.folder)
+        for obj in session.new | session.dirty | session.deleted:
+            if not isinstance(obj, source.model):
+                continue
+
+            if obj in session.deleted:
+                # loads the column if it was expired by an earlier commit
+                added, removed = (), (getattr(obj, source.column),)
+            else:
+                history = inspect(obj).attrs[source.column].history
+                added, removed = history.added, history.deleted
+
+            for filename in added:
+                if filename and filename not in source.defaults:
+                    deltas[(folder, filename)] += 1
+            for filename in removed:
+                if filename and filename not in source.defaults:
+                    deltas[(folder, filename)] -= 1
+
+@event.listens_for(Session, 'after_flush')
+def _apply_blob_references(session: Session, flush_context) -> None:
+    deltas: Counter | None = session.info.pop('blob_deltas', None)
+    if not deltas:
+        return
+
+    connection = session.connection()
+    staged: dict[Path, Path] = session.info.get('staged_uploads', {})
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    for (folder, filename), delta in sorted(deltas.items()):
+        if not delta:
+            continue
+        path = resolve_upload(settings.db.UPLOAD_FOLDER / folder, filename)
+        path = path if path.exists() else staged.get(settings.db.UPLOAD_FOLDER / folder / filename, path)
+        size = path.stat().st_size if path.exists() else 0
+        connection.execute(_blob_upsert(connection, folder, filename, delta, size, now))
+
+@event.listens_for(Session, 'after_commit')
+def _promote_staged_uploads(session: Session) -> None:
+    staged = session.info.pop('staged_uploads', None)
+    if staged:
+        _promote_uploads(staged)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_blob_references(session: Session) -> None:
+    session.info.pop('blob_deltas', None)
+    discard_staged_uploads(session)
+
+def recount_references() -> int:
+    """Rebuild every refcount from the image columns; returns how many rows changed.
+
+    Bulk statements bypass the flush listeners, so run this after them.
+    """
+    counts: Counter = Counter()
+    for _, source in upload_sources():
+        column = getattr(source.model, source.column)
+        folder = folder_key(source.folder)
+        rows = db.session.execute(select(column, func.count()).where(column.is_not(None)).group_by(column))
+        for filename, count in rows:
+            if filename not in source.defaults:
+                counts[(folder, filename)] += count
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    blobs = {(blob.folder, blob.filename): blob for blob in db.session.scalars(select(StoredBlob))}
+    changed: int = 0
+    for key in counts.keys() - blobs.keys():
+        path = resolve_upload(settings.db.UPLOAD_FOLDER / key[0], key[1])
+        blobs[key] = StoredBlob(folder=key[0], filename=key[1], size=path.stat().st_size if path.exists() else 0)
+        db.session.add(blobs[key])
+
+    for key, blob in blobs.items():
+        refcount = counts.get(key, 0)
+        if blob.refcount != refcount:
+            changed += 1
+            blob.refcount = refcount
+            blob.released_at = None if refcount else (blob.released_at or now)
+
+    # the listeners must not count the rows written here a second time
+    db.session.info.pop('blob_deltas', None)
+    db.session.commit()
+    return changed
+
+def _grace(grace: timedelta | None) -> timedelta:
+    return grace if grace is not None else timedelta(seconds=settings.app.UPLOAD_GC_GRACE_SECONDS)
+
+def _remove_upload(path: Path, modified_before: float) -> int | None:
+    """Delete `path` and its derivatives unless it was written or re-referenced since
+    `modified_before`; returns the bytes freed, None when the file was kept"""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        remove_derivatives(path)
+        return None
+    if stat.st_mtime > modified_before:
+        return None
+    path.unlink(missing_ok=True)
+    remove_derivatives(path)
+    return stat.st_size
+
+def collect_garbage(grace: timedelta | None = None) -> tuple[int, int]:
+    """Delete blobs unreferenced for longer than `grace`; returns (files, bytes) removed"""
+    grace = _grace(grace)
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - grace
+    modified_before: float = time.time() - grace.total_seconds()
+    removed: int = 0
+    reclaimed: int = 0
+
+    released = db.session.scalars(
+        select(StoredBlob).where(StoredBlob.refcount <= 0, StoredBlob.released_at <= cutoff)
+    ).all()
+    for blob in released:
+        # referenced again since it was read: keep it
+        deleted = db.session.execute(
+            delete(StoredBlob).where(
+                StoredBlob.folder == blob.folder, StoredBlob.filename == blob.filename, StoredBlob.refcount <= 0
+            )
+        ).rowcount
+        db.session.commit()
+        if not deleted:
+            continue
+
+        freed = _remove_upload(resolve_upload(settings.db.UPLOAD_FOLDER / blob.folder, blob.filename), modified_before)
+        if freed is not None:
+            removed += 1
+            reclaimed += freed
+
+    upload_counters['collected'] += removed
+    upload_counters['bytes_reclaimed'] += reclaimed
+    return removed, reclaimed
+
+def sweep_orphans(grace: timedelta | None = None, batch_size: int | None = None, dry_run: bool = False) -> tuple[int, int]:
+    """Delete files in the upload folders that no image column references; returns (files, bytes).
+
+    Each folder is listed against its column: files older than `grace` are checked
+    against the database `batch_size` names at a time and the unreferenced ones are
+    deleted with their derivatives. Blob rows go only with a deleted file and only
+    while their refcount is zero. Renditions whose original is gone and staged
+    uploads abandoned by a crashed worker are removed as well.
+    """
+    grace = _grace(grace)
+    batch_size = batch_size or settings.app.UPLOAD_SWEEP_BATCH_SIZE
+    modified_before: float = time.time() - grace.total_seconds()
+    removed: int = 0
+    reclaimed: int = 0
+
+    for _, source in upload_sources():
+        if not source.folder.is_dir():
+            continue
+        column = getattr(source.model, source.column)
+        folder = folder_key(source.folder)
+        paths: dict[str, Path] = {
+            path.name: path for path in iter_uploads(source.folder) if path.stat().st_mtime <= modified_before
+        }
+        candidates = sorted(paths)
+
+        for start in range(0, len(candidates), batch_size):
+            batch = candidates[start:start + batch_size]
+            referenced = set(db.session.scalars(select(column).where(column.in_(batch))))
+            orphans = [name for name in batch if name not in referenced]
+            if dry_run:
+                removed += len(orphans)
+                reclaimed += sum(paths[name].stat().st_size for name in orphans)
+                continue
+
+            deleted: list[str] = []
+            for name in orphans:
+                freed = _remove_upload(paths[name], modified_before)
+                if freed is not None:
+                    deleted.append(name)
+                    removed += 1
+                    reclaimed += freed
+            if deleted:
+                db.session.execute(
+                    delete(StoredBlob).where(
+                        StoredBlob.folder == folder,
+                        StoredBlob.filename.in_(deleted),
+                        StoredBlob.refcount <= 0
+                    )
+                )
+            db.session.commit()
+
+        for derived in derived_folders(source.folder) if not dry_run else ():
+            for rendition in derived.iterdir():
+                # a flat leftover of a sharded original is kept for shard-uploads to move
+                original = resolve_upload(source.folder, original_name(rendition))
+                if not original.exists() and rendition.stat().st_mtime <= modified_before:
+                    rendition.unlink(missing_ok=True)
+
+    staging = staging_folder()
+    if staging.is_dir():
+        for partial in staging.iterdir():
+            if partial.stat().st_mtime <= modified_before:
+                removed += 1
+                reclaimed += partial.stat().st_size
+                if not dry_run:
+                    partial.unlink(missing_ok=True)
+
+    if not dry_run:
+        upload_counters['swept'] += removed
+        upload_counters['bytes_reclaimed'] += reclaimed
+    return removed, reclaimed
+
+def upload_stats() -> dict:
+    return {
+        'staged': upload_counters['staged'],
+        'stored': upload_counters['stored'],
+        'deduplicated': upload_counters['deduplicated'],
+        'discarded': upload_counters['discarded'],
+        'promote_failed': upload_counters['promote_failed'],
+        'bytes_saved': upload_counters['bytes_saved'],
+        'collected': upload_counters['collected'],
+        'swept': upload_counters['swept'],
+        'bytes_reclaimed': upload_counters['bytes_reclaimed'],
+    }
+
+class BlobCollector:
+    """Background thread that garbage-collects unreferenced uploads every UPLOAD_GC_INTERVAL_SECONDS.
+
+    Also drops the uploads a request staged but never committed.
+    """
+
+    def __init__(self) -> None:
+        self.app: Flask | None = None
+        self._thread: threading.Thread | None = None
+
+    def init_app(self, app: Flask) -> None:
+        self.app = app
+        app.extensions['blob_collector'] = self
+        # registered after Flask-SQLAlchemy's, so it runs before the session is removed
+        app.teardown_appcontext(lambda exc: discard_staged_uploads(db.session))
+
+        if not app.testing:
+            self.start()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._thread = threading.Thread(target=self._run, name='blob-collector', daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(settings.app.UPLOAD_GC_INTERVAL_SECONDS)
+
+            with self.app.app_context():
+                try:
+                    collect_garbage()
+                    sweep_orphans()
+                except Exception:
+                    db.session.rollback()
+                    logger.exception('Upload garbage collection failed')
+                finally:
+                    db.session.remove()
+
+blob_collector = BlobCollector()
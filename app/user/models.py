@@ -3,11 +3,12 @@ from sqlalchemy.types import Boolean, DateTime, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime, timezone
 from flask_login import UserMixin
-from sqlalchemy import Numeric
 from decimal import Decimal
-import bcrypt
 
-from app.extensions import db
+from app.images import ImageSource, register_image_source
+from app.user.passwords import password_hasher
+from app.extensions import Money, db
+from config import BASE_DIR, settings
 
 
 class User(db.Model, UserMixin):
@@ -54,7 +55,7 @@ class User(db.Model, UserMixin):
         cascade='all, delete-orphan'
     )
 
-    balance: Mapped[Decimal] = mapped_column(Numeric(36, 18), default=0)
+    balance: Mapped[Decimal] = mapped_column(Money(36, 18), default=0)
 
     offers_made: Mapped[list["Offer"]] = relationship(
         back_populates="buyer",
@@ -88,12 +89,13 @@ class User(db.Model, UserMixin):
             .filter(Follower.followed_id == self.id).all()
 
     def hash_password(self, password: str) -> None:
-        bcrypt_salt: bytes = bcrypt.gensalt()
-        password_bytes: bytes = password.encode()
-        self.hashed_password = bcrypt.hashpw(password_bytes, salt=bcrypt_salt)
+        self.hashed_password = password_hasher.hash(password)
 
     def validate_password(self, password: str) -> bool:
-        return bcrypt.checkpw(password.encode(), self.hashed_password)
+        return password_hasher.verify(password, self.hashed_password)
+
+    def password_needs_rehash(self) -> bool:
+        return password_hasher.needs_rehash(self.hashed_password)
 
     def get_generated_nfts(self):
         from app.nft.models import NFT
@@ -141,9 +143,22 @@ class User(db.Model, UserMixin):
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
         }
+
+register_image_source('user-logo', ImageSource(
+    User, key='id', column='profile_avatar', folder=settings.db.UPLOAD_FOLDER / 'user-logo',
+    path='/user/{}/get-image/logo', defaults=('defaultAvatar.png',), defaults_folder=BASE_DIR / 'app' / 'static' / 'images'
+))
+register_image_source('user-bg', ImageSource(
+    User, key='id', column='profile_background', folder=settings.db.UPLOAD_FOLDER / 'user-bg',
+    path='/user/{}/get-image/bg', defaults=('defaultBg.png',), defaults_folder=BASE_DIR / 'app' / 'static' / 'images'
+))
     
 class Follower(db.Model):
     __tablename__ = 'followers'
+    __table_args__ = (
+        db.Index('ix_followers_follower_id_followed_id', 'follower_id', 'followed_id'),
+        db.Index('ix_followers_followed_id', 'followed_id'),
+    )
 
     id: Mapped[int] = mapped_column(db.Integer, primary_key=True)
     follower_id: Mapped[int] = mapped_column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -0,0 +1,87 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import bcrypt
+import time
+
+from config import settings
+
+def _as_bytes(hashed: str | bytes) -> bytes:
+    return hashed if isinstance(hashed, bytes) else hashed.encode()
+
+def hash_rounds(hashed: str | bytes) -> int:
+    """Cost factor a bcrypt hash was made with ($2b$<rounds>$...)"""
+    return int(_as_bytes(hashed).split(b'$')[2])
+
+class HasherBusy(Exception):
+    """Raised instead of queueing when PASSWORD_HASH_QUEUE_MAX calls already wait for a worker"""
+
+class PasswordHasher:
+    """Runs bcrypt on PASSWORD_HASH_WORKERS dedicated threads.
+
+    bcrypt releases the GIL, so a burst of logins is capped at that many busy cores.
+    The calling request thread still waits for its result, so the wait queue is
+    bounded: past PASSWORD_HASH_QUEUE_MAX waiting calls `HasherBusy` is raised and
+    the request can be answered with a 503 instead of holding its worker.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hasher')
+        self._lock = threading.Lock()
+        self.workers: int = workers
+        self.in_flight: int = 0
+        self.completed: int = 0
+        self.rejected: int = 0
+        self.queue_ms_total: float = 0.0
+        self.queue_ms_max: float = 0.0
+        self.run_ms_total: float = 0.0
+
+    def _run(self, fn, *args):
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self.in_flight -= 1
+                    self.completed += 1
+                    queued_ms = (started - submitted) * 1000
+                    self.queue_ms_total += queued_ms
+                    self.queue_ms_max = max(self.queue_ms_max, queued_ms)
+                    self.run_ms_total += (finished - started) * 1000
+
+        with self._lock:
+            if self.in_flight >= self.workers + settings.app.PASSWORD_HASH_QUEUE_MAX:
+                self.rejected += 1
+                raise HasherBusy()
+            self.in_flight += 1
+        return self._executor.submit(timed).result()
+
+    def hash(self, password: str, rounds: int | None = None) -> bytes:
+        salt: bytes = bcrypt.gensalt(rounds=rounds or settings.app.BCRYPT_ROUNDS)
+        return self._run(bcrypt.hashpw, password.encode(), salt)
+
+    def verify(self, password: str, hashed: str | bytes) -> bool:
+        return self._run(bcrypt.checkpw, password.encode(), _as_bytes(hashed))
+
+    def needs_rehash(self, hashed: str | bytes) -> bool:
+        return hash_rounds(hashed) != settings.app.BCRYPT_ROUNDS
+
+    def stats(self) -> dict:
+        with self._lock:
+            completed = self.completed or 1
+            return {
+                'workers': self.workers,
+                'in_flight': self.in_flight,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'queue_max': settings.app.PASSWORD_HASH_QUEUE_MAX,
+                'bcrypt_rounds': settings.app.BCRYPT_ROUNDS,
+                'mean_queue_ms': round(self.queue_ms_total / completed, 3),
+                'max_queue_ms': round(self.queue_ms_max, 3),
+                'mean_hash_ms': round(self.run_ms_total / completed, 3),
+            }
+
+password_hasher = PasswordHasher(settings.app.PASSWORD_HASH_WORKERS)
@@ -1,15 +1,14 @@
 
-from flask import abort, redirect, send_from_directory, url_for
+from flask import abort, redirect, url_for
 from flask.templating import render_template
 from flask_login.utils import current_user
 from flask_login import login_required
-from pathlib import Path
 
 from app.collection.models import CollectionCategory, NFTCollection
 from app.user.models import Follower, User
 from config import ALLOWED_EXTENSIONS
-from config import settings, BASE_DIR
 from app.nft.models import Category
+from app.images import send_image
 from app.extensions import db
 from app.user import user_bp
 
@@ -30,37 +29,11 @@ def create_nft_page():
 
 @user_bp.route('/<int:user_id>/get-image/logo', methods=['GET'])
 def get_logo_image(user_id):
-    user: User = User.query.filter_by(id=user_id).first()
-    if not user:
-        return abort(404)
-
-    user_logo_file = user.profile_avatar
-
-    static_path: Path = BASE_DIR / 'app' / 'static' / 'images'
-    if user_logo_file == 'defaultAvatar.png':
-        return send_from_directory(static_path, 'defaultAvatar.png')
-    
-    return send_from_directory(
-        settings.db.UPLOAD_FOLDER / 'user-logo',
-        user_logo_file
-    )
+    return send_image('user-logo', user_id)
 
 @user_bp.route('/<int:user_id>/get-image/bg', methods=['GET'])
 def get_bg_image(user_id):
-    user: User = User.query.filter_by(id=user_id).first()
-    if not user:
-        return abort(404)
-
-    user_bg_file = user.profile_background
-
-    static_path: Path = BASE_DIR / 'app' / 'static' / 'images'
-    if user_bg_file == 'defaultBg.png':
-        return send_from_directory(static_path, 'defaultBg.png')
-    
-    return send_from_directory(
-        settings.db.UPLOAD_FOLDER / 'user-bg',
-        user_bg_file
-    )
+    return send_image('user-bg', user_id)
 
 @user_bp.route('/profile/<int:user_id>')
 def profile_page(user_id):
@@ -1,10 +1,26 @@
 
-from app.collection.models import NFTCollection
+from decimal import ROUND_HALF_EVEN, Decimal, localcontext
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import delete, func, insert, inspect, select, text, update
+import logging
+
+from app.collection.models import CollectionStats, NFTCollection
 from config import ALLOWED_EXTENSIONS
 from app.user.models import User
-from app.nft.models import NFT
+from app.nft.models import NFT, Like, MediaType, NFTView, Offer, Sale
 from app.extensions import db
 
+logger = logging.getLogger(__name__)
+
+# denormalized NFT counters; filled from their source tables when migrate adds them
+NFT_COUNTER_COLUMNS: set[str] = {'nfts.likes_count', 'nfts.views_count', 'nfts.offers_count'}
+
+# scale, limit and working precision of the Numeric(36, 18) balance and amount columns
+MONEY_QUANTUM = Decimal('1e-18')
+MONEY_LIMIT = Decimal('1e18')
+MONEY_PRECISION: int = 38
+
 def configure_relationships() -> None:
 
     User.created_nfts = db.relationship('NFT', foreign_keys=[NFT.creator_id], lazy=True)
@@ -28,5 +44,145 @@ def configure_relationships() -> None:
 def allowed_image_type(filename: str) -> bool:
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def to_money(*terms) -> Decimal:
+    """Sum of `terms` rounded to the scale of the money columns.
+
+    Postgres rounds on write while SQLite keeps whatever the Decimal math produced,
+    so results are rounded here before they are stored or compared. The sum runs at
+    MONEY_PRECISION digits, the default 28 can not hold 18 decimals past 1e10.
+    Raises ValueError for a result the columns can not hold.
+    """
+    with localcontext(prec=MONEY_PRECISION):
+        total = sum((Decimal(str(term)) for term in terms), Decimal(0))
+        if not total.is_finite() or abs(total) >= MONEY_LIMIT:
+            raise ValueError(f'{total} is out of the money range')
+        return total.quantize(MONEY_QUANTUM, rounding=ROUND_HALF_EVEN)
+
+def lock_users(*user_ids: int | None) -> dict[int, User]:
+    """Users `user_ids` by id, loaded with SELECT ... FOR UPDATE for a balance change.
+
+    Rows are locked in id order so two transfers between the same users can not
+    deadlock. SQLite has no row locks and drops the clause; its single writer
+    already serialises the transactions.
+    """
+    ids: set[int] = {int(user_id) for user_id in user_ids if user_id is not None}
+    users = db.session.scalars(
+        select(User)
+        .where(User.id.in_(ids))
+        .order_by(User.id)
+        .with_for_update(of=User)
+        .execution_options(populate_existing=True)
+    ).all()
+    return {user.id: user for user in users}
+
 def delete_table(className, db) -> None:
-    className.__table__.drop(db.engine)
\ No newline at end of file
+    className.__table__.drop(db.engine)
+
+def missing_tables(db) -> set[str]:
+    """Model tables the database does not have yet, i.e. the ones the next create_all will create"""
+    return set(db.metadata.tables) - set(inspect(db.engine).get_table_names())
+
+def add_missing_columns(db) -> set[str]:
+    """Add model columns and indexes that are missing from already existing tables; returns the added `table.column` names"""
+    inspector = inspect(db.engine)
+    preparer = db.engine.dialect.identifier_preparer
+    added: set[str] = set()
+
+    with db.engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+
+            existing: set[str] = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+
+                column_ddl = CreateColumn(column).compile(dialect=db.engine.dialect)
+                connection.execute(text(f'ALTER TABLE {preparer.format_table(table)} ADD COLUMN {column_ddl}'))
+                added.add(f'{table.name}.{column.name}')
+
+            indexes: set[str] = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in indexes:
+                    continue
+
+                try:
+                    with connection.begin_nested():
+                        index.create(connection)
+                except IntegrityError:
+                    logger.warning('Unique index %s not created, %s has duplicate rows (run `flask recount`)', index.name, table.name)
+    return added
+
+def recount_nft_counters(db) -> int:
+    """Set likes_count, views_count and offers_count of every NFT from their tables; returns how many NFTs"""
+    likes = select(func.count(Like.id)).where(Like.nft_id == NFT.id).scalar_subquery()
+    views = select(func.count(NFTView.id)).where(NFTView.nft_id == NFT.id).scalar_subquery()
+    offers = select(func.count(Offer.id)).where(
+        Offer.nft_id == NFT.id,
+        Offer.is_accepted == False,
+        Offer.is_cancelled == False
+    ).scalar_subquery()
+
+    with db.engine.begin() as connection:
+        return connection.execute(
+            update(NFT).values(likes_count=likes, views_count=views, offers_count=offers)
+        ).rowcount
+
+def remove_duplicate_rows(db) -> int:
+    """Delete repeated (user_id, nft_id) views and likes, keeping the earliest; returns how many.
+
+    Older databases have such duplicates, and their unique indexes, which the view
+    recorder and like toggle rely on, can only be created once they are gone.
+    """
+    removed: int = 0
+    with db.engine.begin() as connection:
+        for model in (NFTView, Like):
+            first_rows = select(func.min(model.id)).group_by(model.user_id, model.nft_id)
+            removed += connection.execute(delete(model).where(model.id.not_in(first_rows))).rowcount
+    return removed
+
+def backfill_sales(db) -> int:
+    """Record a sale for every accepted offer; returns how many.
+
+    Only run right after the sales table is created: trades made before it existed
+    are otherwise missing from rankings. Accepted offers are the only trade history
+    kept before that (direct purchases left no row), and the offer's creation time
+    stands in for the sale time.
+    """
+    accepted = (
+        select(Offer.nft_id, NFT.collection_id, Offer.owner_id, Offer.buyer_id, Offer.amount, Offer.created_at)
+        .join(NFT, NFT.id == Offer.nft_id)
+        .where(Offer.is_accepted == True)
+    )
+    with db.engine.begin() as connection:
+        return connection.execute(
+            insert(Sale).from_select(
+                ['nft_id', 'collection_id', 'seller_id', 'buyer_id', 'price', 'created_at'], accepted
+            )
+        ).rowcount
+
+def fill_collection_stats(db) -> int:
+    """Build the stats row of every collection that has none yet; returns how many"""
+    missing: list[int] = db.session.scalars(
+        select(NFTCollection.id).where(
+            ~select(CollectionStats.collection_id)
+            .where(CollectionStats.collection_id == NFTCollection.id)
+            .exists()
+        )
+    ).all()
+    for collection_id in missing:
+        CollectionStats.refresh(collection_id)
+    db.session.commit()
+    return len(missing)
+
+def fill_media_types(db, refill: bool = False) -> int:
+    """Derive `NFT.media_type` from the image extension for rows that have none, or every row with `refill`"""
+    updated: int = 0
+    with db.engine.begin() as connection:
+        for media_type in MediaType:
+            query = update(NFT).where(NFT.image_file.ilike(f'%.{media_type.name.lower()}'))
+            if not refill:
+                query = query.where(NFT.media_type.is_(None))
+            updated += connection.execute(query.values(media_type=media_type.value)).rowcount
+    return updated
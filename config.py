@@ -2,6 +2,7 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
+from typing import Literal
 from pathlib import Path
 import os
 
@@ -26,6 +27,17 @@ class DbSettings(BaseSettings):
         alias ='APP_FILES'
     )
 
+    # 'tuned' (WAL & co., see app.extensions.sqlite_pragmas) or 'default' (SQLite's own settings)
+    SQLITE_PROFILE: Literal['tuned', 'default'] = Field(default='tuned', alias='SQLITE_PROFILE')
+    SQLITE_BUSY_TIMEOUT_MS: int = Field(default=5000, alias='SQLITE_BUSY_TIMEOUT_MS')
+    SQLITE_MMAP_SIZE_MB: int = Field(default=256, alias='SQLITE_MMAP_SIZE_MB')
+    SQLITE_CACHE_SIZE_MB: int = Field(default=64, alias='SQLITE_CACHE_SIZE_MB')
+
+    DB_POOL_SIZE: int = Field(default=10, alias='DB_POOL_SIZE')
+    DB_MAX_OVERFLOW: int = Field(default=20, alias='DB_MAX_OVERFLOW')
+    DB_POOL_TIMEOUT: int = Field(default=30, alias='DB_POOL_TIMEOUT')
+    DB_POOL_RECYCLE: int = Field(default=1800, alias='DB_POOL_RECYCLE')
+
     class Config:
         env_file = "/etc/secrets/.env"
         extra = "allow"
@@ -33,12 +45,46 @@ class DbSettings(BaseSettings):
 class JWT(BaseModel):
     PRIVATE_KEY: Path = Path(os.getenv("JWT_PRIVATE_KEY_PATH", "/etc/secrets/private.pem"))
     PUBLIC_KEY: Path = Path(os.getenv("JWT_PUBLIC_KEY_PATH", "/etc/secrets/public.pem"))
-    ALGORITHM: str = 'RS256'
+    # retired public keys still accepted for verification, comma separated
+    ROTATED_PUBLIC_KEYS: list[Path] = [
+        Path(path.strip()) for path in os.getenv('JWT_ROTATED_PUBLIC_KEY_PATHS', '').split(',') if path.strip()
+    ]
+    # algorithm of the signing key; RS256 tokens keep verifying while their public key is listed
+    ALGORITHM: Literal['RS256', 'ES256', 'EdDSA'] = os.getenv('JWT_ALGORITHM', 'RS256')
     JWT_ACCESS_TOKEN_EXPIRES: int = int(os.environ.get('JWT_ACCESS_TOKEN_EXPIRES_MINUTES'))
     JWT_REFRESH_TOKEN_EXPIRES: int = int(os.environ.get('JWT_REFRESH_TOKEN_EXPIRES_MINUTES'))
+    TOKEN_CACHE_SIZE: int = int(os.getenv('JWT_TOKEN_CACHE_SIZE', 10000))
+    USER_STATUS_TTL_SECONDS: int = int(os.getenv('JWT_USER_STATUS_TTL_SECONDS', 30))
+    JWKS_MAX_AGE_SECONDS: int = int(os.getenv('JWKS_MAX_AGE_SECONDS', 3600))
 
 class App(BaseModel):
     MAX_ROYALTIES: float = 10.00
+    RANKINGS_REFRESH_SECONDS: int = int(os.getenv('RANKINGS_REFRESH_SECONDS', 300))
+    RANKINGS_MIN_REFRESH_SECONDS: int = int(os.getenv('RANKINGS_MIN_REFRESH_SECONDS', 10))
+    AUTOCOMPLETE_LIMIT: int = int(os.getenv('AUTOCOMPLETE_LIMIT', 8))
+    AUTOCOMPLETE_MEMORY_BUDGET_MB: int = int(os.getenv('AUTOCOMPLETE_MEMORY_BUDGET_MB', 64))
+    AUTOCOMPLETE_REBUILD_SECONDS: int = int(os.getenv('AUTOCOMPLETE_REBUILD_SECONDS', 600))
+    LISTING_SLOW_QUERY_MS: int = int(os.getenv('LISTING_SLOW_QUERY_MS', 250))
+    ACTIVITY_ROLLUP_SECONDS: int = int(os.getenv('ACTIVITY_ROLLUP_SECONDS', 60))
+    VIEW_FLUSH_SIZE: int = int(os.getenv('VIEW_FLUSH_SIZE', 500))
+    VIEW_FLUSH_SECONDS: float = float(os.getenv('VIEW_FLUSH_SECONDS', 2))
+    VIEW_QUEUE_MAX: int = int(os.getenv('VIEW_QUEUE_MAX', 10000))
+    LIKE_COUNTER_FLUSH_SECONDS: float = float(os.getenv('LIKE_COUNTER_FLUSH_SECONDS', 1))
+    BCRYPT_ROUNDS: int = int(os.getenv('BCRYPT_ROUNDS', 12))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_QUEUE_MAX: int = int(os.getenv('PASSWORD_HASH_QUEUE_MAX', 16))
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = int(os.getenv('PASSWORD_HASH_RETRY_AFTER_SECONDS', 2))
+    IMAGE_LOOKUP_CACHE_SIZE: int = int(os.getenv('IMAGE_LOOKUP_CACHE_SIZE', 50000))
+    IMAGE_LOOKUP_TTL_SECONDS: int = int(os.getenv('IMAGE_LOOKUP_TTL_SECONDS', 30))
+    IMAGE_DERIVATIVE_WIDTHS: tuple[int, ...] = tuple(
+        int(width) for width in os.getenv('IMAGE_DERIVATIVE_WIDTHS', '320,640,1280').split(',')
+    )
+    IMAGE_DERIVATIVE_WORKERS: int = int(os.getenv('IMAGE_DERIVATIVE_WORKERS', 2))
+    GRID_IMAGE_WIDTH: int = int(os.getenv('GRID_IMAGE_WIDTH', 640))
+    UPLOAD_CHUNK_SIZE: int = int(os.getenv('UPLOAD_CHUNK_SIZE', 64 * 1024))
+    UPLOAD_GC_GRACE_SECONDS: int = int(os.getenv('UPLOAD_GC_GRACE_SECONDS', 3600))
+    UPLOAD_GC_INTERVAL_SECONDS: int = int(os.getenv('UPLOAD_GC_INTERVAL_SECONDS', 900))
+    UPLOAD_SWEEP_BATCH_SIZE: int = int(os.getenv('UPLOAD_SWEEP_BATCH_SIZE', 500))
 
 class Settings(BaseSettings):
     SECRET_KEY: str
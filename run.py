@@ -3,7 +3,9 @@ import os
 
 from app import create_app
 
-app = create_app()
+# the image render workers re-import the main module as __mp_main__; they must not boot the app
+if __name__ != '__mp_main__':
+    app = create_app()
 
 if __name__ == '__main__':
     port = int(os.environ.get("PORT", 10000))